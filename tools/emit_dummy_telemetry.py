@@ -10,7 +10,7 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from tools.log_io import iter_mavlink_telemetry, read_timeseries_bin
+from tools.log_io import encode_mavlink_frames, iter_mavlink_telemetry, read_timeseries_bin
 
 
 def _parse_args() -> argparse.Namespace:
@@ -27,8 +27,16 @@ def _parse_args() -> argparse.Namespace:
         "--out",
         type=Path,
         default=None,
-        help="Optional output JSONL file (default: stdout).",
+        help="Optional output file (default: stdout).",
     )
+    parser.add_argument(
+        "--format",
+        choices=("jsonl", "mavlink"),
+        default="jsonl",
+        help="jsonl: one message object per line; mavlink: binary MAVLink v2 frames.",
+    )
+    parser.add_argument("--system-id", type=int, default=1)
+    parser.add_argument("--component-id", type=int, default=1)
     parser.add_argument("--heartbeat-hz", type=float, default=1.0)
     parser.add_argument("--status-hz", type=float, default=1.0)
     parser.add_argument("--pose-hz", type=float, default=5.0)
@@ -55,7 +63,14 @@ def main() -> int:
         include_custom_messages=args.include_custom,
     )
 
-    if args.out is None:
+    if args.format == "mavlink":
+        frames = encode_mavlink_frames(msgs, system_id=args.system_id, component_id=args.component_id)
+        if args.out is None:
+            sys.stdout.buffer.write(frames)
+        else:
+            args.out.parent.mkdir(parents=True, exist_ok=True)
+            args.out.write_bytes(frames)
+    elif args.out is None:
         for msg in msgs:
             print(
                 json.dumps(
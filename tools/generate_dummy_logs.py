@@ -4,6 +4,7 @@ from __future__ import annotations
 import argparse
 from dataclasses import asdict
 from datetime import datetime, timezone
+from itertools import accumulate
 import json
 from pathlib import Path
 import subprocess
@@ -33,10 +34,7 @@ from usv_sim.digital_twin.process_model import wrap_pi
 from usv_sim.digital_twin.simulate import simulate_with_inputs
 from tools.log_io.layout import (
     DEFAULT_RECORD_LAYOUTS,
-    ENDIAN_LITTLE,
-    FILE_HEADER_STRUCT,
     MAGIC,
-    RECORD_HEADER_STRUCT,
     REC_ACTUATOR_REQ,
     REC_ACTUATOR_CMD,
     REC_EKF_DIAG,
@@ -51,20 +49,10 @@ from tools.log_io.layout import (
     REC_SPEED_SCHED_DEBUG,
     REC_YAW_CTRL_DEBUG,
 )
+from tools.log_io.writer import TimeseriesWriter, pack_records
 
-NAV_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_NAV_SOLUTION].payload_struct
-GUIDANCE_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_GUIDANCE_REF].payload_struct
-ACTUATOR_REQ_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_ACTUATOR_REQ].payload_struct
-ACTUATOR_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_ACTUATOR_CMD].payload_struct
-ESC_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_ESC_OUTPUT].payload_struct
-MISSION_STATE_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_MISSION_STATE].payload_struct
-MIXER_FEEDBACK_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_MIXER_FEEDBACK].payload_struct
-SPEED_SCHED_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_SPEED_SCHED_DEBUG].payload_struct
-SPEED_CTRL_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_SPEED_CTRL_DEBUG].payload_struct
-YAW_CTRL_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_YAW_CTRL_DEBUG].payload_struct
-EKF_DIAG_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_EKF_DIAG].payload_struct
-SENSOR_GNSS_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_SENSOR_GNSS].payload_struct
-SENSOR_GYRO_STRUCT = DEFAULT_RECORD_LAYOUTS[REC_SENSOR_GYRO].payload_struct
+# Control steps generated and serialized per block; bounds memory for long sessions.
+_BLOCK_STEPS = 1 << 16
 
 
 def _get_git_info(repo_root: Path) -> tuple[str, bool]:
@@ -117,11 +105,6 @@ def _build_scenario(scenario_name: str, dt: float, duration_s: float):
     return builders[scenario_name]()
 
 
-def _write_record(fh, t_us: int, rec_type: int, payload: bytes) -> None:
-    fh.write(RECORD_HEADER_STRUCT.pack(int(t_us), int(rec_type), len(payload)))
-    fh.write(payload)
-
-
 def _record_catalog_json() -> dict[str, dict[str, object]]:
     return {
         str(type_id): {
@@ -132,6 +115,12 @@ def _record_catalog_json() -> dict[str, dict[str, object]]:
     }
 
 
+def _clipped_accumulate(increments: np.ndarray, start: float, lo: float, hi: float) -> np.ndarray:
+    """Saturating integrator: `out[k] = clip(out[k - 1] + increments[k], lo, hi)`, seeded with `start`."""
+    totals = accumulate(increments.tolist(), lambda total, inc: min(max(total + inc, lo), hi), initial=start)
+    return np.fromiter(totals, dtype=np.float64, count=increments.shape[0] + 1)[1:]
+
+
 def _write_timeseries_bin(
     out_path: Path,
     t_us: np.ndarray,
@@ -139,22 +128,6 @@ def _write_timeseries_bin(
     U: np.ndarray,
     fw_model_schema: int,
 ) -> dict[str, int]:
-    counts: dict[str, int] = {
-        "REC_NAV_SOLUTION": 0,
-        "REC_GUIDANCE_REF": 0,
-        "REC_ACTUATOR_REQ": 0,
-        "REC_ACTUATOR_CMD": 0,
-        "REC_ESC_OUTPUT": 0,
-        "REC_MISSION_STATE": 0,
-        "REC_MIXER_FEEDBACK": 0,
-        "REC_SPEED_SCHED_DEBUG": 0,
-        "REC_SPEED_CTRL_DEBUG": 0,
-        "REC_YAW_CTRL_DEBUG": 0,
-        "REC_EKF_DIAG": 0,
-        "REC_SENSOR_GNSS": 0,
-        "REC_SENSOR_GYRO": 0,
-    }
-
     rng = np.random.default_rng(7)
 
     n_steps = U.shape[0]
@@ -183,240 +156,184 @@ def _write_timeseries_bin(
     v_wp = 0.45
     e_psi_th = 0.65
     v_psi = 0.55
+    dv_max_up = a_up * dt_s
+    dv_max_down = a_down * dt_s
 
-    with out_path.open("wb") as fh:
-        fh.write(
-            FILE_HEADER_STRUCT.pack(
-                MAGIC,
-                int(fw_model_schema),
-                ENDIAN_LITTLE,
-                int(t_us[0]),
-            )
-        )
-
-        for k in range(n_steps):
-            tk = int(t_us[k])
+    with TimeseriesWriter(out_path, fw_model_schema=int(fw_model_schema), t0_us=int(t_us[0])) as writer:
+        # Stateless terms are whole-array operations per block of steps; only the
+        # integrators and the v_d ramp carry state, in compact scalar loops.
+        for k0 in range(0, n_steps, _BLOCK_STEPS):
+            k = np.arange(k0, min(k0 + _BLOCK_STEPS, n_steps))
+            tk = t_us[k]
 
             xk = X[k]
             x_next = X[k + 1]
-            x_pos = float(xk[0])
-            y_pos = float(xk[1])
-            psi = float(xk[2])
-            v_hat = float(xk[3])
-            r_hat = float(xk[4])
-            b_g_hat = float(xk[5])
+            x_pos = xk[:, 0]
+            y_pos = xk[:, 1]
+            psi = xk[:, 2]
+            v_hat = xk[:, 3]
+            r_hat = xk[:, 4]
+            b_g_hat = xk[:, 5]
 
             # Two-segment mission model so fields exist for the full chain.
-            if k < (n_steps // 2):
-                idx = 0
-                seg_start = wp0
-                seg_end = wp1
-            else:
-                idx = 1
-                seg_start = wp1
-                seg_end = wp2
-
-            seg_dx = float(seg_end[0] - seg_start[0])
-            seg_dy = float(seg_end[1] - seg_start[1])
-            seg_norm = float(np.hypot(seg_dx, seg_dy))
-            if seg_norm > 1e-9:
-                rel_x = x_pos - float(seg_start[0])
-                rel_y = y_pos - float(seg_start[1])
-                # Signed cross-track error (NED): positive means left/port of segment direction.
-                e_y = float((rel_x * seg_dy - rel_y * seg_dx) / seg_norm)
-            else:
-                e_y = 0.0
-
-            d_wp = float(np.hypot(float(seg_end[0]) - x_pos, float(seg_end[1]) - y_pos))
-
-            dx = float(x_next[0] - xk[0])
-            dy = float(x_next[1] - xk[1])
-            psi_d = float(np.arctan2(dy, dx)) if (dx * dx + dy * dy) > 1e-12 else psi
-            e_psi = float(wrap_pi(psi_d - psi))
+            idx = (k >= (n_steps // 2)).astype(np.int64)
+            seg_start = np.where(idx[:, None] == 0, wp0, wp1)
+            seg_end = np.where(idx[:, None] == 0, wp1, wp2)
+
+            seg_dx = seg_end[:, 0] - seg_start[:, 0]
+            seg_dy = seg_end[:, 1] - seg_start[:, 1]
+            seg_norm = np.hypot(seg_dx, seg_dy)
+            rel_x = x_pos - seg_start[:, 0]
+            rel_y = y_pos - seg_start[:, 1]
+            # Signed cross-track error (NED): positive means left/port of segment direction.
+            with np.errstate(divide="ignore", invalid="ignore"):
+                e_y = np.where(seg_norm > 1e-9, (rel_x * seg_dy - rel_y * seg_dx) / seg_norm, 0.0)
+
+            d_wp = np.hypot(seg_end[:, 0] - x_pos, seg_end[:, 1] - y_pos)
+
+            dx = x_next[:, 0] - xk[:, 0]
+            dy = x_next[:, 1] - xk[:, 1]
+            moving = (dx * dx + dy * dy) > 1e-12
+            psi_d = np.where(moving, np.arctan2(dy, dx), psi)
+            e_psi = wrap_pi(psi_d - psi)
 
             # Speed scheduler terms.
-            u_s_ref = float(U[k, 0])
-            v_seg = max(0.0, u_s_ref)
-            cap_wp_active = int(d_wp < d_slow)
-            cap_psi_active = int(abs(e_psi) > e_psi_th)
-            v_cap = v_seg
-            if cap_wp_active:
-                v_cap = min(v_cap, v_wp)
-            if cap_psi_active:
-                v_cap = min(v_cap, v_psi)
-            dv_max_up = a_up * dt_s
-            dv_max_down = a_down * dt_s
-            dv = float(np.clip(v_cap - v_d_state, -dv_max_down, dv_max_up))
-            v_d_state = max(0.0, v_d_state + dv)
-            v_d = float(v_d_state)
+            v_seg = np.maximum(0.0, U[k, 0])
+            cap_wp_active = d_wp < d_slow
+            cap_psi_active = np.abs(e_psi) > e_psi_th
+            v_cap = np.where(cap_wp_active, np.minimum(v_seg, v_wp), v_seg)
+            v_cap = np.where(cap_psi_active, np.minimum(v_cap, v_psi), v_cap)
+            v_d = np.fromiter(
+                accumulate(
+                    v_cap.tolist(),
+                    lambda v, cap: max(0.0, v + min(max(cap - v, -dv_max_down), dv_max_up)),
+                    initial=v_d_state,
+                ),
+                dtype=np.float64,
+                count=k.shape[0] + 1,
+            )
+            dv = np.clip(v_cap - v_d[:-1], -dv_max_down, dv_max_up)
+            v_d = v_d[1:]
 
             # Speed controller debug.
-            e_v = float(v_d - v_hat)
-            i_v = float(np.clip(i_v + (ki_v * e_v * dt_s), -1.2, 1.2))
-            u_s_raw = float(v_ff_gain * v_d + (kp_v * e_v) + i_v)
+            e_v = v_d - v_hat
+            i_v_k = _clipped_accumulate(ki_v * e_v * dt_s, i_v, -1.2, 1.2)
+            u_s_raw = v_ff_gain * v_d + (kp_v * e_v) + i_v_k
 
             # Yaw controller debug.
-            i_psi = float(np.clip(i_psi + (ki_psi * e_psi * dt_s), -0.8, 0.8))
-            r_d = float(np.clip((kp_psi * e_psi) + i_psi, -r_max, r_max))
-            e_r = float(r_d - r_hat)
-            i_r = float(np.clip(i_r + (ki_r * e_r * dt_s), -0.8, 0.8))
-            u_d_raw = float((kp_r * e_r) + i_r)
-
-            u_s_req = float(u_s_raw)
-            u_d_req = float(u_d_raw)
-            u_s_cmd = float(np.clip(u_s_req, -1.0, 1.0))
-            u_d_cmd = float(np.clip(u_d_req, -1.0, 1.0))
-            sat_u_s = int(abs(u_s_cmd - u_s_req) > 1e-6)
-            sat_u_d = int(abs(u_d_cmd - u_d_req) > 1e-6)
-
-            u_l_pre = float(u_s_cmd - u_d_cmd)
-            u_r_pre = float(u_s_cmd + u_d_cmd)
-            u_l = float(np.clip(u_l_pre, -1.0, 1.0))
-            u_r = float(np.clip(u_r_pre, -1.0, 1.0))
-            sat_l = int(abs(u_l - u_l_pre) > 1e-6)
-            sat_r = int(abs(u_r - u_r_pre) > 1e-6)
-            sat_any = int(bool(sat_l or sat_r))
-            u_s_ach = float(0.5 * (u_l + u_r))
-            u_d_ach = float(0.5 * (u_r - u_l))
+            i_psi_k = _clipped_accumulate(ki_psi * e_psi * dt_s, i_psi, -0.8, 0.8)
+            r_d = np.clip((kp_psi * e_psi) + i_psi_k, -r_max, r_max)
+            e_r = r_d - r_hat
+            i_r_k = _clipped_accumulate(ki_r * e_r * dt_s, i_r, -0.8, 0.8)
+            u_d_raw = (kp_r * e_r) + i_r_k
+            v_d_state, i_v, i_psi, i_r = float(v_d[-1]), float(i_v_k[-1]), float(i_psi_k[-1]), float(i_r_k[-1])
+
+            u_s_req = u_s_raw
+            u_d_req = u_d_raw
+            u_s_cmd = np.clip(u_s_req, -1.0, 1.0)
+            u_d_cmd = np.clip(u_d_req, -1.0, 1.0)
+            sat_u_s = np.abs(u_s_cmd - u_s_req) > 1e-6
+            sat_u_d = np.abs(u_d_cmd - u_d_req) > 1e-6
+
+            u_l_pre = u_s_cmd - u_d_cmd
+            u_r_pre = u_s_cmd + u_d_cmd
+            u_l = np.clip(u_l_pre, -1.0, 1.0)
+            u_r = np.clip(u_r_pre, -1.0, 1.0)
+            sat_l = np.abs(u_l - u_l_pre) > 1e-6
+            sat_r = np.abs(u_r - u_r_pre) > 1e-6
+            sat_any = sat_l | sat_r
+            u_s_ach = 0.5 * (u_l + u_r)
+            u_d_ach = 0.5 * (u_r - u_l)
 
             # EKF and sensor diagnostics are synthetic but structurally correct.
-            speed_mag = float(np.hypot(dx, dy) / max(dt_s, 1e-6))
-            cog = float(np.arctan2(dy, dx)) if (dx * dx + dy * dy) > 1e-12 else psi
-            gnss_x = x_pos + float(rng.normal(0.0, 0.35))
-            gnss_y = y_pos + float(rng.normal(0.0, 0.35))
-            gnss_sog = speed_mag + float(rng.normal(0.0, 0.05))
-            gnss_cog = cog + float(rng.normal(0.0, 0.03))
-            gyro_z = r_hat + b_g_hat + float(rng.normal(0.0, 0.01))
-            status_flags = 1 if abs(e_psi) < 1.3 else 0
-
-            nav_payload = NAV_STRUCT.pack(
-                x_pos,
-                y_pos,
-                psi,
-                v_hat,
-                r_hat,
-                b_g_hat,
-            )
-            _write_record(fh, tk, REC_NAV_SOLUTION, nav_payload)
-            counts["REC_NAV_SOLUTION"] += 1
-
-            guidance_payload = GUIDANCE_STRUCT.pack(psi_d, v_d, e_y, e_psi)
-            _write_record(fh, tk, REC_GUIDANCE_REF, guidance_payload)
-            counts["REC_GUIDANCE_REF"] += 1
-
-            mission_payload = MISSION_STATE_STRUCT.pack(
-                idx,
-                1 if k < (n_steps - 1) else 0,
-                1 if k >= (n_steps - 1) else 0,
-                float(seg_start[0]),
-                float(seg_start[1]),
-                float(seg_end[0]),
-                float(seg_end[1]),
-                v_seg,
-                d_wp,
-            )
-            _write_record(fh, tk, REC_MISSION_STATE, mission_payload)
-            counts["REC_MISSION_STATE"] += 1
-
-            sched_payload = SPEED_SCHED_STRUCT.pack(
-                v_seg,
-                v_cap,
-                v_d,
-                e_psi,
-                d_wp,
-                dv,
-                cap_wp_active,
-                cap_psi_active,
-            )
-            _write_record(fh, tk, REC_SPEED_SCHED_DEBUG, sched_payload)
-            counts["REC_SPEED_SCHED_DEBUG"] += 1
-
-            speed_ctrl_payload = SPEED_CTRL_STRUCT.pack(
-                v_d,
-                v_hat,
-                e_v,
-                u_s_raw,
-                u_s_req,
-                i_v,
-                sat_u_s,
-            )
-            _write_record(fh, tk, REC_SPEED_CTRL_DEBUG, speed_ctrl_payload)
-            counts["REC_SPEED_CTRL_DEBUG"] += 1
-
-            yaw_ctrl_payload = YAW_CTRL_STRUCT.pack(
-                psi_d,
-                psi,
-                e_psi,
-                r_d,
-                r_hat,
-                e_r,
-                u_d_req,
-                sat_u_d,
-            )
-            _write_record(fh, tk, REC_YAW_CTRL_DEBUG, yaw_ctrl_payload)
-            counts["REC_YAW_CTRL_DEBUG"] += 1
+            speed_mag = np.hypot(dx, dy) / max(dt_s, 1e-6)
+            cog = np.where(moving, np.arctan2(dy, dx), psi)
+            # Same stream as five scalar rng.normal(0.0, sigma) draws per step.
+            noise = 0.0 + rng.standard_normal((k.shape[0], 5)) * np.array([0.35, 0.35, 0.05, 0.03, 0.01])
+            gnss_x = x_pos + noise[:, 0]
+            gnss_y = y_pos + noise[:, 1]
+            gnss_sog = speed_mag + noise[:, 2]
+            gnss_cog = cog + noise[:, 3]
+            gyro_z = r_hat + b_g_hat + noise[:, 4]
+            status_flags = np.abs(e_psi) < 1.3
 
             src = 0  # ACT_SRC_AUTOPILOT in dummy pipeline
-            actuator_req_payload = ACTUATOR_REQ_STRUCT.pack(u_s_req, u_d_req, src)
-            _write_record(fh, tk, REC_ACTUATOR_REQ, actuator_req_payload)
-            counts["REC_ACTUATOR_REQ"] += 1
-
-            actuator_payload = ACTUATOR_STRUCT.pack(u_s_cmd, u_d_cmd)
-            _write_record(fh, tk, REC_ACTUATOR_CMD, actuator_payload)
-            counts["REC_ACTUATOR_CMD"] += 1
-
-            mix_payload = MIXER_FEEDBACK_STRUCT.pack(
-                u_s_ach,
-                u_d_ach,
-                sat_l,
-                sat_r,
-                sat_any,
-                u_l,
-                u_r,
-            )
-            _write_record(fh, tk, REC_MIXER_FEEDBACK, mix_payload)
-            counts["REC_MIXER_FEEDBACK"] += 1
-
-            esc_payload = ESC_STRUCT.pack(u_l, u_r)
-            _write_record(fh, tk, REC_ESC_OUTPUT, esc_payload)
-            counts["REC_ESC_OUTPUT"] += 1
-
-            ekf_diag_payload = EKF_DIAG_STRUCT.pack(
-                0.20 + (0.05 * abs(e_psi)),
-                0.20 + (0.05 * abs(e_psi)),
-                0.08 + (0.03 * abs(r_hat)),
-                0.15 + (0.04 * abs(e_v)),
-                0.12 + (0.04 * abs(e_r)),
-                0.02 + (0.01 * abs(b_g_hat)),
-                int(status_flags),
-            )
-            _write_record(fh, tk, REC_EKF_DIAG, ekf_diag_payload)
-            counts["REC_EKF_DIAG"] += 1
-
-            gnss_payload = SENSOR_GNSS_STRUCT.pack(
-                gnss_x,
-                gnss_y,
-                gnss_cog,
-                gnss_sog,
-                1,
-            )
-            _write_record(fh, tk, REC_SENSOR_GNSS, gnss_payload)
-            counts["REC_SENSOR_GNSS"] += 1
-
-            gyro_payload = SENSOR_GYRO_STRUCT.pack(
-                gyro_z,
-                b_g_hat,
-                1,
+            records = {
+                REC_NAV_SOLUTION: {"x": x_pos, "y": y_pos, "psi": psi, "v": v_hat, "r": r_hat, "b_g": b_g_hat},
+                REC_GUIDANCE_REF: {"psi_d": psi_d, "v_d": v_d, "e_y": e_y, "e_psi": e_psi},
+                REC_MISSION_STATE: {
+                    "idx": idx,
+                    "active": k < (n_steps - 1),
+                    "done": k >= (n_steps - 1),
+                    "x0": seg_start[:, 0],
+                    "y0": seg_start[:, 1],
+                    "x1": seg_end[:, 0],
+                    "y1": seg_end[:, 1],
+                    "v_seg": v_seg,
+                    "d_wp": d_wp,
+                },
+                REC_SPEED_SCHED_DEBUG: {
+                    "v_seg": v_seg,
+                    "v_cap": v_cap,
+                    "v_d": v_d,
+                    "e_psi": e_psi,
+                    "d_wp": d_wp,
+                    "dv": dv,
+                    "cap_wp": cap_wp_active,
+                    "cap_psi": cap_psi_active,
+                },
+                REC_SPEED_CTRL_DEBUG: {
+                    "v_d": v_d,
+                    "v_hat": v_hat,
+                    "e_v": e_v,
+                    "u_s_raw": u_s_raw,
+                    "u_s_req": u_s_req,
+                    "i_v": i_v_k,
+                    "sat_u_s": sat_u_s,
+                },
+                REC_YAW_CTRL_DEBUG: {
+                    "psi_d": psi_d,
+                    "psi": psi,
+                    "e_psi": e_psi,
+                    "r_d": r_d,
+                    "r": r_hat,
+                    "e_r": e_r,
+                    "u_d_req": u_d_req,
+                    "sat_u_d": sat_u_d,
+                },
+                REC_ACTUATOR_REQ: {"u_s_req": u_s_req, "u_d_req": u_d_req, "src": src},
+                REC_ACTUATOR_CMD: {"u_s_cmd": u_s_cmd, "u_d_cmd": u_d_cmd},
+                REC_MIXER_FEEDBACK: {
+                    "u_s_ach": u_s_ach,
+                    "u_d_ach": u_d_ach,
+                    "sat_L": sat_l,
+                    "sat_R": sat_r,
+                    "sat_any": sat_any,
+                    "u_L_ach": u_l,
+                    "u_R_ach": u_r,
+                },
+                REC_ESC_OUTPUT: {"u_L": u_l, "u_R": u_r},
+                REC_EKF_DIAG: {
+                    "P_xx": 0.20 + (0.05 * np.abs(e_psi)),
+                    "P_yy": 0.20 + (0.05 * np.abs(e_psi)),
+                    "P_psi": 0.08 + (0.03 * np.abs(r_hat)),
+                    "P_v": 0.15 + (0.04 * np.abs(e_v)),
+                    "P_r": 0.12 + (0.04 * np.abs(e_r)),
+                    "P_bg": 0.02 + (0.01 * np.abs(b_g_hat)),
+                    "status_flags": status_flags,
+                },
+                REC_SENSOR_GNSS: {"x": gnss_x, "y": gnss_y, "cog": gnss_cog, "sog": gnss_sog, "valid": 1},
+                REC_SENSOR_GYRO: {"z_gyro": gyro_z, "b_g_est": b_g_hat, "valid": 1},
+            }
+            writer.write_frames(
+                [pack_records(DEFAULT_RECORD_LAYOUTS[rec_type], tk, values) for rec_type, values in records.items()]
             )
-            _write_record(fh, tk, REC_SENSOR_GYRO, gyro_payload)
-            counts["REC_SENSOR_GYRO"] += 1
 
         x_final = X[-1]
-        _write_record(
-            fh,
+        writer.write_record(
             int(t_us[-1]),
             REC_NAV_SOLUTION,
-            NAV_STRUCT.pack(
+            (
                 float(x_final[0]),
                 float(x_final[1]),
                 float(x_final[2]),
@@ -425,9 +342,11 @@ def _write_timeseries_bin(
                 float(x_final[5]),
             ),
         )
-        counts["REC_NAV_SOLUTION"] += 1
 
-    return counts
+    return {
+        layout.name: writer.record_counts.get(type_id, 0)
+        for type_id, layout in sorted(DEFAULT_RECORD_LAYOUTS.items())
+    }
 
 
 def _write_events_jsonl(
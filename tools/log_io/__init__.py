@@ -1,16 +1,98 @@
+from .align import (
+    ANGLE_FIELDS,
+    AlignedRecords,
+    align_columns,
+    align_indices,
+    align_records,
+    uniform_time_base,
+    wrap_angle,
+)
+from .cache import (
+    CACHE_SUFFIX,
+    TimeseriesCache,
+    build_timeseries_cache,
+    cache_path_for,
+    layouts_digest,
+    load_timeseries_cache,
+    read_timeseries_cache,
+    write_timeseries_cache,
+)
+from .catalog import CatalogEntry, CatalogUpdate, SessionCatalog
+from .events import EventLog, parse_event_log, read_event_log
+from .index import (
+    INDEX_SUFFIX,
+    RecordTypeStats,
+    TimeseriesIndex,
+    TimeseriesStats,
+    build_timeseries_index,
+    index_path_for,
+    index_timeseries_buffer,
+    load_timeseries_index,
+    read_timeseries_index,
+    recover_timeseries_index,
+    scan_timeseries_bin,
+    write_timeseries_index,
+)
 from .io import (
+    TimeseriesBlockTable,
     TimeseriesData,
     TimeseriesHeader,
     UnknownRecord,
+    UnknownRecords,
+    decompress_timeseries_bin,
+    read_block_table,
     read_timeseries_bin,
+    read_timeseries_blocks,
 )
+from .link import (
+    DEFAULT_TELEMETRY_CLASSES,
+    DROP_NEWEST,
+    DROP_OLDEST,
+    LINK_DECIMATED,
+    LINK_DROPPED,
+    LINK_MESSAGE_DTYPE,
+    LINK_SENT,
+    LinkBudget,
+    LinkClassStats,
+    LinkReport,
+    TelemetryClass,
+    simulate_telemetry_link,
+)
+from .mavlink import (
+    MAVLINK_FRAME_DTYPE,
+    MAVLINK_FRAME_OVERHEAD,
+    MAVLINK_MESSAGE_LAYOUTS,
+    MavlinkCapture,
+    MavlinkDecoder,
+    MavlinkEncoder,
+    MavlinkField,
+    MavlinkMessageLayout,
+    decode_mavlink_frames,
+    encode_mavlink_frames,
+    mavlink_crc,
+    mavlink_message_layout,
+)
+from .sessions import SessionResult, load_sessions
+from .stream import TimeseriesFollower, iter_timeseries_chunks
 from .telemetry import (
     CUSTOM_MAVLINK_MESSAGES,
     PREDEFINED_MAVLINK_MESSAGES,
+    TELEMETRY_INDEX_DTYPE,
     TelemetryMessage,
+    TelemetryTables,
+    build_mavlink_telemetry_tables,
     iter_mavlink_telemetry,
 )
+from .writer import (
+    TimeseriesWriter,
+    compress_timeseries_bin,
+    interleave_records,
+    pack_records,
+    record_dtype,
+    write_timeseries_bin,
+)
 from .layout import (
+    COMPRESSED_SUFFIX,
     DEFAULT_RECORD_LAYOUTS,
     ENDIAN_LITTLE,
     FILE_HEADER_STRUCT,
@@ -30,13 +112,44 @@ from .layout import (
     REC_SPEED_SCHED_DEBUG,
     REC_YAW_CTRL_DEBUG,
     RecordLayout,
+    layouts_for_schema,
+    payload_dtype,
+    register_record_layouts,
+    registered_schemas,
+    unregister_record_layouts,
 )
 
 __all__ = [
+    "ANGLE_FIELDS",
+    "AlignedRecords",
+    "CACHE_SUFFIX",
+    "CatalogEntry",
+    "CatalogUpdate",
+    "COMPRESSED_SUFFIX",
     "DEFAULT_RECORD_LAYOUTS",
+    "DEFAULT_TELEMETRY_CLASSES",
+    "DROP_NEWEST",
+    "DROP_OLDEST",
+    "EventLog",
     "ENDIAN_LITTLE",
     "FILE_HEADER_STRUCT",
+    "INDEX_SUFFIX",
+    "LINK_DECIMATED",
+    "LINK_DROPPED",
+    "LINK_MESSAGE_DTYPE",
+    "LINK_SENT",
+    "LinkBudget",
+    "LinkClassStats",
+    "LinkReport",
     "MAGIC",
+    "MAVLINK_FRAME_DTYPE",
+    "MAVLINK_FRAME_OVERHEAD",
+    "MAVLINK_MESSAGE_LAYOUTS",
+    "MavlinkCapture",
+    "MavlinkDecoder",
+    "MavlinkEncoder",
+    "MavlinkField",
+    "MavlinkMessageLayout",
     "RECORD_HEADER_STRUCT",
     "REC_ACTUATOR_REQ",
     "REC_ACTUATOR_CMD",
@@ -52,12 +165,67 @@ __all__ = [
     "REC_SPEED_SCHED_DEBUG",
     "REC_YAW_CTRL_DEBUG",
     "RecordLayout",
+    "RecordTypeStats",
+    "SessionCatalog",
+    "SessionResult",
+    "TimeseriesBlockTable",
+    "TimeseriesCache",
     "TimeseriesData",
+    "TimeseriesFollower",
     "TimeseriesHeader",
+    "TimeseriesIndex",
+    "TimeseriesStats",
+    "TimeseriesWriter",
     "UnknownRecord",
+    "UnknownRecords",
     "CUSTOM_MAVLINK_MESSAGES",
     "PREDEFINED_MAVLINK_MESSAGES",
+    "TELEMETRY_INDEX_DTYPE",
+    "TelemetryClass",
     "TelemetryMessage",
+    "TelemetryTables",
+    "align_columns",
+    "align_indices",
+    "align_records",
+    "build_mavlink_telemetry_tables",
+    "build_timeseries_cache",
+    "build_timeseries_index",
+    "cache_path_for",
+    "compress_timeseries_bin",
+    "decode_mavlink_frames",
+    "decompress_timeseries_bin",
+    "encode_mavlink_frames",
+    "index_path_for",
+    "index_timeseries_buffer",
+    "interleave_records",
     "iter_mavlink_telemetry",
+    "iter_timeseries_chunks",
+    "layouts_digest",
+    "layouts_for_schema",
+    "load_sessions",
+    "load_timeseries_cache",
+    "load_timeseries_index",
+    "mavlink_crc",
+    "mavlink_message_layout",
+    "pack_records",
+    "parse_event_log",
+    "payload_dtype",
+    "read_block_table",
+    "read_event_log",
     "read_timeseries_bin",
+    "read_timeseries_blocks",
+    "read_timeseries_cache",
+    "read_timeseries_index",
+    "record_dtype",
+    "recover_timeseries_index",
+    "register_record_layouts",
+    "registered_schemas",
+    "scan_timeseries_bin",
+    "simulate_telemetry_link",
+    "uniform_time_base",
+    "unregister_record_layouts",
+    "write_timeseries_bin",
+    "write_timeseries_cache",
+    "wrap_angle",
+    "write_timeseries_index",
 ]
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Final, Iterable, Mapping
+
+import numpy as np
+
+from .index import _in_window, _map_file, build_timeseries_index
+from .io import (
+    TimeseriesData,
+    TimeseriesHeader,
+    UnknownRecords,
+    _check_payload_lengths,
+    _decode_timeseries,
+    _decoded_dtype,
+    _layouts_for_file,
+    _normalize_layouts,
+    _parse_file_header,
+    _select_fields,
+    _select_record_types,
+)
+from .layout import FILE_HEADER_STRUCT, RecordLayout
+
+CACHE_SUFFIX: Final[str] = ".cache"
+
+_CACHE_VERSION = 2
+_MANIFEST_NAME = "manifest.json"
+_UNKNOWN_RECORDS_NAME = "unknown_records.npy"
+_UNKNOWN_RECORDS_DTYPE = np.dtype([("t_us", "<u8"), ("type_id", "<u2"), ("payload_len", "<u2"), ("offset", "<i8")])
+
+
+@dataclass(frozen=True, slots=True)
+class TimeseriesCache:
+    """Decoded session loaded from a columnar cache directory.
+
+    `data` holds read-only memory-mapped arrays in the payload dtypes (one `.npy` file per
+    record-type field). The remaining fields are the cache key: the source fingerprint
+    (`source_size`/`source_mtime_ns`), its content hash, and a digest of the record
+    layouts it was decoded with. `strict_error` is the error a strict read would raise
+    (payload length mismatch), if any.
+    """
+
+    data: TimeseriesData
+    source_size: int
+    source_mtime_ns: int
+    source_sha256: str
+    layouts_digest: str
+    t_us_sorted: bool = True
+    strict_error: str | None = None
+
+    def select(
+        self,
+        *,
+        keep_unknown: bool = True,
+        as_views: bool = False,
+        record_layouts: Mapping[int, RecordLayout] | None = None,
+        record_types: Iterable[int | str] | None = None,
+        fields: Mapping[str, Iterable[str]] | None = None,
+        t_start_us: int | None = None,
+        t_end_us: int | None = None,
+    ) -> TimeseriesData:
+        """Return the subset `read_timeseries_bin` would decode with the same arguments.
+
+        With `as_views` the arrays stay mapped (sliced, never copied); otherwise they are
+        converted to the default reader's dtypes (float64/int64/uint64).
+        """
+        layouts = _normalize_layouts(record_layouts, self.data.header.fw_model_schema)
+        wanted_names = {layouts[type_id].name for type_id in _select_record_types(layouts, record_types)}
+        wanted_fields = _select_fields(layouts, fields)
+
+        records: dict[str, dict[str, np.ndarray]] = {}
+        record_counts: dict[str, int] = {}
+        for name, columns in self.data.records.items():
+            if name not in wanted_names:
+                continue
+            rows = _window_rows(columns["t_us"], self.t_us_sorted, t_start_us, t_end_us)
+            out: dict[str, np.ndarray] = {}
+            for field in ("t_us", *wanted_fields.get(name, tuple(f for f in columns if f != "t_us"))):
+                values = columns[field][rows]
+                out[field] = values if as_views else values.astype(_decoded_dtype(values.dtype))
+            if out["t_us"].shape[0] == 0:
+                continue
+            records[name] = out
+            record_counts[name] = int(out["t_us"].shape[0])
+
+        unknown_records = UnknownRecords.empty()
+        if keep_unknown and len(self.data.unknown_records):
+            unknown = self.data.unknown_records
+            unknown_records = unknown[_in_window(unknown.t_us, t_start_us, t_end_us)]
+        return TimeseriesData(
+            header=self.data.header,
+            records=records,
+            record_counts=record_counts,
+            unknown_records=unknown_records,
+        )
+
+
+def _window_rows(t_us: np.ndarray, t_us_sorted: bool, t_start_us: int | None, t_end_us: int | None):
+    if t_start_us is None and t_end_us is None:
+        return slice(None)
+    if not t_us_sorted:
+        return _in_window(t_us, t_start_us, t_end_us)
+    lo = 0 if t_start_us is None else int(np.searchsorted(t_us, np.uint64(max(0, int(t_start_us)))))
+    hi = t_us.shape[0] if t_end_us is None else int(np.searchsorted(t_us, np.uint64(max(0, int(t_end_us)))))
+    return slice(lo, max(lo, hi))
+
+
+def cache_path_for(path: str | Path) -> Path:
+    """Cache directory for `path`, e.g. `timeseries.bin` -> `timeseries.cache/`."""
+    return Path(path).with_suffix(CACHE_SUFFIX)
+
+
+def layouts_digest(record_layouts: Mapping[int, RecordLayout] | None = None) -> str:
+    """Stable digest of a record layout map; caches decoded with other layouts are stale."""
+    layouts = _normalize_layouts(record_layouts)
+    spec = [
+        [int(type_id), layout.name, list(layout.fields), layout.payload_struct.format]
+        for type_id, layout in sorted(layouts.items())
+    ]
+    return hashlib.sha256(json.dumps(spec, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _file_sha256(path: str | Path) -> str:
+    with Path(path).open("rb") as fh:
+        return hashlib.file_digest(fh, "sha256").hexdigest()
+
+
+def write_timeseries_cache(
+    data: TimeseriesData,
+    cache_path: str | Path,
+    *,
+    source_path: str | Path | None = None,
+    record_layouts: Mapping[int, RecordLayout] | None = None,
+    t_us_sorted: bool = True,
+    strict_error: str | None = None,
+) -> None:
+    """Export `data` as a columnar cache directory.
+
+    Each record-type field is saved as one contiguous `.npy` array (dtype unchanged) and
+    the header, record order and unknown records go into `manifest.json`. The directory
+    is assembled under a temporary name and swapped in, so readers never see a partial
+    cache.
+
+    Args:
+        data: Decoded session to export.
+        cache_path: Destination directory (replaced if it exists).
+        source_path: Optional `timeseries.bin` the data was decoded from; its size, mtime
+            and SHA-256 become the cache key checked by `load_timeseries_cache`.
+        record_layouts: Record layouts `data` was decoded with.
+        t_us_sorted: Whether record `t_us` is non-decreasing in the source file.
+        strict_error: Error a strict read of the source raises, if any.
+    """
+    source: dict[str, object] = {"size": None, "mtime_ns": None, "sha256": None}
+    if source_path is not None:
+        st = os.stat(source_path)
+        source = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": _file_sha256(source_path)}
+
+    cache_path = Path(cache_path)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.tmp{os.getpid()}")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    records: list[dict[str, object]] = []
+    for name, columns in data.records.items():
+        files: dict[str, str] = {}
+        for field, values in columns.items():
+            files[field] = f"{name}.{field}.npy"
+            np.save(tmp_path / files[field], np.ascontiguousarray(values), allow_pickle=False)
+        records.append({"name": name, "count": data.record_counts.get(name, 0), "fields": files})
+
+    unknown_file = None
+    if len(data.unknown_records):
+        unknown = np.empty(len(data.unknown_records), dtype=_UNKNOWN_RECORDS_DTYPE)
+        for name in _UNKNOWN_RECORDS_DTYPE.names:
+            unknown[name] = getattr(data.unknown_records, name)
+        unknown_file = _UNKNOWN_RECORDS_NAME
+        np.save(tmp_path / unknown_file, unknown, allow_pickle=False)
+
+    manifest = {
+        "version": _CACHE_VERSION,
+        "source": source,
+        "layouts_digest": layouts_digest(record_layouts),
+        "header": {
+            "magic": data.header.magic,
+            "fw_model_schema": data.header.fw_model_schema,
+            "endianness": data.header.endianness,
+            "t0_us": data.header.t0_us,
+        },
+        "t_us_sorted": t_us_sorted,
+        "strict_error": strict_error,
+        "records": records,
+        "unknown_records": unknown_file,
+    }
+    (tmp_path / _MANIFEST_NAME).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+
+    if cache_path.exists():
+        shutil.rmtree(cache_path)
+    os.replace(tmp_path, cache_path)
+
+
+def read_timeseries_cache(cache_path: str | Path) -> TimeseriesCache:
+    """Open a cache directory; field arrays are read-only memory maps."""
+    cache_path = Path(cache_path)
+    manifest = json.loads((cache_path / _MANIFEST_NAME).read_text(encoding="utf-8"))
+    if manifest.get("version") != _CACHE_VERSION:
+        raise ValueError(f"unsupported cache version: {manifest.get('version')!r}")
+
+    records: dict[str, dict[str, np.ndarray]] = {}
+    record_counts: dict[str, int] = {}
+    for entry in manifest["records"]:
+        records[entry["name"]] = {
+            field: np.load(cache_path / file_name, mmap_mode="r").view(np.ndarray)
+            for field, file_name in entry["fields"].items()
+        }
+        record_counts[entry["name"]] = int(entry["count"])
+
+    unknown_records = UnknownRecords.empty()
+    if manifest["unknown_records"]:
+        unknown = np.load(cache_path / manifest["unknown_records"], allow_pickle=False)
+        unknown_records = UnknownRecords(**{name: unknown[name] for name in _UNKNOWN_RECORDS_DTYPE.names})
+
+    source = manifest["source"]
+    return TimeseriesCache(
+        data=TimeseriesData(
+            header=TimeseriesHeader(**manifest["header"]),
+            records=records,
+            record_counts=record_counts,
+            unknown_records=unknown_records,
+        ),
+        source_size=-1 if source["size"] is None else int(source["size"]),
+        source_mtime_ns=-1 if source["mtime_ns"] is None else int(source["mtime_ns"]),
+        source_sha256=source["sha256"] or "",
+        layouts_digest=manifest["layouts_digest"],
+        t_us_sorted=bool(manifest["t_us_sorted"]),
+        strict_error=manifest["strict_error"],
+    )
+
+
+def _cache_matches_source(cache: TimeseriesCache, path: str | Path, st: os.stat_result) -> bool:
+    if st.st_size != cache.source_size:
+        return False
+    with Path(path).open("rb") as fh:
+        header = _parse_file_header(fh.read(FILE_HEADER_STRUCT.size))
+    if header != cache.data.header:
+        return False
+    if st.st_mtime_ns == cache.source_mtime_ns:
+        return True
+    # Touched or copied but possibly unchanged: fall back to the content hash.
+    return _file_sha256(path) == cache.source_sha256
+
+
+def _refresh_cache_mtime(cache_path: Path, mtime_ns: int) -> None:
+    manifest_path = cache_path / _MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    manifest["source"]["mtime_ns"] = mtime_ns
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
+
+
+def build_timeseries_cache(
+    path: str | Path,
+    *,
+    record_layouts: Mapping[int, RecordLayout] | None = None,
+) -> TimeseriesCache:
+    """Decode `path` in full (payload dtypes, unknown records kept) for caching.
+
+    Raises:
+        ValueError: If the file is damaged (bad header, truncated record, short payload).
+    """
+    index = build_timeseries_index(path)
+    data = _map_file(path)
+    header = _parse_file_header(data)
+    layouts = _normalize_layouts(record_layouts, header.fw_model_schema)
+    decoded = _decode_timeseries(data, header, index, layouts, strict_payload_len=False, as_views=True)
+
+    known_rows = index.type_table[np.isin(index.type_table["type_id"], list(layouts))]
+    strict_error = None
+    try:
+        _check_payload_lengths(index, known_rows, layouts, True, None, None)
+    except ValueError as exc:
+        strict_error = str(exc)
+
+    return TimeseriesCache(
+        data=decoded,
+        source_size=index.file_size,
+        source_mtime_ns=index.file_mtime_ns,
+        source_sha256="",
+        layouts_digest=layouts_digest(layouts),
+        t_us_sorted=index.t_us_sorted,
+        strict_error=strict_error,
+    )
+
+
+def load_timeseries_cache(
+    path: str | Path,
+    *,
+    record_layouts: Mapping[int, RecordLayout] | None = None,
+    write: bool = True,
+) -> TimeseriesCache:
+    """Return the decoded session for `path`, reusing its cache directory when valid.
+
+    The cache is valid when it was decoded with the same record layouts and file header
+    (`fw_model_schema`, `t0_us`) and the source still has the same size and mtime, or the
+    same SHA-256 if only the mtime changed. Otherwise the file is decoded again and, if
+    `write` is True, the cache is rewritten (best effort) and reopened as memory maps.
+
+    Raises:
+        ValueError: If the cache has to be rebuilt and the source file is damaged.
+    """
+    cache_path = cache_path_for(path)
+    layouts = _layouts_for_file(path, record_layouts)
+    digest = layouts_digest(layouts)
+    if (cache_path / _MANIFEST_NAME).exists():
+        try:
+            cache = read_timeseries_cache(cache_path)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        else:
+            st = os.stat(path)
+            if cache.layouts_digest == digest and _cache_matches_source(cache, path, st):
+                if st.st_mtime_ns != cache.source_mtime_ns:
+                    try:
+                        _refresh_cache_mtime(cache_path, st.st_mtime_ns)
+                    except OSError:
+                        pass
+                    cache = replace(cache, source_mtime_ns=st.st_mtime_ns)
+                return cache
+
+    cache = build_timeseries_cache(path, record_layouts=layouts)
+    if not write:
+        return cache
+    try:
+        write_timeseries_cache(
+            cache.data,
+            cache_path,
+            source_path=path,
+            record_layouts=layouts,
+            t_us_sorted=cache.t_us_sorted,
+            strict_error=cache.strict_error,
+        )
+        return read_timeseries_cache(cache_path)
+    except OSError:
+        return cache  # read-only media: the decoded data still serves this open.
@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import sqlite3
+from typing import Any, Final, Iterable, Mapping
+
+from .events import read_event_log
+from .index import load_timeseries_index
+from .io import _normalize_layouts
+from .layout import RecordLayout
+from .sessions import TIMESERIES_FILE_NAME
+
+META_FILE_NAME: Final[str] = "meta.json"
+EVENTS_FILE_NAME: Final[str] = "events.jsonl"
+
+# Bumped when the schema changes; an older catalog is dropped and rebuilt on open.
+_CATALOG_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    session_name TEXT,
+    created_utc TEXT,
+    git_sha TEXT,
+    git_dirty INTEGER,
+    fw_model_id TEXT,
+    fw_model_schema INTEGER,
+    scenario TEXT,
+    dt_s REAL,
+    duration_s REAL,
+    n_steps INTEGER,
+    t0_us INTEGER,
+    t_end_us INTEGER,
+    fingerprint TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_scenario ON sessions (scenario);
+CREATE INDEX IF NOT EXISTS sessions_schema ON sessions (fw_model_schema);
+CREATE TABLE IF NOT EXISTS records (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    type_id INTEGER NOT NULL,
+    name TEXT,
+    count INTEGER NOT NULL,
+    t_first_us INTEGER NOT NULL,
+    t_last_us INTEGER NOT NULL,
+    span_us INTEGER NOT NULL,
+    PRIMARY KEY (session_id, type_id)
+);
+CREATE INDEX IF NOT EXISTS records_name_span ON records (name, span_us);
+CREATE TABLE IF NOT EXISTS events (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    t_first_us INTEGER,
+    t_last_us INTEGER,
+    PRIMARY KEY (session_id, type)
+);
+CREATE INDEX IF NOT EXISTS events_type ON events (type);
+"""
+_SESSION_COLUMNS = (
+    "session_name",
+    "created_utc",
+    "git_sha",
+    "git_dirty",
+    "fw_model_id",
+    "fw_model_schema",
+    "scenario",
+    "dt_s",
+    "duration_s",
+    "n_steps",
+    "t0_us",
+    "t_end_us",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogEntry:
+    """One cataloged session folder; metadata fields are None when `meta.json` lacks them."""
+
+    path: Path
+    session_name: str | None
+    created_utc: str | None
+    git_sha: str | None
+    git_dirty: bool | None
+    fw_model_id: str | None
+    fw_model_schema: int | None
+    scenario: str | None
+    dt_s: float | None
+    duration_s: float | None
+    n_steps: int | None
+    t0_us: int | None
+    t_end_us: int | None
+    error: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogUpdate:
+    """Session folders added, re-read, dropped and left untouched by `SessionCatalog.update`."""
+
+    added: int
+    updated: int
+    removed: int
+    unchanged: int
+
+
+def _file_fingerprint(path: Path) -> list[int] | None:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _session_fingerprint(session_dir: Path) -> str:
+    return json.dumps(
+        [_file_fingerprint(session_dir / name) for name in (META_FILE_NAME, TIMESERIES_FILE_NAME, EVENTS_FILE_NAME)]
+    )
+
+
+def _find_session_dirs(root: Path) -> list[Path]:
+    found: set[Path] = set()
+    for dirpath, _, filenames in os.walk(root):
+        if META_FILE_NAME in filenames or TIMESERIES_FILE_NAME in filenames:
+            found.add(Path(dirpath).resolve())
+    return sorted(found)
+
+
+def _meta_columns(meta: Mapping[str, Any]) -> dict[str, object]:
+    scenario = meta.get("scenario") or {}
+    times = meta.get("time") or {}
+    git_dirty = meta.get("git_dirty")
+    return {
+        "session_name": meta.get("session_name"),
+        "created_utc": meta.get("created_utc"),
+        "git_sha": meta.get("git_sha"),
+        "git_dirty": None if git_dirty is None else int(bool(git_dirty)),
+        "fw_model_id": meta.get("fw_model_id"),
+        "fw_model_schema": meta.get("fw_model_schema"),
+        "scenario": scenario.get("name"),
+        "dt_s": scenario.get("dt_s"),
+        "duration_s": scenario.get("duration_s"),
+        "n_steps": scenario.get("n_steps"),
+        "t0_us": times.get("t0_us"),
+        "t_end_us": times.get("t_end_us"),
+    }
+
+
+def _scan_session(
+    session_dir: Path,
+    record_layouts: Mapping[int, RecordLayout] | None,
+) -> tuple[dict[str, object], list[tuple[object, ...]], list[tuple[object, ...]]]:
+    """Collect one session's catalog rows; problems are recorded in `error`, not raised."""
+    columns: dict[str, object] = dict.fromkeys(_SESSION_COLUMNS)
+    errors: list[str] = []
+    records: list[tuple[object, ...]] = []
+    events: list[tuple[object, ...]] = []
+
+    meta_path = session_dir / META_FILE_NAME
+    if meta_path.exists():
+        try:
+            columns.update(_meta_columns(json.loads(meta_path.read_text(encoding="utf-8"))))
+        except (OSError, ValueError, AttributeError) as exc:
+            errors.append(f"{META_FILE_NAME}: {exc}")
+
+    timeseries_path = session_dir / TIMESERIES_FILE_NAME
+    if timeseries_path.exists():
+        try:
+            # Header scan only (or a fresh sidecar); the catalog never writes into sessions.
+            index = load_timeseries_index(timeseries_path, write=False)
+        except (OSError, ValueError) as exc:
+            errors.append(f"{TIMESERIES_FILE_NAME}: {exc}")
+        else:
+            if index.error is not None:
+                errors.append(f"{TIMESERIES_FILE_NAME}: {index.error}")
+            layouts = _normalize_layouts(record_layouts, index.fw_model_schema)
+            for row in index.type_table:
+                type_id = int(row["type_id"])
+                layout = layouts.get(type_id)
+                t_first, t_last = int(row["t_first_us"]), int(row["t_last_us"])
+                records.append(
+                    (type_id, None if layout is None else layout.name, int(row["count"]), t_first, t_last, t_last - t_first)
+                )
+
+    events_path = session_dir / EVENTS_FILE_NAME
+    if events_path.exists():
+        try:
+            event_log = read_event_log(events_path)
+        except (OSError, ValueError, AttributeError) as exc:
+            errors.append(f"{EVENTS_FILE_NAME}: {exc}")
+        else:
+            for code, event_type in enumerate(event_log.types):
+                lo, hi = int(event_log.type_bounds[code]), int(event_log.type_bounds[code + 1])
+                positions = event_log.by_type[lo:hi]
+                timed = event_log.t_us[positions][event_log.t_us_valid[positions]]
+                t_first, t_last = (int(timed[0]), int(timed[-1])) if timed.shape[0] else (None, None)
+                events.append((event_type, hi - lo, t_first, t_last))
+
+    columns["error"] = "; ".join(errors) or None
+    return columns, records, events
+
+
+class SessionCatalog:
+    """SQLite index of session folders (`meta.json`, `timeseries.bin`, `events.jsonl`).
+
+    `update(root)` walks a logs tree and (re)reads only the sessions whose files changed
+    size or mtime since the last update: metadata from `meta.json`, per record type
+    counts and `t_us` spans from a header scan of `timeseries.bin` (or its fresh
+    `timeseries.idx`), and an event-type histogram from `events.jsonl`. Queries then
+    run against the database without touching the sessions.
+
+    Example:
+        with SessionCatalog("logs/catalog.sqlite") as catalog:
+            catalog.update("logs")
+            long_zigzags = catalog.find(
+                scenario="zigzag*", fw_model_schema=1, record_type="REC_NAV_SOLUTION", min_span_s=600.0
+            )
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        *,
+        record_layouts: Mapping[int, RecordLayout] | None = None,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self._record_layouts = record_layouts
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version != _CATALOG_VERSION:
+            with self._conn:
+                for table in ("events", "records", "sessions"):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self._conn.execute(f"PRAGMA user_version = {_CATALOG_VERSION}")
+        self._conn.executescript(_SCHEMA)
+
+    def update(self, root: str | Path) -> CatalogUpdate:
+        """Synchronize the catalog with the session folders under `root`.
+
+        New and changed sessions are (re)scanned, sessions under `root` that no longer
+        exist are dropped, and unchanged ones are skipped after a `stat` of their files.
+        A session whose files cannot be parsed is still cataloged, with `error` set.
+        """
+        root = Path(root).resolve()
+        known = {
+            path: (session_id, fingerprint)
+            for session_id, path, fingerprint in self._conn.execute("SELECT id, path, fingerprint FROM sessions")
+            if Path(path).is_relative_to(root)
+        }
+        added = updated = unchanged = 0
+        with self._conn:
+            for session_dir in _find_session_dirs(root):
+                fingerprint = _session_fingerprint(session_dir)
+                previous = known.pop(str(session_dir), None)
+                if previous is not None and previous[1] == fingerprint:
+                    unchanged += 1
+                    continue
+                if previous is None:
+                    added += 1
+                else:
+                    updated += 1
+                    self._conn.execute("DELETE FROM sessions WHERE id = ?", (previous[0],))
+                self._insert_session(session_dir, fingerprint)
+            self._conn.executemany("DELETE FROM sessions WHERE id = ?", [(session_id,) for session_id, _ in known.values()])
+        return CatalogUpdate(added=added, updated=updated, removed=len(known), unchanged=unchanged)
+
+    def find(
+        self,
+        *,
+        scenario: str | None = None,
+        fw_model_schema: int | None = None,
+        git_sha: str | None = None,
+        record_type: str | None = None,
+        min_span_s: float | None = None,
+        min_count: int | None = None,
+        event_type: str | None = None,
+        include_errors: bool = True,
+    ) -> list[CatalogEntry]:
+        """Return cataloged sessions matching every given filter, ordered by path.
+
+        Args:
+            scenario: Scenario name or SQLite GLOB pattern, e.g. `"zigzag*"`.
+            fw_model_schema: Required `fw_model_schema`.
+            git_sha: Required firmware git SHA.
+            record_type: Record name the session must contain; `min_span_s` and
+                `min_count` then apply to that record type.
+            min_span_s: Minimum `t_last_us - t_first_us` of `record_type`, in seconds.
+            min_count: Minimum number of `record_type` records.
+            event_type: Event type that must occur at least once in `events.jsonl`.
+            include_errors: If False, skip sessions that had parse errors.
+
+        Returns:
+            Matching sessions.
+        """
+        if (min_span_s is not None or min_count is not None) and record_type is None:
+            raise ValueError("min_span_s and min_count need record_type")
+        clauses: list[str] = []
+        params: list[object] = []
+        if scenario is not None:
+            clauses.append("s.scenario GLOB ?")
+            params.append(scenario)
+        if fw_model_schema is not None:
+            clauses.append("s.fw_model_schema = ?")
+            params.append(int(fw_model_schema))
+        if git_sha is not None:
+            clauses.append("s.git_sha = ?")
+            params.append(git_sha)
+        if record_type is not None:
+            conditions = ["r.session_id = s.id", "r.name = ?"]
+            params.append(record_type)
+            if min_span_s is not None:
+                conditions.append("r.span_us >= ?")
+                params.append(int(round(min_span_s * 1_000_000.0)))
+            if min_count is not None:
+                conditions.append("r.count >= ?")
+                params.append(int(min_count))
+            clauses.append(f"EXISTS (SELECT 1 FROM records r WHERE {' AND '.join(conditions)})")
+        if event_type is not None:
+            clauses.append("EXISTS (SELECT 1 FROM events e WHERE e.session_id = s.id AND e.type = ?)")
+            params.append(event_type)
+        if not include_errors:
+            clauses.append("s.error IS NULL")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT s.path, {', '.join(f's.{name}' for name in _SESSION_COLUMNS)}, s.error "
+            f"FROM sessions s {where} ORDER BY s.path",
+            params,
+        )
+        return [self._entry(row) for row in rows]
+
+    def record_stats(self, path: str | Path) -> dict[str, dict[str, int]]:
+        """Per record type `count`, `t_first_us`, `t_last_us` of one session (unknown types as `type_<id>`)."""
+        rows = self._conn.execute(
+            "SELECT r.type_id, r.name, r.count, r.t_first_us, r.t_last_us FROM records r "
+            "JOIN sessions s ON s.id = r.session_id WHERE s.path = ? ORDER BY r.type_id",
+            (str(Path(path).resolve()),),
+        )
+        return {
+            name or f"type_{type_id}": {"count": count, "t_first_us": t_first, "t_last_us": t_last}
+            for type_id, name, count, t_first, t_last in rows
+        }
+
+    def event_counts(self, path: str | Path) -> dict[str, int]:
+        """Event-type histogram of one session's `events.jsonl`."""
+        rows = self._conn.execute(
+            "SELECT e.type, e.count FROM events e JOIN sessions s ON s.id = e.session_id "
+            "WHERE s.path = ? ORDER BY e.type",
+            (str(Path(path).resolve()),),
+        )
+        return dict(rows)
+
+    def query(self, sql: str, params: Iterable[object] = ()) -> list[tuple[Any, ...]]:
+        """Run a read-only SQL query against the `sessions`, `records` and `events` tables."""
+        return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def __len__(self) -> int:
+        return int(self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0])
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> SessionCatalog:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _insert_session(self, session_dir: Path, fingerprint: str) -> None:
+        columns, records, events = _scan_session(session_dir, self._record_layouts)
+        names = ("path", *_SESSION_COLUMNS, "fingerprint", "error")
+        values = (str(session_dir), *(columns[name] for name in _SESSION_COLUMNS), fingerprint, columns["error"])
+        cursor = self._conn.execute(
+            f"INSERT INTO sessions ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+            values,
+        )
+        session_id = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT INTO records (session_id, type_id, name, count, t_first_us, t_last_us, span_us) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(session_id, *row) for row in records],
+        )
+        self._conn.executemany(
+            "INSERT INTO events (session_id, type, count, t_first_us, t_last_us) VALUES (?, ?, ?, ?, ?)",
+            [(session_id, *row) for row in events],
+        )
+
+    @staticmethod
+    def _entry(row: tuple[Any, ...]) -> CatalogEntry:
+        path, *values, error = row
+        fields = dict(zip(_SESSION_COLUMNS, values))
+        if fields["git_dirty"] is not None:
+            fields["git_dirty"] = bool(fields["git_dirty"])
+        return CatalogEntry(path=Path(path), error=error, **fields)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import re
+from typing import Any, Final, Iterable, Iterator
+
+import numpy as np
+
+# Placeholder in `EventLog.t_us` for events whose line has no `t_us` (see
+# `EventLog.t_us_valid`); such events only match queries without a time bound.
+MISSING_T_US: Final[int] = -1
+# Type of events whose line has no `type`.
+DEFAULT_EVENT_TYPE: Final[str] = "EVENT"
+
+# Event lines as written by the logger start with `t_us` then `type`; those are read
+# without a JSON parse. Each match spans one line, so `findall` yields one (t_us, type)
+# pair per line, empty for lines that need `json.loads` (other key order, escapes,
+# non-integer time) and for blank lines.
+_EVENT_LINE_RE: Final[re.Pattern[bytes]] = re.compile(
+    rb'(?:[ \t]*\{[ \t]*"t_us"[ \t]*:[ \t]*(\d+)[ \t]*,[ \t]*"type"[ \t]*:[ \t]*"([^"\\\n]*)")?[^\n]*(?:\n|\Z)'
+)
+
+
+@dataclass(frozen=True, slots=True)
+class EventLog:
+    """Columnar, lazily decoded `events.jsonl`.
+
+    `t_us` and `type_code` (indices into `types`, interned in first-appearance order)
+    are arrays in file order; `t_us_valid` is False for events without a `t_us`, whose
+    `t_us` entry is only a `MISSING_T_US` placeholder. `line_start`/`line_end` locate
+    each event's JSON line in `data`, which is only parsed when an event's payload is
+    requested. Per-type positions, untimed events first and then sorted by time, back
+    the `positions`/`active_at` lookups (binary search).
+    """
+
+    data: bytes
+    t_us: np.ndarray
+    t_us_valid: np.ndarray
+    type_code: np.ndarray
+    types: tuple[str, ...]
+    line_start: np.ndarray
+    line_end: np.ndarray
+    by_type: np.ndarray
+    type_bounds: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.t_us.shape[0])
+
+    def __getitem__(self, position: int) -> dict[str, Any]:
+        """Decode the payload (the full JSON object) of the event at `position`."""
+        return json.loads(self.data[int(self.line_start[position]) : int(self.line_end[position])])
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for position in range(len(self)):
+            yield self[position]
+
+    def type_of(self, position: int) -> str:
+        return self.types[int(self.type_code[position])]
+
+    def counts(self) -> dict[str, int]:
+        """Number of events per type, in first-appearance order."""
+        return {name: int(n) for name, n in zip(self.types, np.diff(self.type_bounds))}
+
+    def positions(
+        self,
+        event_type: str | Iterable[str] | None = None,
+        t_start_us: int | None = None,
+        t_end_us: int | None = None,
+    ) -> np.ndarray:
+        """File-order positions of events of `event_type` (one or several) in `[t_start_us, t_end_us)`."""
+        if event_type is None:
+            codes: Iterable[int] = range(len(self.types))
+        else:
+            names = {event_type} if isinstance(event_type, str) else set(event_type)
+            codes = [code for code, name in enumerate(self.types) if name in names]
+        parts = [self._type_positions(code, t_start_us, t_end_us) for code in codes]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts))
+
+    def select(
+        self,
+        event_type: str | Iterable[str] | None = None,
+        t_start_us: int | None = None,
+        t_end_us: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Decoded events matching `positions(event_type, t_start_us, t_end_us)`."""
+        return [self[position] for position in self.positions(event_type, t_start_us, t_end_us).tolist()]
+
+    def position_at(self, event_type: str, t_us: int) -> int | None:
+        """Position of the latest `event_type` event with `t_us` at or before `t_us` (file order breaks ties)."""
+        if event_type not in self.types:
+            return None
+        code = self.types.index(event_type)
+        lo, hi = int(self.type_bounds[code]), int(self.type_bounds[code + 1])
+        positions = self.by_type[lo:hi]
+        first = int(np.count_nonzero(~self.t_us_valid[positions]))
+        last = first + int(np.searchsorted(self.t_us[positions[first:]], int(t_us), side="right"))
+        return int(positions[last - 1]) if last > first else None
+
+    def active_at(self, event_type: str, t_us: int) -> dict[str, Any] | None:
+        """Latest `event_type` event at or before `t_us`, e.g. the `MODE_CHANGE` in effect."""
+        position = self.position_at(event_type, t_us)
+        return None if position is None else self[position]
+
+    def _type_positions(self, code: int, t_start_us: int | None, t_end_us: int | None) -> np.ndarray:
+        lo, hi = int(self.type_bounds[code]), int(self.type_bounds[code + 1])
+        positions = self.by_type[lo:hi]
+        if t_start_us is None and t_end_us is None:
+            return positions
+        positions = positions[int(np.count_nonzero(~self.t_us_valid[positions])) :]
+        type_t = self.t_us[positions]
+        start = 0 if t_start_us is None else int(np.searchsorted(type_t, int(t_start_us)))
+        end = positions.shape[0] if t_end_us is None else int(np.searchsorted(type_t, int(t_end_us)))
+        return positions[start : max(start, end)]
+
+
+def parse_event_log(data: bytes) -> EventLog:
+    """Index the events in an `events.jsonl` image (blank lines are skipped).
+
+    Raises:
+        ValueError: If a line that needs a full parse is not valid JSON.
+    """
+    newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+    line_start = np.concatenate(([0], newlines + 1))
+    line_end = np.concatenate((newlines, [len(data)]))
+    # A trailing empty match after the last line is dropped by the slice.
+    t_raw, type_raw = (list(column[: line_start.shape[0]]) for column in zip(*_EVENT_LINE_RE.findall(data)))
+
+    keep = np.ones(line_start.shape[0], dtype=bool)
+    timed = np.ones(line_start.shape[0], dtype=bool)
+    for line in [k for k, t in enumerate(t_raw) if not t]:
+        text = data[line_start[line] : line_end[line]].strip()
+        if not text:
+            keep[line] = False
+            continue
+        event = json.loads(text)
+        raw_t = event.get("t_us")
+        if raw_t is None:
+            timed[line] = False
+            raw_t = MISSING_T_US
+        t_raw[line] = str(int(raw_t)).encode("ascii")
+        type_raw[line] = str(event.get("type", DEFAULT_EVENT_TYPE)).encode("utf-8")
+
+    t_us = np.array(t_raw, dtype=np.bytes_)[keep].astype(np.int64)
+    t_us_valid = timed[keep]
+    names, first, inverse = np.unique(np.array(type_raw, dtype=np.bytes_)[keep], return_index=True, return_inverse=True)
+    # Intern type names in first-appearance order.
+    appearance = np.argsort(first, kind="stable")
+    code_of = np.empty(appearance.shape[0], dtype=np.int32)
+    code_of[appearance] = np.arange(appearance.shape[0], dtype=np.int32)
+    type_code = code_of[inverse.reshape(-1)]
+
+    # Untimed events lead each type. Stable: equal (type, t_us) keep file order, so the
+    # last of a tie is the latest event.
+    by_type = np.lexsort((t_us, t_us_valid, type_code))
+    type_bounds = np.searchsorted(type_code[by_type], np.arange(appearance.shape[0] + 1))
+    return EventLog(
+        data=data,
+        t_us=t_us,
+        t_us_valid=t_us_valid,
+        type_code=type_code,
+        types=tuple(names[code].decode("utf-8") for code in appearance),
+        line_start=line_start[keep],
+        line_end=line_end[keep],
+        by_type=by_type.astype(np.int64),
+        type_bounds=type_bounds.astype(np.int64),
+    )
+
+
+def read_event_log(path: str | Path) -> EventLog:
+    """Read and index `events.jsonl` (see `EventLog`); payloads are decoded on access."""
+    return parse_event_log(Path(path).read_bytes())
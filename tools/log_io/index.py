@@ -0,0 +1,875 @@
+from __future__ import annotations
+
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import json
+import mmap
+import os
+from pathlib import Path
+import struct
+from typing import Final, Mapping
+
+import numpy as np
+
+from .layout import (
+    ENDIAN_LITTLE,
+    FILE_HEADER_STRUCT,
+    MAGIC,
+    RECORD_HEADER_STRUCT,
+    RecordLayout,
+    layouts_for_schema,
+)
+
+# Header fields as a numpy dtype, for bulk decoding of the scanned record headers.
+RECORD_HEADER_DTYPE: Final[np.dtype] = np.dtype([("t_us", "<u8"), ("type_id", "<u2"), ("payload_len", "<u2")])
+# Only the `len` field is needed to walk from one record to the next.
+_RECORD_LEN_STRUCT = struct.Struct("<H")
+_RECORD_LEN_OFFSET = 10
+_RECORD_T_STRUCT = struct.Struct("<Q")
+# Header scan tuning: scalar records walked between bulk attempts, longest repeating
+# record-length pattern recognised, and records verified per bulk probe.
+_SCAN_MIN_WALK = 32
+_SCAN_MAX_WALK = 4096
+_SCAN_MAX_PERIOD = 256
+_SCAN_PROBE_RECORDS = 1 << 16
+# Parallel scan tuning: smallest byte range worth a worker, prefix scanned to learn
+# the (type, len) signatures of real headers, bytes searched for a resync point, and
+# consecutive plausible headers required to accept one.
+_PARALLEL_MIN_RANGE_BYTES = 1 << 20
+_RESYNC_PROBE_BYTES = 1 << 16
+_RESYNC_WINDOWS = (1 << 12, 1 << 17)
+_RESYNC_CHAIN = 8
+# Recover mode: an unknown-type record is only plausible with a payload of at most
+# this many bytes and a `t_us` no earlier than, and at most this far after, the
+# previous record's.
+_RECOVER_MAX_UNKNOWN_LEN = 1024
+_RECOVER_MAX_UNKNOWN_GAP_US = 60_000_000
+
+INDEX_SUFFIX: Final[str] = ".idx"
+# Sidecar layout: magic[8], format version[uint32], JSON directory length[uint32], JSON
+# directory, then 8-byte aligned raw arrays described by the directory.
+_INDEX_MAGIC = b"USVIDX\x00\x00"
+_INDEX_VERSION = 2
+_INDEX_HEADER_STRUCT = struct.Struct("<8sII")
+_INDEX_ARRAYS = ("payload_offset", "t_us", "type_id", "payload_len", "type_order", "type_table")
+_TYPE_TABLE_DTYPE = np.dtype(
+    [
+        ("type_id", "<u2"),
+        ("start", "<i8"),
+        ("count", "<i8"),
+        ("first_position", "<i8"),
+        ("t_first_us", "<u8"),
+        ("t_last_us", "<u8"),
+    ]
+)
+
+
+@dataclass(frozen=True, slots=True)
+class TimeseriesIndex:
+    """Record header index of one `timeseries.bin`.
+
+    Per-record arrays are in file order. `type_order` lists record positions grouped by
+    type (file order within a type) and `type_table` holds each type's slice of it plus
+    count and first/last `t_us`. `file_size`/`file_mtime_ns` fingerprint the source file.
+    `t_us_sorted` records whether `t_us` is non-decreasing in file order, which lets
+    time-window lookups bisect instead of filtering.
+    """
+
+    fw_model_schema: int
+    t0_us: int
+    file_size: int
+    file_mtime_ns: int
+    payload_offset: np.ndarray
+    t_us: np.ndarray
+    type_id: np.ndarray
+    payload_len: np.ndarray
+    type_order: np.ndarray
+    type_table: np.ndarray
+    error: str | None = None
+    t_us_sorted: bool = True
+
+    def __len__(self) -> int:
+        return int(self.payload_offset.shape[0])
+
+    @property
+    def record_counts(self) -> dict[int, int]:
+        return {int(row["type_id"]): int(row["count"]) for row in self.type_table}
+
+    def positions(
+        self,
+        type_id: int,
+        t_start_us: int | None = None,
+        t_end_us: int | None = None,
+    ) -> np.ndarray:
+        """Return file-order positions of records of `type_id`, optionally in `[t_start_us, t_end_us)`."""
+        rows = self.type_table[self.type_table["type_id"] == type_id]
+        if rows.shape[0] == 0:
+            return np.empty(0, dtype=np.int64)
+        start = int(rows["start"][0])
+        positions = self.type_order[start : start + int(rows["count"][0])]
+        if t_start_us is None and t_end_us is None:
+            return positions
+        if self.t_us_sorted:
+            lo, hi = self.window(t_start_us, t_end_us)
+            return positions[np.searchsorted(positions, lo) : np.searchsorted(positions, hi)]
+        return positions[_in_window(self.t_us[positions], t_start_us, t_end_us)]
+
+    def window(self, t_start_us: int | None = None, t_end_us: int | None = None) -> tuple[int, int]:
+        """Return the position range `[lo, hi)` of records with `t_start_us <= t_us < t_end_us`.
+
+        Uses binary search, so it requires `t_us_sorted`.
+        """
+        if not self.t_us_sorted:
+            raise ValueError("record t_us is not monotonic; filter by positions() instead")
+        # uint64 needles keep searchsorted from casting the whole `t_us` array.
+        lo = 0 if t_start_us is None else int(np.searchsorted(self.t_us, np.uint64(max(0, int(t_start_us)))))
+        hi = len(self) if t_end_us is None else int(np.searchsorted(self.t_us, np.uint64(max(0, int(t_end_us)))))
+        return lo, max(lo, hi)
+
+    def is_stale(self, path: str | Path) -> bool:
+        """True if `path` no longer matches the size/mtime this index was built from."""
+        st = os.stat(path)
+        return st.st_size != self.file_size or st.st_mtime_ns != self.file_mtime_ns
+
+
+@dataclass(frozen=True, slots=True)
+class RecordTypeStats:
+    """Header statistics of one record type (see `scan_timeseries_bin`).
+
+    `name` is None for types without a layout. Gaps are measured between consecutive
+    records of the type in file order; `max_gap_t_us` is the time of the record that
+    precedes the largest gap. `payload_len_mismatches` counts records whose `len`
+    differs from the layout size (always 0 for unknown types).
+    """
+
+    type_id: int
+    name: str | None
+    count: int
+    t_first_us: int
+    t_last_us: int
+    max_gap_us: int
+    max_gap_t_us: int
+    payload_len_min: int
+    payload_len_max: int
+    payload_len_mismatches: int
+
+    @property
+    def span_us(self) -> int:
+        return self.t_last_us - self.t_first_us
+
+    @property
+    def rate_hz(self) -> float:
+        """Mean record rate over the type's span (0.0 for fewer than two records)."""
+        return (self.count - 1) * 1e6 / self.span_us if self.count > 1 and self.span_us > 0 else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class TimeseriesStats:
+    """Header-only summary of a `timeseries.bin` (see `scan_timeseries_bin`).
+
+    `types` maps type ID to its statistics in ascending ID order. `max_gap_us` is the
+    largest step between consecutive records of any type, i.e. a stall of the whole
+    logger such as a `LOG_OVERFLOW`. `error` reports a truncated tail.
+    """
+
+    fw_model_schema: int
+    t0_us: int
+    file_size: int
+    record_count: int
+    payload_bytes: int
+    t_first_us: int | None
+    t_last_us: int | None
+    max_gap_us: int
+    max_gap_t_us: int | None
+    t_us_sorted: bool
+    types: dict[int, RecordTypeStats]
+    error: str | None = None
+
+    @property
+    def record_counts(self) -> dict[str, int]:
+        """Counts of known record types by name, as in `TimeseriesData.record_counts`."""
+        return {stats.name: stats.count for stats in self.types.values() if stats.name is not None}
+
+    @property
+    def unknown_types(self) -> dict[int, RecordTypeStats]:
+        return {type_id: stats for type_id, stats in self.types.items() if stats.name is None}
+
+
+def _in_window(t_us: np.ndarray, t_start_us: int | None, t_end_us: int | None) -> np.ndarray:
+    mask = np.ones(t_us.shape[0], dtype=bool)
+    if t_start_us is not None:
+        mask &= t_us >= np.uint64(max(0, int(t_start_us)))
+    if t_end_us is not None:
+        mask &= t_us < np.uint64(max(0, int(t_end_us)))
+    return mask
+
+
+def index_path_for(path: str | Path) -> Path:
+    """Sidecar location for `path`, e.g. `timeseries.bin` -> `timeseries.idx`."""
+    return Path(path).with_suffix(INDEX_SUFFIX)
+
+
+def _map_file(path: str | Path):
+    """Map `path` read-only; the mapping stays alive as long as any array views it."""
+    with Path(path).open("rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return b""  # mmap rejects empty files; header validation reports it.
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _unpack_file_header(data) -> tuple[int, int]:
+    """Validate the fixed file header and return `(fw_model_schema, t0_us)`."""
+    if len(data) < FILE_HEADER_STRUCT.size:
+        raise ValueError(
+            f"timeseries file too small: {len(data)} bytes, expected at least {FILE_HEADER_STRUCT.size}"
+        )
+
+    magic_raw, fw_model_schema, endianness_id, t0_us = FILE_HEADER_STRUCT.unpack_from(data, 0)
+    if magic_raw != MAGIC:
+        raise ValueError(f"invalid magic: got {magic_raw!r}, expected {MAGIC!r}")
+    if endianness_id != ENDIAN_LITTLE:
+        raise ValueError(f"unsupported endianness id: {endianness_id}")
+    return int(fw_model_schema), int(t0_us)
+
+
+def index_timeseries_buffer(
+    data,
+    *,
+    file_size: int | None = None,
+    file_mtime_ns: int = 0,
+    stop_t_us: int | None = None,
+    workers: int = 1,
+) -> TimeseriesIndex:
+    """Build a `TimeseriesIndex` over an in-memory or mapped `timeseries.bin` image.
+
+    `stop_t_us` ends the scan early once records reach that time; such a partial index
+    covers every record before `stop_t_us` but must not be persisted as a sidecar.
+    With `workers > 1`, large images are scanned as parallel byte ranges (see
+    `_scan_record_headers_parallel`); the index is identical to a sequential scan.
+    """
+    fw_model_schema, t0_us = _unpack_file_header(data)
+    header_offsets, headers, error = _scan_record_headers_parallel(data, FILE_HEADER_STRUCT.size, workers, stop_t_us)
+    return _index_from_scan(
+        header_offsets,
+        headers,
+        error,
+        fw_model_schema=fw_model_schema,
+        t0_us=t0_us,
+        file_size=len(data) if file_size is None else int(file_size),
+        file_mtime_ns=file_mtime_ns,
+    )
+
+
+def recover_timeseries_index(
+    data,
+    record_layouts: Mapping[int, RecordLayout],
+    *,
+    strict_payload_len: bool = True,
+    file_size: int | None = None,
+    file_mtime_ns: int = 0,
+) -> tuple[TimeseriesIndex, np.ndarray]:
+    """Index a possibly corrupt `timeseries.bin` image, resynchronizing past bad data.
+
+    Only the file header must be intact. See `_recover_record_headers` for what counts
+    as corrupt and how the next record boundary is found.
+
+    Returns:
+        The index of all recovered records (its `error` is always None) and the skipped
+        `[start, end)` file byte ranges as an `(n, 2)` int64 array.
+    """
+    fw_model_schema, t0_us = _unpack_file_header(data)
+    header_offsets, headers, skipped = _recover_record_headers(
+        data, FILE_HEADER_STRUCT.size, record_layouts, strict_payload_len
+    )
+    index = _index_from_scan(
+        header_offsets,
+        headers,
+        None,
+        fw_model_schema=fw_model_schema,
+        t0_us=t0_us,
+        file_size=len(data) if file_size is None else int(file_size),
+        file_mtime_ns=file_mtime_ns,
+    )
+    return index, skipped
+
+
+def _index_from_scan(
+    header_offsets: np.ndarray,
+    headers: np.ndarray,
+    error: str | None,
+    *,
+    fw_model_schema: int,
+    t0_us: int,
+    file_size: int,
+    file_mtime_ns: int,
+) -> TimeseriesIndex:
+    type_id = headers["type_id"]
+    t_us = headers["t_us"]
+
+    type_order = np.argsort(type_id, kind="stable")
+    grouped = np.ascontiguousarray(type_id)[type_order]
+    # `grouped` is sorted, so each type starts where the value changes.
+    if grouped.shape[0]:
+        starts = np.flatnonzero(np.concatenate(([True], grouped[1:] != grouped[:-1])))
+    else:
+        starts = np.empty(0, dtype=np.int64)
+    present = grouped[starts]
+    counts = np.diff(np.append(starts, grouped.shape[0]))
+    type_table = np.empty(present.shape[0], dtype=_TYPE_TABLE_DTYPE)
+    type_table["type_id"] = present
+    type_table["start"] = starts
+    type_table["count"] = counts
+    type_table["first_position"] = type_order[starts]
+    type_table["t_first_us"] = t_us[type_order[starts]]
+    type_table["t_last_us"] = t_us[type_order[starts + counts - 1]]
+
+    return TimeseriesIndex(
+        fw_model_schema=fw_model_schema,
+        t0_us=t0_us,
+        file_size=int(file_size),
+        file_mtime_ns=int(file_mtime_ns),
+        payload_offset=header_offsets + RECORD_HEADER_STRUCT.size,
+        t_us=t_us,
+        type_id=type_id,
+        payload_len=headers["payload_len"],
+        type_order=type_order,
+        type_table=type_table,
+        error=error,
+        t_us_sorted=bool(np.all(t_us[1:] >= t_us[:-1])),
+    )
+
+
+def build_timeseries_index(path: str | Path) -> TimeseriesIndex:
+    """Scan `path` (memory-mapped) and return its record index without touching the sidecar."""
+    with Path(path).open("rb") as fh:
+        st = os.fstat(fh.fileno())
+    data = _map_file(path)
+    return index_timeseries_buffer(data, file_size=st.st_size, file_mtime_ns=st.st_mtime_ns)
+
+
+def write_timeseries_index(index: TimeseriesIndex, index_path: str | Path) -> None:
+    """Persist `index` atomically (write to a temp file, then rename)."""
+    directory: dict[str, object] = {
+        "fw_model_schema": index.fw_model_schema,
+        "t0_us": index.t0_us,
+        "file_size": index.file_size,
+        "file_mtime_ns": index.file_mtime_ns,
+        "error": index.error,
+        "t_us_sorted": index.t_us_sorted,
+        "arrays": {},
+    }
+    arrays = {name: np.ascontiguousarray(getattr(index, name)) for name in _INDEX_ARRAYS}
+    offset = 0
+    for name, values in arrays.items():
+        directory["arrays"][name] = {"dtype": values.dtype.descr, "offset": offset, "count": int(values.shape[0])}
+        offset += -(-values.nbytes // 8) * 8
+    directory_raw = json.dumps(directory, separators=(",", ":")).encode("utf-8")
+    data_start = -(-(_INDEX_HEADER_STRUCT.size + len(directory_raw)) // 8) * 8
+
+    index_path = Path(index_path)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with tmp_path.open("wb") as fh:
+        fh.write(_INDEX_HEADER_STRUCT.pack(_INDEX_MAGIC, _INDEX_VERSION, len(directory_raw)))
+        fh.write(directory_raw)
+        for name, values in arrays.items():
+            fh.seek(data_start + int(directory["arrays"][name]["offset"]))
+            fh.write(values.tobytes())
+        fh.truncate(data_start + offset)
+    os.replace(tmp_path, index_path)
+
+
+def read_timeseries_index(index_path: str | Path) -> TimeseriesIndex:
+    """Open a sidecar index; arrays are read-only views into a memory mapping."""
+    data = _map_file(index_path)
+    if len(data) < _INDEX_HEADER_STRUCT.size:
+        raise ValueError(f"index file too small: {index_path}")
+    magic, version, directory_len = _INDEX_HEADER_STRUCT.unpack_from(data, 0)
+    if magic != _INDEX_MAGIC or version != _INDEX_VERSION:
+        raise ValueError(f"unsupported index file: magic={magic!r}, version={version}")
+    directory_end = _INDEX_HEADER_STRUCT.size + directory_len
+    directory = json.loads(bytes(data[_INDEX_HEADER_STRUCT.size : directory_end]).decode("utf-8"))
+    data_start = -(-directory_end // 8) * 8
+
+    arrays: dict[str, np.ndarray] = {}
+    for name in _INDEX_ARRAYS:
+        entry = directory["arrays"][name]
+        dtype = np.dtype([tuple(field) for field in entry["dtype"]]) if name == "type_table" else np.dtype(entry["dtype"][0][1])
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=entry["count"], offset=data_start + entry["offset"])
+
+    return TimeseriesIndex(
+        fw_model_schema=int(directory["fw_model_schema"]),
+        t0_us=int(directory["t0_us"]),
+        file_size=int(directory["file_size"]),
+        file_mtime_ns=int(directory["file_mtime_ns"]),
+        error=directory["error"],
+        t_us_sorted=bool(directory["t_us_sorted"]),
+        **arrays,
+    )
+
+
+def load_timeseries_index(path: str | Path, *, write: bool = True) -> TimeseriesIndex:
+    """Return the index for `path`, reusing its sidecar when fresh.
+
+    A missing, unreadable or stale sidecar (size/mtime mismatch) is rebuilt by a header
+    scan and, if `write` is True, saved next to `path` for later opens.
+    """
+    index_path = index_path_for(path)
+    if index_path.exists():
+        try:
+            index = read_timeseries_index(index_path)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        else:
+            if not index.is_stale(path):
+                return index
+
+    index = build_timeseries_index(path)
+    if write:
+        try:
+            write_timeseries_index(index, index_path)
+        except OSError:
+            pass  # read-only media: the index still serves this open.
+    return index
+
+
+def scan_timeseries_bin(
+    path: str | Path,
+    *,
+    record_layouts: Mapping[int, RecordLayout] | None = None,
+    use_index: bool = False,
+    workers: int = 1,
+) -> TimeseriesStats:
+    """Summarize `path` from its record headers alone; no payload byte is decoded.
+
+    The memory-mapped file is walked with the same vectorized header scan as
+    `read_timeseries_bin`, and all statistics are computed with array reductions. A
+    truncated tail is reported in `TimeseriesStats.error` instead of raising.
+
+    Args:
+        path: Path to `timeseries.bin`.
+        record_layouts: Layouts used to name types and check payload lengths; by default
+            those registered for the file's `fw_model_schema`.
+        use_index: If True, take the headers from the `timeseries.idx` sidecar (built
+            on first use, rebuilt when stale).
+        workers: Threads used to scan large files (see `index_timeseries_buffer`).
+
+    Returns:
+        Per-type counts, spans, rates, maximum gaps and payload length checks.
+    """
+    if use_index:
+        index = load_timeseries_index(path)
+    else:
+        with Path(path).open("rb") as fh:
+            st = os.fstat(fh.fileno())
+        index = index_timeseries_buffer(
+            _map_file(path), file_size=st.st_size, file_mtime_ns=st.st_mtime_ns, workers=workers
+        )
+
+    layouts = layouts_for_schema(index.fw_model_schema) if record_layouts is None else record_layouts
+    count = len(index)
+    # Header fields are strided views into the file; compact copies gather much faster.
+    t_us = np.ascontiguousarray(index.t_us)
+    type_ids = np.ascontiguousarray(index.type_id)
+    # uint64 differences viewed as int64 are the signed steps (times are below 2**63).
+    step = np.diff(t_us).view(np.int64)
+    overall_gap = int(np.argmax(step)) if step.shape[0] else -1
+    max_gap_us = max(0, int(step[overall_gap])) if overall_gap >= 0 else 0
+
+    # Payload lengths: only records of unknown types or with a mismatching `len` are
+    # inspected individually; every other record has its layout's size.
+    expected = _expected_payload_lengths(layouts)
+    irregular = np.flatnonzero(expected[type_ids] != index.payload_len)
+    irregular_type = type_ids[irregular]
+    irregular_len = index.payload_len[irregular]
+
+    types: dict[int, RecordTypeStats] = {}
+    if count:
+        order = index.type_order
+        type_t = t_us[order]
+        # Gap before each record of its own type, in file order within the type.
+        gaps = np.empty(count, dtype=np.int64)
+        gaps[0] = 0
+        gaps[1:] = np.diff(type_t).view(np.int64)
+        for row in index.type_table:
+            type_id = int(row["type_id"])
+            start, n = int(row["start"]), int(row["count"])
+            gap_at = start + 1 + int(np.argmax(gaps[start + 1 : start + n])) if n > 1 else start
+            type_gap = max(0, int(gaps[gap_at])) if n > 1 else 0
+            layout = layouts.get(type_id)
+            lens = irregular_len[irregular_type == type_id]
+            mismatches = int(lens.shape[0]) if layout is not None else 0
+            if lens.shape[0] == n:
+                len_min, len_max = int(lens.min()), int(lens.max())
+            else:
+                size = int(expected[type_id])
+                len_min = min(size, int(lens.min())) if lens.shape[0] else size
+                len_max = max(size, int(lens.max())) if lens.shape[0] else size
+            types[type_id] = RecordTypeStats(
+                type_id=type_id,
+                name=None if layout is None else layout.name,
+                count=n,
+                t_first_us=int(row["t_first_us"]),
+                t_last_us=int(row["t_last_us"]),
+                max_gap_us=type_gap,
+                max_gap_t_us=int(type_t[gap_at - 1]) if type_gap > 0 else int(row["t_first_us"]),
+                payload_len_min=len_min,
+                payload_len_max=len_max,
+                payload_len_mismatches=mismatches,
+            )
+
+    return TimeseriesStats(
+        fw_model_schema=index.fw_model_schema,
+        t0_us=index.t0_us,
+        file_size=index.file_size,
+        record_count=count,
+        payload_bytes=int(index.payload_len.sum(dtype=np.int64)),
+        t_first_us=int(t_us.min()) if count else None,
+        t_last_us=int(t_us.max()) if count else None,
+        max_gap_us=max_gap_us,
+        max_gap_t_us=int(t_us[overall_gap]) if max_gap_us > 0 else None,
+        t_us_sorted=index.t_us_sorted,
+        types=types,
+        error=index.error,
+    )
+
+
+def _scan_record_headers(
+    data,
+    start: int,
+    stop_t_us: int | None = None,
+    base_offset: int = 0,
+) -> tuple[np.ndarray, np.ndarray, str | None]:
+    """First pass: walk the TLV stream touching only the `len` field of each header.
+
+    Logs written by a fixed-rate logger repeat the same sequence of record lengths, so
+    once a repeating pattern is seen the next offsets are predicted in bulk and accepted
+    up to the first record whose `len` field disagrees; irregular stretches fall back to
+    a scalar walk. A truncated trailing record stops the scan and is reported via
+    `error` so callers can decide whether to raise or tolerate it. With `stop_t_us`,
+    the scan also stops soon after the first record at or past that time (relying on
+    monotonic `t_us`); records beyond it may or may not be included.
+
+    Returns record header offsets, the decoded headers, and the truncation error.
+    `base_offset` is the file offset of `data[0]`, used only in error messages.
+    """
+    n = len(data)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    header_size = RECORD_HEADER_STRUCT.size
+    unpack_len = _RECORD_LEN_STRUCT.unpack_from
+    chunks: list[np.ndarray] = []
+    walked = array("q")
+    recent_lens: list[int] = []
+    error: str | None = None
+
+    offset = start
+    walk_budget = _SCAN_MIN_WALK
+    while offset < n and error is None:
+        for _ in range(walk_budget):
+            if offset >= n:
+                break
+            if offset + header_size > n:
+                error = f"truncated record header at byte offset {base_offset + offset}"
+                break
+            (payload_len,) = unpack_len(data, offset + _RECORD_LEN_OFFSET)
+            payload_end = offset + header_size + payload_len
+            if payload_end > n:
+                _, rec_type, _ = RECORD_HEADER_STRUCT.unpack_from(data, offset)
+                error = (
+                    f"truncated payload for type={rec_type} at byte offset {base_offset + offset + header_size}: "
+                    f"need {payload_len}, have {n - offset - header_size}"
+                )
+                break
+            walked.append(offset)
+            recent_lens.append(payload_len)
+            offset = payload_end
+        if offset >= n or error is not None:
+            break
+        if stop_t_us is not None and walked and _record_t_us(data, walked[-1]) >= stop_t_us:
+            break
+
+        del recent_lens[: -2 * _SCAN_MAX_PERIOD]
+        period = _find_length_period(recent_lens)
+        accepted = 0
+        if period:
+            pattern = np.asarray(recent_lens[-period:], dtype=np.int64)
+            predicted = _extend_periodic_offsets(buf, offset, pattern, stop_t_us)
+            accepted = int(predicted.shape[0])
+            if accepted:
+                chunks.append(np.frombuffer(walked, dtype=np.int64))
+                chunks.append(predicted)
+                walked = array("q")
+                phase = accepted % period
+                offset = int(predicted[-1]) + header_size + int(pattern[(accepted - 1) % period])
+                recent_lens = np.tile(np.roll(pattern, -phase), 2).tolist()
+                if stop_t_us is not None and _record_t_us(data, int(predicted[-1])) >= stop_t_us:
+                    break
+        # Step over the irregular record that ended the run; back off if runs stay short.
+        walk_budget = _SCAN_MIN_WALK if accepted >= _SCAN_MIN_WALK else min(2 * walk_budget, _SCAN_MAX_WALK)
+
+    chunks.append(np.frombuffer(walked, dtype=np.int64))
+    header_offsets = np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+    return header_offsets, _gather_structs(buf, header_offsets, RECORD_HEADER_DTYPE), error
+
+
+def _scan_record_headers_parallel(
+    data,
+    start: int,
+    workers: int,
+    stop_t_us: int | None = None,
+) -> tuple[np.ndarray, np.ndarray, str | None]:
+    """`_scan_record_headers` over `workers` byte ranges scanned concurrently.
+
+    Each range after the first starts at a guessed record boundary (see
+    `_guess_record_boundary`) and is scanned only up to the next range's start. The
+    ranges are then chained: a range is accepted only if the previous one ended exactly
+    where it starts, which by induction from `start` makes it a true record boundary. A
+    range whose guess was wrong is rescanned from the real boundary, so the result always
+    matches a sequential scan, errors included (only the last range can be truncated).
+    """
+    n = len(data)
+    if workers <= 1 or n - start < 2 * _PARALLEL_MIN_RANGE_BYTES:
+        return _scan_record_headers(data, start, stop_t_us)
+    workers = min(workers, (n - start) // _PARALLEL_MIN_RANGE_BYTES)
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    view = memoryview(data)
+    _, probe_headers, _ = _scan_record_headers(view[: min(n, start + _RESYNC_PROBE_BYTES)], start)
+    signatures = np.unique((probe_headers["type_id"].astype(np.int64) << 16) | probe_headers["payload_len"])
+
+    bounds = [start]
+    for k in range(1, workers):
+        guess = _guess_record_boundary(buf, start + k * (n - start) // workers, signatures)
+        if guess is not None and guess > bounds[-1]:
+            bounds.append(guess)
+    bounds.append(n)
+    ranges = list(zip(bounds[:-1], bounds[1:]))
+
+    def scan_range(lo: int, hi: int):
+        return _scan_record_headers(data if hi == n else view[:hi], lo, stop_t_us)
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        scans = list(pool.map(lambda bounds_: scan_range(*bounds_), ranges))
+
+    offsets_parts: list[np.ndarray] = []
+    headers_parts: list[np.ndarray] = []
+    error: str | None = None
+    offset = start
+    for (lo, hi), (header_offsets, headers, range_error) in zip(ranges, scans):
+        if lo != offset:
+            header_offsets, headers, range_error = scan_range(offset, hi)
+        offsets_parts.append(header_offsets)
+        headers_parts.append(headers)
+        if header_offsets.shape[0]:
+            offset = int(header_offsets[-1]) + RECORD_HEADER_STRUCT.size + int(headers["payload_len"][-1])
+        if hi == n:
+            error = range_error
+            break
+        if range_error is None and offset < hi:
+            break  # stopped at stop_t_us
+    return np.concatenate(offsets_parts), np.concatenate(headers_parts), error
+
+
+def _guess_record_boundary(
+    buf: np.ndarray,
+    offset: int,
+    signatures: np.ndarray,
+    windows: tuple[int, ...] = _RESYNC_WINDOWS,
+    min_t_us: int = 0,
+) -> int | None:
+    """First offset at or after `offset` that starts `_RESYNC_CHAIN` plausible records.
+
+    A header is plausible if its (type, len) pair is in `signatures` and its `t_us` is at
+    least `min_t_us` and does not go backwards along the chain; a chain that ends exactly
+    at the end of `buf` is complete. This is only a guess; callers verify it.
+    """
+    n = int(buf.shape[0])
+    header_size = RECORD_HEADER_STRUCT.size
+    for window in windows:
+        candidates = np.arange(offset, min(offset + window, n - header_size + 1), dtype=np.int64)
+        alive = np.ones(candidates.shape[0], dtype=bool)
+        current = candidates.copy()
+        previous_t = np.full(candidates.shape[0], min_t_us, dtype=np.uint64)
+        for _ in range(_RESYNC_CHAIN):
+            ended = current == n
+            alive &= ended | (current + header_size <= n)
+            reading = alive & ~ended
+            at = np.where(reading, current, 0)[:, None] + np.arange(header_size, dtype=np.int64)
+            headers = buf[at].view(RECORD_HEADER_DTYPE).reshape(-1)
+            signature = (headers["type_id"].astype(np.int64) << 16) | headers["payload_len"]
+            alive &= ended | (np.isin(signature, signatures) & (headers["t_us"] >= previous_t))
+            previous_t = np.where(reading, headers["t_us"], previous_t)
+            current = np.where(reading, current + header_size + headers["payload_len"], current)
+        if bool(alive.any()):
+            return int(candidates[int(np.argmax(alive))])
+    return None
+
+
+def _expected_payload_lengths(layouts: Mapping[int, RecordLayout]) -> np.ndarray:
+    """Payload size by type ID (-1 for types without a layout), for vectorized lookups."""
+    expected = np.full(1 << 16, -1, dtype=np.int32)
+    for type_id, layout in layouts.items():
+        expected[int(type_id)] = layout.payload_struct.size
+    return expected
+
+
+def _recover_record_headers(
+    data,
+    start: int,
+    layouts: Mapping[int, RecordLayout],
+    strict_payload_len: bool = True,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """`_scan_record_headers` that steps over corrupt data instead of stopping at it.
+
+    A run of records ends at a truncated record, at the first known record with an
+    unusable `len` (see `strict_payload_len`) or at the first implausible unknown
+    record: one whose `len` exceeds `_RECOVER_MAX_UNKNOWN_LEN` or whose `t_us` goes
+    back from, or jumps more than `_RECOVER_MAX_UNKNOWN_GAP_US` past, the previous
+    record's (a misaligned header reads as such). Unknown records right before a bad
+    record are dropped as well, since a damaged header usually reads as an unknown
+    type and misplaces the following ones. Scanning resumes at the next offset
+    that starts a chain of plausible records: known types with their exact payload size
+    and `t_us` non-decreasing from the last kept record.
+
+    Returns record header offsets, the decoded headers and the skipped `[start, end)`
+    byte ranges as an `(n, 2)` int64 array.
+    """
+    n = len(data)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    expected = _expected_payload_lengths(layouts)
+    known_ids = np.flatnonzero(expected >= 0)
+    signatures = np.unique((known_ids.astype(np.int64) << 16) | expected[known_ids])
+    header_size = RECORD_HEADER_STRUCT.size
+
+    offsets_parts: list[np.ndarray] = []
+    headers_parts: list[np.ndarray] = []
+    skipped: list[tuple[int, int]] = []
+    offset = start
+    t_last: int | None = None
+    while offset < n:
+        header_offsets, headers, error = _scan_record_headers(data, offset)
+        size = expected[headers["type_id"]]
+        payload_len = headers["payload_len"].astype(np.int32)
+        bad_len = (size >= 0) & ((payload_len != size) if strict_payload_len else (payload_len < size))
+        t_us = headers["t_us"]
+        t_prev = np.empty_like(t_us)
+        t_prev[1:] = t_us[:-1]
+        if t_us.shape[0]:
+            t_prev[0] = t_us[0] if t_last is None else t_last
+        # Unsigned: a backwards step wraps around and fails the gap test too.
+        implausible = (size < 0) & (
+            (payload_len > _RECOVER_MAX_UNKNOWN_LEN)
+            | (t_us < t_prev)
+            | (t_us - t_prev > np.uint64(_RECOVER_MAX_UNKNOWN_GAP_US))
+        )
+        bad = bad_len | implausible
+        if bool(bad.any()):
+            keep = int(np.argmax(bad))
+            while keep > 0 and size[keep - 1] < 0:
+                keep -= 1
+        elif error is not None:
+            keep = int(header_offsets.shape[0])
+        else:
+            offsets_parts.append(header_offsets)
+            headers_parts.append(headers)
+            break
+        offsets_parts.append(header_offsets[:keep])
+        headers_parts.append(headers[:keep])
+        if keep:
+            t_last = int(headers["t_us"][keep - 1])
+        if keep < header_offsets.shape[0]:
+            bad_at = int(header_offsets[keep])
+        elif keep:
+            bad_at = int(header_offsets[-1]) + header_size + int(headers["payload_len"][-1])
+        else:
+            bad_at = offset
+
+        resume = None
+        search = bad_at + 1
+        while resume is None and search <= n - header_size:
+            resume = _guess_record_boundary(buf, search, signatures, _RESYNC_WINDOWS[-1:], t_last or 0)
+            search += _RESYNC_WINDOWS[-1]
+        skipped.append((bad_at, n if resume is None else resume))
+        if resume is None:
+            break
+        offset = resume
+
+    header_offsets = np.concatenate(offsets_parts) if offsets_parts else np.empty(0, dtype=np.int64)
+    headers = np.concatenate(headers_parts) if headers_parts else np.empty(0, dtype=RECORD_HEADER_DTYPE)
+    return header_offsets, headers, np.array(skipped, dtype=np.int64).reshape(-1, 2)
+
+
+def _record_t_us(data, header_offset: int) -> int:
+    return _RECORD_T_STRUCT.unpack_from(data, header_offset)[0]
+
+
+def _find_length_period(lens: list[int]) -> int:
+    window = len(lens)
+    for period in range(1, min(_SCAN_MAX_PERIOD, window // 2) + 1):
+        span = max(2 * period, min(window, _SCAN_MIN_WALK))
+        if lens[-span:-period] == lens[-span + period :]:
+            return period
+    return 0
+
+
+def _extend_periodic_offsets(
+    buf: np.ndarray,
+    offset: int,
+    pattern: np.ndarray,
+    stop_t_us: int | None = None,
+) -> np.ndarray:
+    """Predict record header offsets from `offset` assuming `pattern` of payload lengths repeats.
+
+    Returns the verified prefix: every returned offset holds a header whose `len` matches
+    the prediction, which by induction makes it a true record boundary.
+    """
+    n = int(buf.shape[0])
+    header_size = RECORD_HEADER_STRUCT.size
+    record_sizes = pattern + header_size
+    frame_size = int(record_sizes.sum())
+    within_frame = np.concatenate(([0], np.cumsum(record_sizes)[:-1]))
+    frames_per_probe = max(1, _SCAN_PROBE_RECORDS // pattern.shape[0])
+
+    accepted: list[np.ndarray] = []
+    while True:
+        n_frames = min(frames_per_probe, (n - offset) // frame_size + 1)
+        candidates = (offset + frame_size * np.arange(n_frames, dtype=np.int64)[:, None] + within_frame).ravel()
+        expected_len = np.tile(pattern, n_frames)
+        in_bounds = candidates + header_size + expected_len <= n
+        limit = int(candidates.shape[0]) if bool(in_bounds.all()) else int(np.argmin(in_bounds))
+        candidates = candidates[:limit]
+        len_pos = candidates + _RECORD_LEN_OFFSET
+        actual_len = buf[len_pos].astype(np.int64) | (buf[len_pos + 1].astype(np.int64) << 8)
+        mismatch = actual_len != expected_len[:limit]
+        good = int(np.argmax(mismatch)) if bool(mismatch.any()) else limit
+        accepted.append(candidates[:good])
+        if good < n_frames * pattern.shape[0] or good == 0:
+            break
+        if stop_t_us is not None and _record_t_us(buf, int(candidates[good - 1])) >= stop_t_us:
+            break
+        offset += n_frames * frame_size
+    return np.concatenate(accepted) if len(accepted) > 1 else accepted[0]
+
+
+def _gather_structs(buf: np.ndarray, offsets: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """Second pass: view `dtype` records starting at `offsets` of a uint8 buffer.
+
+    Evenly spaced records (the common case for a fixed logging frame) are returned as
+    a zero-copy strided view; otherwise the records are gathered with fancy indexing.
+    """
+    count = int(offsets.shape[0])
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    first = int(offsets[0])
+    stride = int(offsets[1] - offsets[0]) if count > 1 else dtype.itemsize
+    if stride > 0 and (count < 3 or bool(np.all(np.diff(offsets) == stride))):
+        return np.ndarray(shape=(count,), dtype=dtype, buffer=buf, offset=first, strides=(stride,))
+    # One opaque `itemsize`-byte item starting at every byte: a row gather copies whole
+    # structs instead of indexing each byte.
+    windows = np.ndarray(
+        shape=(buf.shape[0] - dtype.itemsize + 1,),
+        dtype=np.dtype((np.void, dtype.itemsize)),
+        buffer=buf,
+        strides=(1,),
+    )
+    return windows[offsets].view(dtype)
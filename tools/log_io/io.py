@@ -1,20 +1,50 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import lru_cache, partial
+import json
+import lzma
+import os
 from pathlib import Path
-from typing import Mapping
+from typing import Callable, Iterable, Iterator, Mapping, TypeVar
+import zlib
 
 import numpy as np
 
+from .index import (
+    RECORD_HEADER_DTYPE,
+    TimeseriesIndex,
+    _gather_structs,
+    _map_file,
+    _unpack_file_header,
+    index_path_for,
+    index_timeseries_buffer,
+    load_timeseries_index,
+    read_timeseries_index,
+    recover_timeseries_index,
+)
 from .layout import (
+    BLOCK_CODEC_LZMA,
+    BLOCK_CODEC_ZLIB,
+    BLOCK_FILE_HEADER_STRUCT,
+    BLOCK_FLAG_FRAGMENT,
+    BLOCK_FORMAT_VERSION,
+    BLOCK_MAGIC,
+    BLOCK_TABLE_DTYPE,
+    BLOCK_TRAILER_STRUCT,
     DEFAULT_RECORD_LAYOUTS,
     ENDIAN_LITTLE,
     FILE_HEADER_STRUCT,
     MAGIC,
     RECORD_HEADER_STRUCT,
     RecordLayout,
+    layouts_for_schema,
+    payload_dtype,
 )
 
+_T = TypeVar("_T")
+
 
 @dataclass(frozen=True, slots=True)
 class TimeseriesHeader:
@@ -29,20 +59,397 @@ class UnknownRecord:
     t_us: int
     type_id: int
     payload_len: int
+    # File offset of the record header; -1 when not known.
+    offset: int = -1
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class UnknownRecords:
+    """Metadata of records without a layout, as parallel arrays in file order.
+
+    `offset` is the file offset of each record header. Indexing with an int (or
+    iterating) yields `UnknownRecord` objects, so only the records inspected are
+    materialized; slices, masks and position arrays return another `UnknownRecords`.
+    """
+
+    t_us: np.ndarray
+    type_id: np.ndarray
+    payload_len: np.ndarray
+    offset: np.ndarray
+
+    @classmethod
+    def empty(cls) -> UnknownRecords:
+        return cls(
+            t_us=np.empty(0, dtype=np.uint64),
+            type_id=np.empty(0, dtype=np.uint16),
+            payload_len=np.empty(0, dtype=np.uint16),
+            offset=np.empty(0, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return int(self.t_us.shape[0])
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return UnknownRecord(
+                t_us=int(self.t_us[key]),
+                type_id=int(self.type_id[key]),
+                payload_len=int(self.payload_len[key]),
+                offset=int(self.offset[key]),
+            )
+        return UnknownRecords(
+            t_us=self.t_us[key], type_id=self.type_id[key], payload_len=self.payload_len[key], offset=self.offset[key]
+        )
+
+    def __iter__(self) -> Iterator[UnknownRecord]:
+        for t_us, type_id, payload_len, offset in zip(
+            self.t_us.tolist(), self.type_id.tolist(), self.payload_len.tolist(), self.offset.tolist()
+        ):
+            yield UnknownRecord(t_us=t_us, type_id=type_id, payload_len=payload_len, offset=offset)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, UnknownRecords):
+            return NotImplemented
+        return all(
+            np.array_equal(getattr(self, name), getattr(other, name))
+            for name in ("t_us", "type_id", "payload_len", "offset")
+        )
+
+    @property
+    def record_counts(self) -> dict[int, int]:
+        """Record counts by type ID."""
+        type_ids, counts = np.unique(self.type_id, return_counts=True)
+        return dict(zip(type_ids.tolist(), counts.tolist()))
+
+
+def _no_skipped_ranges() -> np.ndarray:
+    return np.empty((0, 2), dtype=np.int64)
 
 
 @dataclass(frozen=True, slots=True)
 class TimeseriesData:
+    """Decoded records of one `timeseries.bin`.
+
+    `skipped_ranges` holds the `[start, end)` file byte ranges a `recover=True` read
+    stepped over to resynchronize after corrupt data, one row per range.
+    """
+
     header: TimeseriesHeader
     records: dict[str, dict[str, np.ndarray]]
     record_counts: dict[str, int]
-    unknown_records: tuple[UnknownRecord, ...]
+    unknown_records: UnknownRecords
+    skipped_ranges: np.ndarray = field(default_factory=_no_skipped_ranges)
+
+
+@dataclass(frozen=True, slots=True)
+class TimeseriesBlockTable:
+    """Directory of a block-compressed `timeseries.binz` (see `compress_timeseries_bin`).
+
+    `blocks` is the `BLOCK_TABLE_DTYPE` table in file order. `t_last_us` is the time of
+    the last complete record in file order, `type_first_order` lists type IDs by first
+    appearance and `error` is the truncated-tail error of the source, if any.
+    `t_us_sorted` records whether record `t_us` is non-decreasing in file order.
+    """
+
+    header: TimeseriesHeader
+    codec: int
+    blocks: np.ndarray
+    record_count: int
+    t_last_us: int | None
+    type_first_order: tuple[int, ...]
+    error: str | None = None
+    t_us_sorted: bool = True
+
+    def select(
+        self,
+        type_ids: Iterable[int] | None = None,
+        t_start_us: int | None = None,
+        t_end_us: int | None = None,
+    ) -> np.ndarray:
+        """Return indices of the record blocks that may hold `type_ids` in `[t_start_us, t_end_us)`.
+
+        Exact for type IDs below 63; higher IDs share one mask bit and are matched
+        conservatively. Fragment blocks are never selected.
+        """
+        keep = (self.blocks["flags"] & BLOCK_FLAG_FRAGMENT) == 0
+        if type_ids is not None:
+            mask = 0
+            for type_id in type_ids:
+                mask |= 1 << min(int(type_id), 63)
+            keep &= (self.blocks["type_mask"] & np.uint64(mask)) != 0
+        if t_start_us is not None:
+            keep &= self.blocks["t_max_us"] >= np.uint64(max(0, int(t_start_us)))
+        if t_end_us is not None:
+            keep &= self.blocks["t_min_us"] < np.uint64(max(0, int(t_end_us)))
+        return np.flatnonzero(keep)
+
+
+_BLOCK_DECOMPRESSORS: dict[int, Callable[[bytes], bytes]] = {
+    BLOCK_CODEC_ZLIB: zlib.decompress,
+    BLOCK_CODEC_LZMA: lzma.decompress,
+}
 
 
 def _normalize_layouts(
     record_layouts: Mapping[int, RecordLayout] | None,
+    fw_model_schema: int | None = None,
 ) -> Mapping[int, RecordLayout]:
-    return DEFAULT_RECORD_LAYOUTS if record_layouts is None else record_layouts
+    """Explicit layouts win; otherwise those registered for `fw_model_schema`, if known."""
+    if record_layouts is not None:
+        return record_layouts
+    return DEFAULT_RECORD_LAYOUTS if fw_model_schema is None else layouts_for_schema(fw_model_schema)
+
+
+def _layouts_for_file(
+    path: str | Path,
+    record_layouts: Mapping[int, RecordLayout] | None,
+) -> Mapping[int, RecordLayout]:
+    """Resolve `record_layouts` for `path`, reading only its file header when needed."""
+    if record_layouts is not None:
+        return record_layouts
+    with Path(path).open("rb") as fh:
+        fw_model_schema, _ = _unpack_file_header(fh.read(FILE_HEADER_STRUCT.size))
+    return layouts_for_schema(fw_model_schema)
+
+
+def _select_record_types(
+    layouts: Mapping[int, RecordLayout],
+    record_types: Iterable[int | str] | None,
+) -> set[int]:
+    if record_types is None:
+        return {int(type_id) for type_id in layouts}
+    by_name = {layout.name: int(type_id) for type_id, layout in layouts.items()}
+    selected: set[int] = set()
+    for rec in record_types:
+        type_id = by_name.get(rec) if isinstance(rec, str) else int(rec)
+        if type_id is None or type_id not in layouts:
+            raise ValueError(f"unknown record type: {rec!r}")
+        selected.add(type_id)
+    return selected
+
+
+def _select_fields(
+    layouts: Mapping[int, RecordLayout],
+    fields: Mapping[str, Iterable[str]] | None,
+) -> dict[str, tuple[str, ...]]:
+    by_name = {layout.name: layout for layout in layouts.values()}
+    selected: dict[str, tuple[str, ...]] = {}
+    for name, wanted in (fields or {}).items():
+        layout = by_name.get(name)
+        if layout is None:
+            raise ValueError(f"unknown record type in fields: {name!r}")
+        wanted = tuple(wanted)
+        missing = [field for field in wanted if field not in layout.fields]
+        if missing:
+            raise ValueError(f"{name} has no field(s) {missing}; available: {list(layout.fields)}")
+        selected[name] = tuple(field for field in layout.fields if field in wanted)
+    return selected
+
+
+@lru_cache(maxsize=None)
+def _projected_dtype(dtype: np.dtype, fields: tuple[str, ...]) -> tuple[np.dtype, int]:
+    """Narrow `dtype` to the byte span covering `fields`; return it and the span start."""
+    spans = [(dtype.fields[field][1], dtype.fields[field][0]) for field in fields]
+    start = min(offset for offset, _ in spans)
+    end = max(offset + field_dtype.itemsize for offset, field_dtype in spans)
+    projected = np.dtype(
+        {
+            "names": list(fields),
+            "formats": [field_dtype for _, field_dtype in spans],
+            "offsets": [offset - start for offset, _ in spans],
+            "itemsize": end - start,
+        }
+    )
+    return projected, start
+
+
+def _parse_file_header(data) -> TimeseriesHeader:
+    fw_model_schema, t0_us = _unpack_file_header(data)
+    return TimeseriesHeader(
+        magic=MAGIC.decode("ascii"),
+        fw_model_schema=fw_model_schema,
+        endianness="little",
+        t0_us=t0_us,
+    )
+
+
+def _decoded_dtype(field_dtype: np.dtype) -> np.dtype:
+    # Match `np.asarray` over the Python values `struct.unpack` would produce.
+    if field_dtype.kind == "f":
+        return np.dtype(np.float64)
+    if field_dtype.kind == "u" and field_dtype.itemsize == 8:
+        return np.dtype(np.uint64)
+    if field_dtype.kind in "iu":
+        return np.dtype(np.int64)
+    return field_dtype
+
+
+# Fewest records of one type worth splitting across decode workers.
+_PARALLEL_MIN_RECORDS = 1 << 14
+
+
+def _fill_fields(
+    out: dict[str, np.ndarray],
+    buf: np.ndarray,
+    payload_offset: np.ndarray,
+    dtype: np.dtype,
+    span_start: int,
+    rows: slice,
+) -> None:
+    records = _gather_structs(buf, payload_offset[rows] + span_start, dtype)
+    for field in dtype.names:
+        out[field][rows] = records[field]
+
+
+def _run_tasks(tasks: list[Callable[[], _T]], workers: int) -> list[_T]:
+    """Run `tasks` (in threads when `workers > 1`) and return their results in order."""
+    if workers <= 1 or len(tasks) <= 1:
+        return [task() for task in tasks]
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return [future.result() for future in [pool.submit(task) for task in tasks]]
+
+
+def _check_payload_lengths(
+    index: TimeseriesIndex,
+    type_rows: np.ndarray,
+    layouts: Mapping[int, RecordLayout],
+    strict_payload_len: bool,
+    t_start_us: int | None,
+    t_end_us: int | None,
+) -> None:
+    """Raise for the first known record (in file order) with an unusable payload length."""
+    first_bad: tuple[int, int, int] | None = None
+    for row in type_rows:
+        rec_type = int(row["type_id"])
+        expected_len = layouts[rec_type].payload_struct.size
+        positions = index.positions(rec_type, t_start_us, t_end_us)
+        payload_len = index.payload_len[positions]
+        bad = (payload_len != expected_len) if strict_payload_len else (payload_len < expected_len)
+        if bool(bad.any()):
+            j = int(np.argmax(bad))
+            if first_bad is None or int(positions[j]) < first_bad[0]:
+                first_bad = (int(positions[j]), rec_type, int(payload_len[j]))
+
+    if first_bad is None:
+        return
+    _, rec_type, got = first_bad
+    layout = layouts[rec_type]
+    expected_len = layout.payload_struct.size
+    if strict_payload_len:
+        raise ValueError(
+            f"payload length mismatch for {layout.name} (type={rec_type}): "
+            f"got {got}, expected {expected_len}"
+        )
+    raise ValueError(
+        f"payload too short for {layout.name} (type={rec_type}): "
+        f"got {got}, expected at least {expected_len}"
+    )
+
+
+def _decode_timeseries(
+    data,
+    header: TimeseriesHeader,
+    index: TimeseriesIndex,
+    layouts: Mapping[int, RecordLayout],
+    *,
+    strict_payload_len: bool = True,
+    keep_unknown: bool = True,
+    as_views: bool = False,
+    record_types: Iterable[int | str] | None = None,
+    fields: Mapping[str, Iterable[str]] | None = None,
+    t_start_us: int | None = None,
+    t_end_us: int | None = None,
+    workers: int = 1,
+    base_offset: int = 0,
+) -> TimeseriesData:
+    """Second pass shared by all readers: decode the records `index` locates in `data`.
+
+    With `workers > 1` (and copies rather than views), large record types are split into
+    contiguous position ranges that threads gather into preallocated arrays; numpy
+    releases the GIL for the gathers and casts. `base_offset` is the file offset of
+    `data[0]`, used for the offsets of unknown records.
+    """
+    # Preserve first-appearance order of record types, as the streaming decoder did.
+    type_rows = np.sort(index.type_table, order="first_position")
+    is_known = np.array([int(type_id) in layouts for type_id in type_rows["type_id"]], dtype=bool)
+    wanted_types = _select_record_types(layouts, record_types)
+    wanted_fields = _select_fields(layouts, fields)
+    is_wanted = np.array([int(type_id) in wanted_types for type_id in type_rows["type_id"]], dtype=bool)
+    known_rows = type_rows[is_known & is_wanted]
+    _check_payload_lengths(index, known_rows, layouts, strict_payload_len, t_start_us, t_end_us)
+    # A truncated tail only matters if the window could reach it.
+    window_before_tail = t_end_us is not None and len(index) > 0 and int(index.t_us[-1]) >= t_end_us
+    if index.error is not None and not window_before_tail:
+        raise ValueError(index.error)
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    arrays: dict[str, dict[str, np.ndarray]] = {}
+    record_counts: dict[str, int] = {}
+    tasks: list[Callable[[], None]] = []
+    for row in known_rows:
+        layout = layouts[int(row["type_id"])]
+        positions = index.positions(int(row["type_id"]), t_start_us, t_end_us)
+        count = int(positions.shape[0])
+        if count == 0:
+            continue
+        payload_offset = index.payload_offset[positions]
+        layout_fields = wanted_fields.get(layout.name, layout.fields)
+        out: dict[str, np.ndarray] = {}
+        if as_views:
+            record_headers = payload_offset - RECORD_HEADER_STRUCT.size
+            out["t_us"] = _gather_structs(buf, record_headers, RECORD_HEADER_DTYPE)["t_us"]
+        else:
+            out["t_us"] = index.t_us[positions].astype(np.uint64)
+        if layout_fields:
+            dtype, span_start = _projected_dtype(payload_dtype(layout), layout_fields)
+            if as_views:
+                records = _gather_structs(buf, payload_offset + span_start, dtype)
+                for field in layout_fields:
+                    out[field] = records[field]
+            else:
+                for field in layout_fields:
+                    out[field] = np.empty(count, dtype=_decoded_dtype(dtype.fields[field][0]))
+                n_ranges = max(1, min(workers, count // _PARALLEL_MIN_RECORDS))
+                bounds = [count * k // n_ranges for k in range(n_ranges + 1)]
+                for lo, hi in zip(bounds[:-1], bounds[1:]):
+                    tasks.append(partial(_fill_fields, out, buf, payload_offset, dtype, span_start, slice(lo, hi)))
+        arrays[layout.name] = out
+        record_counts[layout.name] = count
+    _run_tasks(tasks, workers)
+
+    unknown_records = UnknownRecords.empty()
+    unknown_rows = type_rows[~is_known]
+    if keep_unknown and unknown_rows.shape[0] > 0:
+        unknown = np.sort(
+            np.concatenate(
+                [index.positions(int(type_id), t_start_us, t_end_us) for type_id in unknown_rows["type_id"]]
+            )
+        )
+        unknown_records = UnknownRecords(
+            t_us=index.t_us[unknown].astype(np.uint64),
+            type_id=index.type_id[unknown].astype(np.uint16),
+            payload_len=index.payload_len[unknown].astype(np.uint16),
+            offset=index.payload_offset[unknown].astype(np.int64) + (base_offset - RECORD_HEADER_STRUCT.size),
+        )
+
+    return TimeseriesData(
+        header=header,
+        records=arrays,
+        record_counts=record_counts,
+        unknown_records=unknown_records,
+    )
+
+
+def _sidecar_t_us_sorted(path: str | Path) -> bool:
+    """True if a fresh `timeseries.idx` next to `path` records monotonic `t_us`."""
+    index_path = index_path_for(path)
+    if not index_path.exists():
+        return False
+    try:
+        index = read_timeseries_index(index_path)
+        return index.t_us_sorted and not index.is_stale(path)
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
 
 
 def read_timeseries_bin(
@@ -51,106 +458,274 @@ def read_timeseries_bin(
     record_layouts: Mapping[int, RecordLayout] | None = None,
     strict_payload_len: bool = True,
     keep_unknown: bool = True,
+    memory_map: bool = False,
+    use_index: bool = False,
+    record_types: Iterable[int | str] | None = None,
+    fields: Mapping[str, Iterable[str]] | None = None,
+    t_start_us: int | None = None,
+    t_end_us: int | None = None,
+    use_cache: bool = False,
+    workers: int = 1,
+    recover: bool = False,
 ) -> TimeseriesData:
     """Read TLV timeseries binary into structured numpy arrays.
 
+    Decoding runs in two passes: a header-only scan collects per-record offsets, then
+    each record type is decoded in bulk through its `payload_dtype`.
+
     Args:
         path: Path to `timeseries.bin`.
-        record_layouts: Optional record decoder map. Unknown type IDs are skipped.
+        record_layouts: Optional record decoder map. By default the layouts registered
+            for the header's `fw_model_schema` are used (see `register_record_layouts`),
+            falling back to `DEFAULT_RECORD_LAYOUTS`. Unknown type IDs are skipped.
         strict_payload_len: If True, mismatched payload size for known record raises.
         keep_unknown: If True, collect unknown record metadata.
+        memory_map: If True, map the file instead of reading it into memory. Field
+            arrays keep the payload dtype (e.g. float32) and are read-only views into
+            the mapping where a record type is evenly spaced in the file; other types
+            are gathered into compact copies.
+        use_index: If True, take record offsets from the `timeseries.idx` sidecar
+            (built on first use, rebuilt when stale) instead of rescanning the file.
+            Combined with `memory_map`, reopening touches only the decoded records.
+        record_types: Optional record types (type IDs or names such as
+            `"REC_NAV_SOLUTION"`) to decode. Other known types are neither validated,
+            decoded nor counted; their payload bytes are never read.
+        fields: Optional per-record field projection, e.g.
+            `{"REC_NAV_SOLUTION": ("x", "y")}`. Only the bytes spanning the requested
+            fields are read; `t_us` is always included.
+        t_start_us: Optional inclusive start of a `t_us` window.
+        t_end_us: Optional exclusive end of a `t_us` window. Records are located by
+            binary search when record times are monotonic and filtered otherwise. The
+            header scan stops shortly after `t_end_us` only when a fresh sidecar index
+            shows the times are monotonic; a file that goes back in time is scanned in
+            full. Only in-window records are validated, decoded and counted.
+        use_cache: If True, serve the read from the columnar `timeseries.cache/`
+            directory next to the file (one `.npy` per field, decoded on first use and
+            rebuilt when the file or layouts change). With `memory_map` a cached open
+            only maps the requested columns.
+        workers: Threads used to scan and decode large files. The header scan is split
+            into byte ranges that resynchronize on record boundaries, and large record
+            types are decoded as parallel position ranges. Output is identical to
+            `workers=1`.
+        recover: If True, corrupt stretches (a known record with an unusable `len`, a
+            truncated record) are skipped instead of raising: the scan resumes at the
+            next plausible record boundary and the skipped byte ranges are reported in
+            `TimeseriesData.skipped_ranges`. Only the file header must be intact. The
+            file is always scanned sequentially; `use_index` and `use_cache` are ignored.
 
     Returns:
         Parsed timeseries data with header, decoded records, and counts.
     """
-    layouts = _normalize_layouts(record_layouts)
-    data = Path(path).read_bytes()
-    if len(data) < FILE_HEADER_STRUCT.size:
-        raise ValueError(
-            f"timeseries file too small: {len(data)} bytes, expected at least {FILE_HEADER_STRUCT.size}"
+    if use_cache and not recover:
+        from .cache import load_timeseries_cache  # cache.py builds on this module
+
+        try:
+            cache = load_timeseries_cache(path, record_layouts=record_layouts)
+        except ValueError:
+            cache = None  # damaged file: the direct read below reports it (or reads the window).
+        if cache is not None and not (strict_payload_len and cache.strict_error is not None):
+            return cache.select(
+                keep_unknown=keep_unknown,
+                as_views=memory_map,
+                record_layouts=record_layouts,
+                record_types=record_types,
+                fields=fields,
+                t_start_us=t_start_us,
+                t_end_us=t_end_us,
+            )
+
+    data = _map_file(path) if memory_map else Path(path).read_bytes()
+    header = _parse_file_header(data)
+    layouts = _normalize_layouts(record_layouts, header.fw_model_schema)
+
+    skipped = None
+    if recover:
+        index, skipped = recover_timeseries_index(data, layouts, strict_payload_len=strict_payload_len)
+    else:
+        index = load_timeseries_index(path) if use_index else None
+        if index is None or index.file_size != len(data):
+            # Stopping at t_end_us is only safe once t_us is known to be monotonic.
+            stop_t_us = t_end_us if t_end_us is not None and _sidecar_t_us_sorted(path) else None
+            index = index_timeseries_buffer(data, stop_t_us=stop_t_us, workers=workers)
+
+    decoded = _decode_timeseries(
+        data,
+        header,
+        index,
+        layouts,
+        strict_payload_len=strict_payload_len,
+        keep_unknown=keep_unknown,
+        as_views=memory_map,
+        record_types=record_types,
+        fields=fields,
+        t_start_us=t_start_us,
+        t_end_us=t_end_us,
+        workers=workers,
+    )
+    return decoded if skipped is None else replace(decoded, skipped_ranges=skipped)
+
+
+def read_block_table(path: str | Path) -> TimeseriesBlockTable:
+    """Read the header and block directory of a `timeseries.binz` without inflating any block."""
+    with Path(path).open("rb") as fh:
+        head = fh.read(BLOCK_FILE_HEADER_STRUCT.size + FILE_HEADER_STRUCT.size)
+        if len(head) < BLOCK_FILE_HEADER_STRUCT.size + FILE_HEADER_STRUCT.size:
+            raise ValueError(f"compressed timeseries file too small: {len(head)} bytes")
+        magic, version, codec = BLOCK_FILE_HEADER_STRUCT.unpack_from(head, 0)
+        if magic != BLOCK_MAGIC:
+            raise ValueError(f"invalid container magic: got {magic!r}, expected {BLOCK_MAGIC!r}")
+        if version != BLOCK_FORMAT_VERSION:
+            raise ValueError(f"unsupported container version: {version}")
+        if codec not in _BLOCK_DECOMPRESSORS:
+            raise ValueError(f"unsupported block codec id: {codec}")
+        header = _parse_file_header(head[BLOCK_FILE_HEADER_STRUCT.size :])
+
+        size = fh.seek(0, os.SEEK_END)
+        if size < len(head) + BLOCK_TRAILER_STRUCT.size:
+            raise ValueError("compressed timeseries file has no block table (incomplete write?)")
+        fh.seek(size - BLOCK_TRAILER_STRUCT.size)
+        table_offset, block_count, directory_len, trailer_magic = BLOCK_TRAILER_STRUCT.unpack(
+            fh.read(BLOCK_TRAILER_STRUCT.size)
         )
+        if trailer_magic != BLOCK_MAGIC:
+            raise ValueError("compressed timeseries file has no block table (incomplete write?)")
+        fh.seek(table_offset)
+        blocks = np.frombuffer(fh.read(block_count * BLOCK_TABLE_DTYPE.itemsize), dtype=BLOCK_TABLE_DTYPE)
+        directory = json.loads(fh.read(directory_len).decode("utf-8"))
 
-    magic_raw, fw_model_schema, endianness_id, t0_us = FILE_HEADER_STRUCT.unpack_from(data, 0)
-    if magic_raw != MAGIC:
-        raise ValueError(f"invalid magic: got {magic_raw!r}, expected {MAGIC!r}")
-    if endianness_id != ENDIAN_LITTLE:
-        raise ValueError(f"unsupported endianness id: {endianness_id}")
+    return TimeseriesBlockTable(
+        header=header,
+        codec=int(codec),
+        blocks=blocks,
+        record_count=int(directory["record_count"]),
+        t_last_us=directory["t_last_us"],
+        type_first_order=tuple(directory["type_first_order"]),
+        error=directory["error"],
+        t_us_sorted=bool(directory["t_us_sorted"]),
+    )
 
-    header = TimeseriesHeader(
-        magic=MAGIC.decode("ascii"),
-        fw_model_schema=int(fw_model_schema),
-        endianness="little",
-        t0_us=int(t0_us),
+
+def _inflate_block(decompress: Callable[[bytes], bytes], block: bytes, raw_size: int, offset: int) -> bytes:
+    """Inflate the block stored at file `offset` and check its size."""
+    try:
+        raw = decompress(block)
+    except (zlib.error, lzma.LZMAError) as exc:
+        raise ValueError(f"corrupt compressed block at offset {offset}: {exc}") from None
+    if len(raw) != raw_size:
+        raise ValueError(f"corrupt compressed block at offset {offset}: got {len(raw)} bytes, expected {raw_size}")
+    return raw
+
+
+def _read_blocks(path: str | Path, table: TimeseriesBlockTable, selected: np.ndarray, workers: int) -> list[bytes]:
+    """Read and inflate `table.blocks[selected]`; threads inflate concurrently (zlib/lzma release the GIL)."""
+    rows = table.blocks[selected]
+    with Path(path).open("rb") as fh:
+        compressed: list[bytes] = []
+        for offset, compressed_size in zip(rows["offset"].tolist(), rows["compressed_size"].tolist()):
+            fh.seek(offset)
+            compressed.append(fh.read(compressed_size))
+    decompress = _BLOCK_DECOMPRESSORS[table.codec]
+    return _run_tasks(
+        [
+            partial(_inflate_block, decompress, block, raw_size, offset)
+            for block, raw_size, offset in zip(compressed, rows["raw_size"].tolist(), rows["offset"].tolist())
+        ],
+        workers,
     )
 
-    raw_buffers: dict[str, dict[str, list[float | int]]] = {}
-    record_counts: dict[str, int] = {}
-    unknown_records: list[UnknownRecord] = []
-
-    offset = FILE_HEADER_STRUCT.size
-    n = len(data)
-    while offset < n:
-        if offset + RECORD_HEADER_STRUCT.size > n:
-            raise ValueError(f"truncated record header at byte offset {offset}")
-
-        t_us, rec_type, payload_len = RECORD_HEADER_STRUCT.unpack_from(data, offset)
-        offset += RECORD_HEADER_STRUCT.size
-        payload_end = offset + int(payload_len)
-        if payload_end > n:
-            raise ValueError(
-                f"truncated payload for type={rec_type} at byte offset {offset}: "
-                f"need {payload_len}, have {n - offset}"
-            )
 
-        layout = layouts.get(int(rec_type))
-        if layout is None:
-            if keep_unknown:
-                unknown_records.append(
-                    UnknownRecord(t_us=int(t_us), type_id=int(rec_type), payload_len=int(payload_len))
-                )
-            offset = payload_end
-            continue
+def read_timeseries_blocks(
+    path: str | Path,
+    *,
+    record_layouts: Mapping[int, RecordLayout] | None = None,
+    strict_payload_len: bool = True,
+    keep_unknown: bool = True,
+    record_types: Iterable[int | str] | None = None,
+    fields: Mapping[str, Iterable[str]] | None = None,
+    t_start_us: int | None = None,
+    t_end_us: int | None = None,
+    workers: int = 1,
+) -> TimeseriesData:
+    """Read a block-compressed `timeseries.binz`, inflating only the blocks a query needs.
 
-        expected_len = layout.payload_struct.size
-        if strict_payload_len and payload_len != expected_len:
-            raise ValueError(
-                f"payload length mismatch for {layout.name} (type={rec_type}): "
-                f"got {payload_len}, expected {expected_len}"
-            )
-        if payload_len < expected_len:
-            raise ValueError(
-                f"payload too short for {layout.name} (type={rec_type}): "
-                f"got {payload_len}, expected at least {expected_len}"
-            )
+    The block table is consulted first: blocks whose `t_us` range misses the window or
+    that hold none of the selected record types (nor, with `keep_unknown`, unknown
+    types) are neither read nor inflated. The result is identical to
+    `read_timeseries_bin` on the original file with the same arguments.
 
-        if layout.name not in raw_buffers:
-            raw_buffers[layout.name] = {"t_us": []}
-            for field in layout.fields:
-                raw_buffers[layout.name][field] = []
-            record_counts[layout.name] = 0
+    Args:
+        path: Path to `timeseries.binz` (see `compress_timeseries_bin`).
+        record_layouts: Optional record decoder map; by default chosen from the header's
+            `fw_model_schema`. Unknown type IDs are skipped.
+        strict_payload_len: If True, mismatched payload size for known record raises.
+        keep_unknown: If True, collect unknown record metadata.
+        record_types: Optional record types (type IDs or names) to decode.
+        fields: Optional per-record field projection.
+        t_start_us: Optional inclusive start of a `t_us` window.
+        t_end_us: Optional exclusive end of a `t_us` window.
+        workers: Threads used to inflate and decode blocks.
 
-        unpacked = layout.payload_struct.unpack_from(data, offset)
-        bucket = raw_buffers[layout.name]
-        bucket["t_us"].append(int(t_us))
-        for field, value in zip(layout.fields, unpacked):
-            bucket[field].append(value)
-        record_counts[layout.name] += 1
+    Returns:
+        Parsed timeseries data with header, decoded records, and counts.
+    """
+    table = read_block_table(path)
+    layouts = _normalize_layouts(record_layouts, table.header.fw_model_schema)
+    type_ids = _select_record_types(layouts, record_types)
+    if keep_unknown:
+        type_ids |= {type_id for type_id in range(64) if type_id not in layouts}  # 63 stands for all IDs >= 63
+    selected = table.select(type_ids, t_start_us, t_end_us)
 
-        offset = payload_end
+    file_header = FILE_HEADER_STRUCT.pack(MAGIC, table.header.fw_model_schema, ENDIAN_LITTLE, table.header.t0_us)
+    data = b"".join([file_header, *_read_blocks(path, table, selected, workers)])
+    index = index_timeseries_buffer(data, stop_t_us=t_end_us if table.t_us_sorted else None)
+    decoded = _decode_timeseries(
+        data,
+        table.header,
+        index,
+        layouts,
+        strict_payload_len=strict_payload_len,
+        keep_unknown=keep_unknown,
+        record_types=record_types,
+        fields=fields,
+        t_start_us=t_start_us,
+        t_end_us=t_end_us,
+        workers=workers,
+    )
+    # The truncated tail was left out of the decoded blocks; report it as the plain reader would.
+    window_before_tail = t_end_us is not None and table.t_last_us is not None and table.t_last_us >= t_end_us
+    if table.error is not None and not window_before_tail:
+        raise ValueError(table.error)
 
-    arrays: dict[str, dict[str, np.ndarray]] = {}
-    for name, values in raw_buffers.items():
-        out: dict[str, np.ndarray] = {"t_us": np.asarray(values["t_us"], dtype=np.uint64)}
-        for field, series in values.items():
-            if field == "t_us":
-                continue
-            out[field] = np.asarray(series)
-        arrays[name] = out
+    # Unknown record offsets point into the joined blocks; map them back to the source file.
+    unknown = decoded.unknown_records
+    if len(unknown):
+        raw_size = table.blocks["raw_size"].astype(np.int64)
+        source_start = FILE_HEADER_STRUCT.size + np.concatenate(([0], np.cumsum(raw_size)[:-1]))[selected]
+        data_start = FILE_HEADER_STRUCT.size + np.concatenate(([0], np.cumsum(raw_size[selected])[:-1]))
+        block = np.searchsorted(data_start, unknown.offset, side="right") - 1
+        unknown = replace(unknown, offset=unknown.offset + (source_start - data_start)[block])
 
-    return TimeseriesData(
-        header=header,
-        records=arrays,
-        record_counts=record_counts,
-        unknown_records=tuple(unknown_records),
+    # Record order follows first appearance in the whole file, not just the blocks read.
+    order = [layouts[type_id].name for type_id in table.type_first_order if type_id in layouts]
+    return replace(
+        decoded,
+        records={name: decoded.records[name] for name in order if name in decoded.records},
+        record_counts={name: decoded.record_counts[name] for name in order if name in decoded.record_counts},
+        unknown_records=unknown,
     )
 
+
+def decompress_timeseries_bin(path: str | Path, out_path: str | Path) -> None:
+    """Restore the original `timeseries.bin` from a `timeseries.binz`, byte for byte."""
+    table = read_block_table(path)
+    decompress = _BLOCK_DECOMPRESSORS[table.codec]
+    out_path = Path(out_path)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with Path(path).open("rb") as src, tmp_path.open("wb") as dst:
+        src.seek(BLOCK_FILE_HEADER_STRUCT.size)
+        dst.write(src.read(FILE_HEADER_STRUCT.size))
+        for row in table.blocks:
+            offset = int(row["offset"])
+            src.seek(offset)
+            dst.write(_inflate_block(decompress, src.read(int(row["compressed_size"])), int(row["raw_size"]), offset))
+    os.replace(tmp_path, out_path)
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
+import re
 import struct
-from typing import Final
+import sys
+from types import MappingProxyType
+from typing import Final, Mapping
+
+import numpy as np
 
 
 MAGIC: Final[bytes] = b"USVLOG"
@@ -14,6 +20,56 @@ FILE_HEADER_STRUCT: Final[struct.Struct] = struct.Struct("<6sIBQ13x")
 # Per-record header: t_us[uint64], type[uint16], len[uint16]
 RECORD_HEADER_STRUCT: Final[struct.Struct] = struct.Struct("<QHH")
 
+# Block-compressed container (`timeseries.binz`): a 16-byte container header
+# (magic[6], version[uint16], codec[uint8], reserved[7]) followed by the original
+# 32-byte file header, the compressed blocks, the block table (`BLOCK_TABLE_DTYPE`),
+# a JSON directory and a fixed trailer:
+# table_offset[uint64], block_count[uint32], directory_len[uint32], magic[6], reserved[2]
+COMPRESSED_SUFFIX: Final[str] = ".binz"
+BLOCK_MAGIC: Final[bytes] = b"USVBLK"
+BLOCK_FORMAT_VERSION: Final[int] = 1
+BLOCK_CODEC_ZLIB: Final[int] = 1
+BLOCK_CODEC_LZMA: Final[int] = 2
+BLOCK_FILE_HEADER_STRUCT: Final[struct.Struct] = struct.Struct("<6sHB7x")
+BLOCK_TRAILER_STRUCT: Final[struct.Struct] = struct.Struct("<QII6s2x")
+# Set on the block holding a truncated trailing record; it is kept for byte-exact
+# decompression but never decoded.
+BLOCK_FLAG_FRAGMENT: Final[int] = 1
+# One row per block. Blocks hold whole records; `t_min_us`/`t_max_us` bound their
+# record times and bit `min(type_id, 63)` of `type_mask` is set for each type present.
+BLOCK_TABLE_DTYPE: Final[np.dtype] = np.dtype(
+    [
+        ("offset", "<u8"),
+        ("compressed_size", "<u4"),
+        ("raw_size", "<u4"),
+        ("record_count", "<u4"),
+        ("flags", "<u4"),
+        ("t_min_us", "<u8"),
+        ("t_max_us", "<u8"),
+        ("type_mask", "<u8"),
+    ]
+)
+
+
+# struct format codes -> little-endian numpy scalar formats (standard sizes, no alignment).
+_STRUCT_CODE_TO_NUMPY: Final[dict[str, str]] = {
+    "c": "S1",
+    "b": "i1",
+    "B": "u1",
+    "?": "?",
+    "h": "<i2",
+    "H": "<u2",
+    "i": "<i4",
+    "I": "<u4",
+    "l": "<i4",
+    "L": "<u4",
+    "q": "<i8",
+    "Q": "<u8",
+    "e": "<f2",
+    "f": "<f4",
+    "d": "<f8",
+}
+_STRUCT_TOKEN_RE: Final[re.Pattern[str]] = re.compile(r"(\d*)([xcbB?hHiIlLqQefds])")
 
 REC_NAV_SOLUTION: Final[int] = 1
 REC_GUIDANCE_REF: Final[int] = 2
@@ -119,3 +175,93 @@ DEFAULT_RECORD_LAYOUTS: Final[dict[int, RecordLayout]] = {
     ),
 }
 
+# fw_model_schema -> record layouts written by that firmware (see `register_record_layouts`).
+_SCHEMA_LAYOUTS: dict[int, Mapping[int, RecordLayout]] = {}
+
+
+@lru_cache(maxsize=None)
+def payload_dtype(layout: RecordLayout) -> np.dtype:
+    """Return the numpy structured dtype equivalent of `layout.payload_struct`.
+
+    Field names follow `layout.fields`; pad bytes become gaps between field offsets,
+    so the dtype itemsize always equals `layout.payload_struct.size`. Formats must be
+    little-endian: `<`, or on a little-endian host `=`, `@` or no prefix (native
+    alignment is reproduced as gaps).
+    """
+    fmt = layout.payload_struct.format
+    prefix, body = (fmt[0], fmt[1:]) if fmt[:1] in ("@", "=", "<", ">", "!") else ("@", fmt)
+    if prefix in (">", "!") or (prefix != "<" and sys.byteorder != "little"):
+        raise ValueError(f"{layout.name}: only little-endian payload formats are supported, got {fmt!r}")
+    aligned = prefix == "@"
+
+    formats: list[str] = []
+    offsets: list[int] = []
+    offset = 0
+    for count_raw, code in _STRUCT_TOKEN_RE.findall(body.replace(" ", "")):
+        count = int(count_raw) if count_raw else 1
+        if code == "x":
+            offset += count
+        elif code == "s":
+            formats.append(f"S{count}")
+            offsets.append(offset)
+            offset += count
+        else:
+            np_format = _STRUCT_CODE_TO_NUMPY[code]
+            item_size = np.dtype(np_format).itemsize
+            for _ in range(count):
+                if aligned:
+                    offset += -offset % item_size
+                formats.append(np_format)
+                offsets.append(offset)
+                offset += item_size
+
+    if offset != layout.payload_struct.size:
+        raise ValueError(f"{layout.name}: could not map payload format {fmt!r} onto a numpy dtype")
+    if len(formats) != len(layout.fields):
+        raise ValueError(
+            f"{layout.name}: payload format {fmt!r} has {len(formats)} values "
+            f"but layout lists {len(layout.fields)} fields"
+        )
+    return np.dtype(
+        {
+            "names": list(layout.fields),
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": layout.payload_struct.size,
+        }
+    )
+
+
+def register_record_layouts(fw_model_schema: int, record_layouts: Mapping[int, RecordLayout]) -> None:
+    """Register the record layouts written by firmware with `fw_model_schema`.
+
+    Each layout is compiled to its `payload_dtype` here, so a bad payload format fails at
+    registration rather than mid-batch and every later read reuses the cached dtypes.
+    Readers called without `record_layouts` select the set matching the file header;
+    a registration replaces any earlier one for the same schema.
+
+    Raises:
+        ValueError: If a layout is keyed under a different type ID or its payload format
+            has no numpy equivalent.
+    """
+    layouts: dict[int, RecordLayout] = {}
+    for type_id, layout in record_layouts.items():
+        if int(type_id) != layout.type_id:
+            raise ValueError(f"{layout.name}: registered under type {type_id}, layout says {layout.type_id}")
+        payload_dtype(layout)
+        layouts[int(type_id)] = layout
+    _SCHEMA_LAYOUTS[int(fw_model_schema)] = MappingProxyType(layouts)
+
+
+def unregister_record_layouts(fw_model_schema: int) -> None:
+    """Drop the registration for `fw_model_schema`; its files decode with the defaults again."""
+    _SCHEMA_LAYOUTS.pop(int(fw_model_schema), None)
+
+
+def registered_schemas() -> tuple[int, ...]:
+    return tuple(sorted(_SCHEMA_LAYOUTS))
+
+
+def layouts_for_schema(fw_model_schema: int) -> Mapping[int, RecordLayout]:
+    """Record layouts for `fw_model_schema`; `DEFAULT_RECORD_LAYOUTS` if none is registered."""
+    return _SCHEMA_LAYOUTS.get(int(fw_model_schema), DEFAULT_RECORD_LAYOUTS)
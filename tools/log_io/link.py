@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+import math
+from typing import Final, Iterable
+
+import numpy as np
+
+from .mavlink import MavlinkEncoder
+from .telemetry import CUSTOM_MAVLINK_MESSAGES, PREDEFINED_MAVLINK_MESSAGES, TelemetryMessage
+
+# Queue overflow policies of a `TelemetryClass`.
+DROP_OLDEST: Final[str] = "drop_oldest"  # evict the oldest queued message (latest-value streams)
+DROP_NEWEST: Final[str] = "drop_newest"  # reject the arriving message (queue keeps its order)
+
+# `LinkReport.messages["status"]` values.
+LINK_SENT: Final[int] = 0
+LINK_DROPPED: Final[int] = 1  # evicted or rejected by a full queue
+LINK_DECIMATED: Final[int] = 2  # skipped by the class decimation
+
+# One row per offered message: time, message code (index into `LinkReport.names`),
+# class code (index into `LinkReport.classes`), frame size on the air, status, and for
+# sent messages the time its last byte left the radio and `t_sent_us - t_us`.
+LINK_MESSAGE_DTYPE: Final[np.dtype] = np.dtype(
+    [
+        ("t_us", "<u8"),
+        ("message", "<u2"),
+        ("cls", "u1"),
+        ("size", "<u2"),
+        ("status", "u1"),
+        ("t_sent_us", "<u8"),
+        ("latency_us", "<i8"),
+    ]
+)
+
+
+@dataclass(frozen=True, slots=True)
+class LinkBudget:
+    """Capacity of the telemetry link.
+
+    `bytes_per_s` is the usable air rate and `frame_overhead` the bytes a radio adds to
+    each MAVLink frame (framing, ECC); the scheduler runs every `tick_us`.
+    """
+
+    bytes_per_s: float
+    frame_overhead: int = 0
+    tick_us: int = 10_000
+
+    def __post_init__(self) -> None:
+        if self.bytes_per_s <= 0.0 or self.tick_us <= 0 or self.frame_overhead < 0:
+            raise ValueError("bytes_per_s and tick_us must be > 0 and frame_overhead >= 0")
+
+
+@dataclass(frozen=True, slots=True)
+class TelemetryClass:
+    """A group of telemetry messages sharing one send queue.
+
+    Lower `priority` is served first. At most `queue_depth` messages wait; a full queue
+    applies `overflow` (`DROP_OLDEST` or `DROP_NEWEST`). With `decimation` n > 1 only
+    every n-th offered message of each message name is queued, so interleaved messages
+    of one class are thinned alike.
+    """
+
+    name: str
+    messages: tuple[str, ...]
+    priority: int
+    queue_depth: int
+    overflow: str = DROP_OLDEST
+    decimation: int = 1
+
+    def __post_init__(self) -> None:
+        if self.overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"{self.name}: overflow must be {DROP_OLDEST!r} or {DROP_NEWEST!r}")
+        if self.queue_depth < 1 or self.decimation < 1:
+            raise ValueError(f"{self.name}: queue_depth and decimation must be >= 1")
+
+
+# Events and parameter acks first (never reordered), then link health, then pose
+# (latest value wins), then custom debug.
+DEFAULT_TELEMETRY_CLASSES: Final[tuple[TelemetryClass, ...]] = (
+    TelemetryClass(
+        name="event",
+        messages=(
+            PREDEFINED_MAVLINK_MESSAGES["event_text"],
+            PREDEFINED_MAVLINK_MESSAGES["param_ack"],
+            CUSTOM_MAVLINK_MESSAGES["event_structured"],
+        ),
+        priority=0,
+        queue_depth=32,
+        overflow=DROP_NEWEST,
+    ),
+    TelemetryClass(
+        name="status",
+        messages=(
+            PREDEFINED_MAVLINK_MESSAGES["heartbeat"],
+            PREDEFINED_MAVLINK_MESSAGES["status"],
+            PREDEFINED_MAVLINK_MESSAGES["ekf_status"],
+        ),
+        priority=1,
+        queue_depth=3,
+    ),
+    TelemetryClass(
+        name="pose",
+        messages=(PREDEFINED_MAVLINK_MESSAGES["pose_local"], PREDEFINED_MAVLINK_MESSAGES["pose_attitude"]),
+        priority=2,
+        queue_depth=2,
+    ),
+    TelemetryClass(
+        name="debug",
+        messages=(CUSTOM_MAVLINK_MESSAGES["ctrl_debug"], CUSTOM_MAVLINK_MESSAGES["mixer_feedback"]),
+        priority=3,
+        queue_depth=4,
+    ),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class LinkClassStats:
+    name: str
+    offered: int
+    sent: int
+    dropped: int
+    decimated: int
+    bytes_sent: int
+    # High-water mark of the queue.
+    max_queued: int
+
+
+@dataclass(frozen=True, slots=True)
+class LinkReport:
+    """Outcome of `simulate_telemetry_link`.
+
+    `messages` (`LINK_MESSAGE_DTYPE`) has one row per offered message in offer order;
+    `classes` holds the counters of each `TelemetryClass` by name, in the order of the
+    `cls` codes.
+    """
+
+    budget: LinkBudget
+    names: tuple[str, ...]
+    messages: np.ndarray
+    classes: dict[str, LinkClassStats]
+    # From the first offered message until the link went idle.
+    duration_us: int
+
+    @property
+    def bytes_sent(self) -> int:
+        return sum(stats.bytes_sent for stats in self.classes.values())
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the link capacity used over `duration_us`."""
+        capacity = self.budget.bytes_per_s * self.duration_us / 1_000_000.0
+        return self.bytes_sent / capacity if capacity > 0.0 else 0.0
+
+    def latencies_us(self, *names: str) -> np.ndarray:
+        """Latencies of the sent messages with any of `names` (all messages if empty)."""
+        rows = self.messages[self.messages["status"] == LINK_SENT]
+        if names:
+            codes = [code for code, name in enumerate(self.names) if name in names]
+            rows = rows[np.isin(rows["message"], codes)]
+        return rows["latency_us"]
+
+
+def simulate_telemetry_link(
+    messages: Iterable[TelemetryMessage],
+    budget: LinkBudget,
+    classes: Iterable[TelemetryClass] = DEFAULT_TELEMETRY_CLASSES,
+    *,
+    encoder: MavlinkEncoder | None = None,
+) -> LinkReport:
+    """Replay a telemetry stream through a bandwidth-limited, priority-scheduled link.
+
+    Messages (in time order, e.g. `build_mavlink_telemetry_tables(...)` or
+    `iter_mavlink_telemetry(...)`) are offered to their class queue at `t_us`. Every
+    `budget.tick_us` the scheduler hands frames to the radio, highest-priority queue
+    first and FIFO within a queue, as long as the link would be free before the next
+    tick; a frame occupies the link for `(len(frame) + frame_overhead) / bytes_per_s`.
+    Frame sizes come from `encoder` (a default `MavlinkEncoder`). After the last
+    message the queues are drained.
+
+    Raises:
+        ValueError: If a message belongs to no class or to several classes.
+    """
+    classes = tuple(classes)
+    if encoder is None:
+        encoder = MavlinkEncoder()
+    class_of: dict[str, int] = {}
+    for code, telemetry_class in enumerate(classes):
+        for name in telemetry_class.messages:
+            if name in class_of:
+                raise ValueError(f"{name} is in more than one telemetry class")
+            class_of[name] = code
+
+    # Frame sizes depend on the payload (MAVLink v2 truncates trailing zeros).
+    t_us: list[int] = []
+    message_code: list[int] = []
+    cls: list[int] = []
+    size: list[int] = []
+    names: dict[str, int] = {}
+    overhead = budget.frame_overhead
+    for message in messages:
+        code = class_of.get(message.name)
+        if code is None:
+            raise ValueError(f"telemetry message {message.name!r} is in no telemetry class")
+        t_us.append(message.t_us)
+        message_code.append(names.setdefault(message.name, len(names)))
+        cls.append(code)
+        size.append(len(encoder.encode(message)) + overhead)
+
+    n = len(t_us)
+    status = [LINK_SENT] * n
+    t_sent = [0] * n
+    queues: list[deque[int]] = [deque() for _ in classes]
+    by_priority = sorted(range(len(classes)), key=lambda code: classes[code].priority)
+    offered = [0] * len(classes)
+    # Decimation counts per message name, not per class.
+    offered_by_name = [0] * len(names)
+    max_queued = [0] * len(classes)
+    us_per_byte = 1_000_000.0 / budget.bytes_per_s
+    tick = budget.tick_us
+    t0 = t_us[0] if n else 0
+    now = t0
+    link_free = float(t0)
+    queued = 0
+    i = 0
+    while i < n or queued:
+        if not queued and i < n and t_us[i] > now:
+            # Idle link: skip to the tick at or after the next message.
+            now += -(-(t_us[i] - now) // tick) * tick
+        while i < n and t_us[i] <= now:
+            code = cls[i]
+            telemetry_class = classes[code]
+            offered[code] += 1
+            offered_by_name[message_code[i]] += 1
+            queue = queues[code]
+            if (offered_by_name[message_code[i]] - 1) % telemetry_class.decimation:
+                status[i] = LINK_DECIMATED
+            elif len(queue) < telemetry_class.queue_depth:
+                queue.append(i)
+                queued += 1
+            elif telemetry_class.overflow == DROP_OLDEST:
+                status[queue.popleft()] = LINK_DROPPED
+                queue.append(i)
+            else:
+                status[i] = LINK_DROPPED
+            max_queued[code] = max(max_queued[code], len(queue))
+            i += 1
+        horizon = now + tick
+        for code in by_priority:
+            queue = queues[code]
+            while queue and link_free < horizon:
+                j = queue.popleft()
+                queued -= 1
+                link_free = max(link_free, float(now)) + size[j] * us_per_byte
+                t_sent[j] = math.ceil(link_free)
+            if queue:
+                break
+        now = horizon
+
+    table = np.empty(n, dtype=LINK_MESSAGE_DTYPE)
+    table["t_us"] = t_us
+    table["message"] = message_code
+    table["cls"] = cls
+    table["size"] = size
+    table["status"] = status
+    table["t_sent_us"] = t_sent
+    sent = table["status"] == LINK_SENT
+    table["latency_us"] = np.where(sent, table["t_sent_us"].astype(np.int64) - table["t_us"].astype(np.int64), -1)
+
+    stats: dict[str, LinkClassStats] = {}
+    for code, telemetry_class in enumerate(classes):
+        rows = table[table["cls"] == code]
+        stats[telemetry_class.name] = LinkClassStats(
+            name=telemetry_class.name,
+            offered=offered[code],
+            sent=int(np.count_nonzero(rows["status"] == LINK_SENT)),
+            dropped=int(np.count_nonzero(rows["status"] == LINK_DROPPED)),
+            decimated=int(np.count_nonzero(rows["status"] == LINK_DECIMATED)),
+            bytes_sent=int(rows["size"][rows["status"] == LINK_SENT].sum()),
+            max_queued=max_queued[code],
+        )
+    end = max(math.ceil(link_free), t_us[-1]) if n else t0
+    return LinkReport(
+        budget=budget,
+        names=tuple(names),
+        messages=table,
+        classes=stats,
+        duration_us=end - t0,
+    )
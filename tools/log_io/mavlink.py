@@ -0,0 +1,649 @@
+from __future__ import annotations
+
+import binascii
+from dataclasses import dataclass
+import json
+import struct
+from types import MappingProxyType
+from typing import Any, Final, Iterable, Mapping
+
+import numpy as np
+
+from .events import parse_event_log
+from .telemetry import _EVENT_POSITION_FIELD, TELEMETRY_INDEX_DTYPE, TelemetryMessage, TelemetryTables
+
+
+# MAVLink v2 frame: stx[0xFD], len[uint8], incompat_flags[uint8], compat_flags[uint8],
+# seq[uint8], sysid[uint8], compid[uint8], msgid[uint24], payload[len], checksum[uint16].
+# The 24-bit message id is packed as its low 16 bits followed by its high 8 bits.
+MAVLINK_STX_V2: Final[int] = 0xFD
+MAVLINK_V2_HEADER_STRUCT: Final[struct.Struct] = struct.Struct("<7BHB")
+MAVLINK_CHECKSUM_STRUCT: Final[struct.Struct] = struct.Struct("<H")
+MAVLINK_MAX_PAYLOAD_LEN: Final[int] = 255
+# Unsigned frames only; the 13-byte signature (incompat flag 0x01) is not produced.
+MAVLINK_FRAME_OVERHEAD: Final[int] = MAVLINK_V2_HEADER_STRUCT.size + MAVLINK_CHECKSUM_STRUCT.size
+MAVLINK_SIGNATURE_LEN: Final[int] = 13
+MAVLINK_IFLAG_SIGNED: Final[int] = 0x01
+
+# One row per decoded frame: time (see `MavlinkDecoder.feed`), message id, header
+# sequence/system/component ids and payload length on the wire.
+MAVLINK_FRAME_DTYPE: Final[np.dtype] = np.dtype(
+    [
+        ("t_us", "<u8"),
+        ("msg_id", "<u4"),
+        ("seq", "u1"),
+        ("sys_id", "u1"),
+        ("comp_id", "u1"),
+        ("payload_len", "u1"),
+    ]
+)
+
+# `MavlinkField.source` values that do not name a payload key.
+SOURCE_T_US: Final[str] = "@t_us"  # the message time, `TelemetryMessage.t_us`
+SOURCE_JSON: Final[str] = "@json"  # the whole payload as compact JSON text
+
+# Payload keys a `SOURCE_JSON` field keeps when optional keys are dropped to fit it.
+_JSON_REQUIRED_KEYS: Final[frozenset[str]] = frozenset(("t_us", "type"))
+
+# MAVLink field types -> (struct code, size in bytes, numpy format).
+_C_TYPES: Final[dict[str, tuple[str, int, str]]] = {
+    "char": ("s", 1, "S"),
+    "int8_t": ("b", 1, "i1"),
+    "uint8_t": ("B", 1, "u1"),
+    "int16_t": ("h", 2, "<i2"),
+    "uint16_t": ("H", 2, "<u2"),
+    "int32_t": ("i", 4, "<i4"),
+    "uint32_t": ("I", 4, "<u4"),
+    "float": ("f", 4, "<f4"),
+    "int64_t": ("q", 8, "<i8"),
+    "uint64_t": ("Q", 8, "<u8"),
+    "double": ("d", 8, "<f8"),
+}
+
+# CRC-16/MCRF4XX (the MAVLink "X.25" checksum) is the bit-reflected form of the CRC-CCITT
+# that `binascii.crc_hqx` computes, so it runs at C speed on bit-reversed bytes.
+_BIT_REVERSE: Final[bytes] = bytes(int(f"{value:08b}"[::-1], 2) for value in range(256))
+
+
+def _reverse16(value: int) -> int:
+    return (_BIT_REVERSE[value & 0xFF] << 8) | _BIT_REVERSE[value >> 8]
+
+
+def mavlink_crc(data: bytes | bytearray | memoryview, crc: int = 0xFFFF) -> int:
+    """Return the MAVLink checksum (CRC-16/MCRF4XX) of `data`, continuing from `crc`."""
+    return _reverse16(binascii.crc_hqx(bytes(data).translate(_BIT_REVERSE), _reverse16(crc)))
+
+
+@dataclass(frozen=True, slots=True)
+class MavlinkField:
+    """One MAVLink message field and where its value comes from.
+
+    `source` is the `TelemetryMessage.payload` key that holds the value, `SOURCE_T_US`,
+    `SOURCE_JSON`, or None for fields the telemetry mapping does not carry (sent as zero).
+    """
+
+    name: str
+    c_type: str
+    array_length: int = 0
+    source: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class MavlinkMessageLayout:
+    msg_id: int
+    name: str
+    # Fields in wire order.
+    fields: tuple[MavlinkField, ...]
+    payload_struct: struct.Struct
+    crc_extra: int
+
+
+def mavlink_message_layout(msg_id: int, name: str, fields: Iterable[MavlinkField]) -> MavlinkMessageLayout:
+    """Build a message layout from its fields in definition (XML) order.
+
+    Fields are put in wire order (stable sort by element size, largest first) and
+    CRC_EXTRA is derived from the wire order as the MAVLink generator does. Extension
+    fields and numeric array fields are not supported.
+    """
+    fields = tuple(fields)
+    if not 0 <= msg_id <= 0xFFFFFF:
+        raise ValueError(f"{name}: msg_id {msg_id} does not fit in 24 bits")
+    unknown = sorted({field.c_type for field in fields} - set(_C_TYPES))
+    if unknown:
+        raise ValueError(f"{name}: unsupported MAVLink field types {unknown}")
+    for field in fields:
+        if (field.c_type == "char") != (field.array_length > 0):
+            raise ValueError(f"{name}.{field.name}: only char fields can be (and must be) arrays")
+    wire = tuple(sorted(fields, key=lambda field: -_C_TYPES[field.c_type][1]))
+
+    fmt = "<" + "".join(
+        f"{field.array_length or ''}{_C_TYPES[field.c_type][0]}" for field in wire
+    )
+    payload_struct = struct.Struct(fmt)
+    if payload_struct.size > MAVLINK_MAX_PAYLOAD_LEN:
+        raise ValueError(f"{name}: payload of {payload_struct.size} bytes exceeds {MAVLINK_MAX_PAYLOAD_LEN}")
+
+    crc = mavlink_crc(f"{name} ".encode("ascii"))
+    for field in wire:
+        crc = mavlink_crc(f"{field.c_type} {field.name} ".encode("ascii"), crc)
+        if field.array_length:
+            crc = mavlink_crc(bytes((field.array_length,)), crc)
+    return MavlinkMessageLayout(
+        msg_id=msg_id,
+        name=name,
+        fields=wire,
+        payload_struct=payload_struct,
+        crc_extra=(crc & 0xFF) ^ (crc >> 8),
+    )
+
+
+def _carried(name: str, c_type: str, array_length: int = 0) -> MavlinkField:
+    """Field filled from the payload key of the same name."""
+    return MavlinkField(name, c_type, array_length, source=name)
+
+
+# Telemetry messages (see `PREDEFINED_MAVLINK_MESSAGES` / `CUSTOM_MAVLINK_MESSAGES`) as
+# MAVLink v2 messages. Predefined messages follow the common set (without extensions);
+# ESTIMATOR_STATUS carries the logged EKF variances in its innovation-ratio fields.
+# USV_* ids are this project's dialect.
+MAVLINK_MESSAGE_LAYOUTS: Final[Mapping[str, MavlinkMessageLayout]] = MappingProxyType(
+    {
+        layout.name: layout
+        for layout in (
+            mavlink_message_layout(
+                0,
+                "HEARTBEAT",
+                (
+                    _carried("type", "uint8_t"),
+                    _carried("autopilot", "uint8_t"),
+                    _carried("base_mode", "uint8_t"),
+                    _carried("custom_mode", "uint32_t"),
+                    _carried("system_status", "uint8_t"),
+                    _carried("mavlink_version", "uint8_t"),
+                ),
+            ),
+            mavlink_message_layout(
+                1,
+                "SYS_STATUS",
+                (
+                    _carried("onboard_control_sensors_present", "uint32_t"),
+                    _carried("onboard_control_sensors_enabled", "uint32_t"),
+                    _carried("onboard_control_sensors_health", "uint32_t"),
+                    MavlinkField("load", "uint16_t"),
+                    _carried("voltage_battery", "uint16_t"),
+                    _carried("current_battery", "int16_t"),
+                    _carried("battery_remaining", "int8_t"),
+                    MavlinkField("drop_rate_comm", "uint16_t"),
+                    MavlinkField("errors_comm", "uint16_t"),
+                    MavlinkField("errors_count1", "uint16_t"),
+                    MavlinkField("errors_count2", "uint16_t"),
+                    MavlinkField("errors_count3", "uint16_t"),
+                    MavlinkField("errors_count4", "uint16_t"),
+                ),
+            ),
+            mavlink_message_layout(
+                30,
+                "ATTITUDE",
+                (
+                    _carried("time_boot_ms", "uint32_t"),
+                    _carried("roll", "float"),
+                    _carried("pitch", "float"),
+                    _carried("yaw", "float"),
+                    _carried("rollspeed", "float"),
+                    _carried("pitchspeed", "float"),
+                    _carried("yawspeed", "float"),
+                ),
+            ),
+            mavlink_message_layout(
+                32,
+                "LOCAL_POSITION_NED",
+                (
+                    _carried("time_boot_ms", "uint32_t"),
+                    _carried("x", "float"),
+                    _carried("y", "float"),
+                    _carried("z", "float"),
+                    _carried("vx", "float"),
+                    _carried("vy", "float"),
+                    _carried("vz", "float"),
+                ),
+            ),
+            mavlink_message_layout(
+                230,
+                "ESTIMATOR_STATUS",
+                (
+                    MavlinkField("time_usec", "uint64_t", source=SOURCE_T_US),
+                    MavlinkField("flags", "uint16_t", source="flags"),
+                    MavlinkField("vel_ratio", "float", source="vel_variance"),
+                    MavlinkField("pos_horiz_ratio", "float", source="pos_horiz_variance"),
+                    MavlinkField("pos_vert_ratio", "float", source="pos_vert_variance"),
+                    MavlinkField("mag_ratio", "float", source="compass_variance"),
+                    MavlinkField("hagl_ratio", "float", source="terrain_alt_variance"),
+                    MavlinkField("tas_ratio", "float"),
+                    MavlinkField("pos_horiz_accuracy", "float"),
+                    MavlinkField("pos_vert_accuracy", "float"),
+                ),
+            ),
+            mavlink_message_layout(
+                253,
+                "STATUSTEXT",
+                (
+                    _carried("severity", "uint8_t"),
+                    _carried("text", "char", 50),
+                ),
+            ),
+            mavlink_message_layout(
+                324,
+                "PARAM_EXT_ACK",
+                (
+                    _carried("param_id", "char", 16),
+                    _carried("param_value", "char", 128),
+                    _carried("param_type", "uint8_t"),
+                    _carried("param_result", "uint8_t"),
+                ),
+            ),
+            mavlink_message_layout(
+                42500,
+                "USV_EVENT",
+                (
+                    MavlinkField("time_usec", "uint64_t", source=SOURCE_T_US),
+                    MavlinkField("event", "char", 240, source=SOURCE_JSON),
+                ),
+            ),
+            mavlink_message_layout(
+                42501,
+                "USV_CTRL_DEBUG",
+                (
+                    MavlinkField("time_usec", "uint64_t", source=SOURCE_T_US),
+                    _carried("v_d", "float"),
+                    _carried("v_hat", "float"),
+                    _carried("u_s_req", "float"),
+                    _carried("u_d_req", "float"),
+                    _carried("u_s_cmd", "float"),
+                    _carried("u_d_cmd", "float"),
+                    _carried("e_psi", "float"),
+                ),
+            ),
+            mavlink_message_layout(
+                42502,
+                "USV_MIXER_FEEDBACK",
+                (
+                    MavlinkField("time_usec", "uint64_t", source=SOURCE_T_US),
+                    _carried("u_s_ach", "float"),
+                    _carried("u_d_ach", "float"),
+                    _carried("sat_any", "uint8_t"),
+                ),
+            ),
+        )
+    }
+)
+
+
+def _fit_json(payload: Mapping[str, Any], size: int) -> bytes:
+    """Compact JSON of `payload` in at most `size` bytes.
+
+    When the full payload is too long, optional keys (all but `t_us` and `type`) are
+    dropped, last key first, until the text fits, so the receiver always gets a valid
+    JSON object rather than a truncated one.
+
+    Raises:
+        ValueError: If the required keys alone do not fit.
+    """
+    text = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    if len(text) <= size:
+        return text
+    kept = dict(payload)
+    for key in reversed(list(kept)):
+        if key in _JSON_REQUIRED_KEYS:
+            continue
+        del kept[key]
+        text = json.dumps(kept, separators=(",", ":")).encode("utf-8")
+        if len(text) <= size:
+            return text
+    raise ValueError(f"JSON payload does not fit in {size} bytes even without optional keys: {text!r}")
+
+
+def _value_getter(field: MavlinkField):
+    """Return a function mapping a `TelemetryMessage` to the packed value of `field`."""
+    if field.source is None:
+        zero = b"" if field.c_type == "char" else 0
+        return lambda message: zero
+    if field.source == SOURCE_T_US:
+        return lambda message: message.t_us
+    if field.source == SOURCE_JSON:
+        size = field.array_length
+        return lambda message: _fit_json(message.payload, size)
+    key = field.source
+    if field.c_type == "char":
+        # struct truncates or zero-pads to the array length.
+        return lambda message: str(message.payload.get(key, "")).encode("utf-8")
+    return lambda message: message.payload.get(key, 0)
+
+
+class MavlinkEncoder:
+    """Pack `TelemetryMessage` objects into MAVLink v2 frames.
+
+    Frames are unsigned, carry `system_id`/`component_id` and a sequence number that
+    wraps at 256 and continues across calls. Payloads are truncated of trailing zero
+    bytes as MAVLink v2 requires. A `USV_EVENT` whose JSON exceeds its 240-byte field
+    drops optional keys (all but `t_us` and `type`), last first, until it fits; an event
+    that cannot fit even then raises `ValueError`. Example:
+
+        encoder = MavlinkEncoder(system_id=1, component_id=1)
+        wire = encoder.encode_batch(iter_mavlink_telemetry(timeseries, pose_hz=5.0))
+    """
+
+    def __init__(
+        self,
+        *,
+        system_id: int = 1,
+        component_id: int = 1,
+        sequence: int = 0,
+        layouts: Mapping[str, MavlinkMessageLayout] = MAVLINK_MESSAGE_LAYOUTS,
+    ) -> None:
+        if not 0 <= system_id <= 0xFF or not 0 <= component_id <= 0xFF:
+            raise ValueError("system_id and component_id must be in [0, 255]")
+        self.system_id = system_id
+        self.component_id = component_id
+        self.sequence = sequence & 0xFF
+        self._layouts = dict(layouts)
+        # Per message name: (layout, value getters, CRC_EXTRA as bytes).
+        self._packers: dict[str, tuple[MavlinkMessageLayout, tuple[Any, ...], bytes]] = {}
+
+    def _packer(self, name: str) -> tuple[MavlinkMessageLayout, tuple[Any, ...], bytes]:
+        packer = self._packers.get(name)
+        if packer is None:
+            layout = self._layouts.get(name)
+            if layout is None:
+                raise ValueError(f"no MAVLink layout for telemetry message {name!r}")
+            getters = tuple(_value_getter(field) for field in layout.fields)
+            packer = (layout, getters, bytes((layout.crc_extra,)))
+            self._packers[name] = packer
+        return packer
+
+    def encode(self, message: TelemetryMessage) -> bytes:
+        """Return the frame for one message."""
+        out = bytearray()
+        self._append(out, message)
+        return bytes(out)
+
+    def encode_batch(self, messages: Iterable[TelemetryMessage], out: bytearray | None = None) -> bytearray:
+        """Append the frames of `messages` to `out` (a new bytearray by default) and return it."""
+        if out is None:
+            out = bytearray()
+        append = self._append
+        for message in messages:
+            append(out, message)
+        return out
+
+    def _append(self, out: bytearray, message: TelemetryMessage) -> None:
+        layout, getters, crc_extra = self._packer(message.name)
+        payload = layout.payload_struct.pack(*[getter(message) for getter in getters]).rstrip(b"\x00") or b"\x00"
+        msg_id = layout.msg_id
+        header = MAVLINK_V2_HEADER_STRUCT.pack(
+            MAVLINK_STX_V2,
+            len(payload),
+            0,
+            0,
+            self.sequence,
+            self.system_id,
+            self.component_id,
+            msg_id & 0xFFFF,
+            msg_id >> 16,
+        )
+        self.sequence = (self.sequence + 1) & 0xFF
+        out += header
+        out += payload
+        out += MAVLINK_CHECKSUM_STRUCT.pack(mavlink_crc(header[1:] + payload + crc_extra))
+
+
+def encode_mavlink_frames(
+    messages: Iterable[TelemetryMessage],
+    *,
+    system_id: int = 1,
+    component_id: int = 1,
+    sequence: int = 0,
+) -> bytearray:
+    """Encode `messages` as one contiguous MAVLink v2 byte stream (see `MavlinkEncoder`)."""
+    encoder = MavlinkEncoder(system_id=system_id, component_id=component_id, sequence=sequence)
+    return encoder.encode_batch(messages)
+
+
+def _wire_dtype(layout: MavlinkMessageLayout) -> np.dtype:
+    """Structured dtype of one unpacked payload tuple of `layout`."""
+    return np.dtype(
+        [
+            (field.name, f"{_C_TYPES[field.c_type][2]}{field.array_length or ''}")
+            for field in layout.fields
+        ]
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class MavlinkCapture:
+    """Frames decoded from a MAVLink byte stream.
+
+    `telemetry` holds one table per message name with the columns of the matching
+    `TelemetryMessage` payloads; its `index` lists the frames in arrival order, so
+    iterating it yields the messages as received. `frames` (`MAVLINK_FRAME_DTYPE`) is
+    parallel to `telemetry.index`. `crc_errors` counts candidate frames of a known
+    message id whose checksum failed and `skipped_bytes` every byte discarded while
+    resynchronizing (garbage, corrupted or unknown frames, a truncated tail).
+    `event_errors` counts `USV_EVENT` frames whose text is not a JSON object (e.g.
+    truncated by the sender); their payload is `{"raw": text}` instead.
+    """
+
+    telemetry: TelemetryTables
+    frames: np.ndarray
+    crc_errors: int = 0
+    skipped_bytes: int = 0
+    event_errors: int = 0
+
+    def __len__(self) -> int:
+        return int(self.frames.shape[0])
+
+
+def _is_event_line(text: bytes) -> bool:
+    """True if `text` is a JSON object on a single line (an `events.jsonl` line)."""
+    if b"\n" in text:
+        return False
+    try:
+        return isinstance(json.loads(text), dict)
+    except ValueError:  # also UnicodeDecodeError
+        return False
+
+
+class MavlinkDecoder:
+    """Incremental MAVLink v2 parser for byte streams of any chunking.
+
+    `feed` appends a chunk and decodes every complete frame in the buffer; a frame split
+    across chunks waits for the rest. A start byte that does not begin a valid frame
+    (unknown flags or message id, checksum mismatch) is skipped and the search resumes at
+    the next byte, so the parser resynchronizes after garbage or corrupted bytes. Signed
+    frames are accepted but the signature is not checked. Decoded frames are buffered
+    as rows until `take` returns them as columnar tables. Example:
+
+        decoder = MavlinkDecoder()
+        for t_us, chunk in radio_capture:
+            decoder.feed(chunk, t_us=t_us)
+        capture = decoder.take(final=True)
+    """
+
+    def __init__(self, layouts: Mapping[str, MavlinkMessageLayout] = MAVLINK_MESSAGE_LAYOUTS) -> None:
+        # Per msg_id: (layout, payload struct size, CRC_EXTRA as bytes, unpack function).
+        self._layouts = {
+            layout.msg_id: (layout, layout.payload_struct.size, bytes((layout.crc_extra,)), layout.payload_struct.unpack)
+            for layout in layouts.values()
+        }
+        self._buffer = bytearray()
+        self._rows: dict[int, list[tuple[Any, ...]]] = {}
+        self._frames: list[tuple[int, int, int, int, int, int]] = []
+        self._t_us = 0
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+
+    @property
+    def pending_bytes(self) -> int:
+        """Bytes buffered after the last decoded frame (an incomplete frame or garbage)."""
+        return len(self._buffer)
+
+    def feed(self, data: bytes | bytearray | memoryview, t_us: int = 0) -> int:
+        """Decode the complete frames in the buffer after appending `data`.
+
+        Args:
+            data: Next chunk of the byte stream.
+            t_us: Receive time stamped on frames completed by this chunk. Messages with
+                a `SOURCE_T_US` field take their time from the frame instead.
+
+        Returns:
+            Number of frames decoded.
+        """
+        self._buffer += data
+        self._t_us = t_us
+        return self._parse(t_us, final=False)
+
+    def _parse(self, t_us: int, *, final: bool) -> int:
+        buf = self._buffer
+        find = buf.find
+        layouts = self._layouts
+        frames = self._frames
+        rows = self._rows
+        size = len(buf)
+        header_size = MAVLINK_V2_HEADER_STRUCT.size
+        stx = bytes((MAVLINK_STX_V2,))
+        start_count = len(frames)
+        pos = 0
+        while True:
+            start = find(stx, pos)
+            if start < 0:
+                self.skipped_bytes += size - pos
+                pos = size
+                break
+            self.skipped_bytes += start - pos
+            pos = start
+            if size - start < header_size:
+                if final:
+                    self.skipped_bytes += size - start
+                    pos = size
+                break
+            payload_len = buf[start + 1]
+            flags = buf[start + 2]
+            msg_id = buf[start + 7] | (buf[start + 8] << 8) | (buf[start + 9] << 16)
+            entry = layouts.get(msg_id)
+            if entry is None or flags & ~MAVLINK_IFLAG_SIGNED:
+                self.skipped_bytes += 1
+                pos = start + 1
+                continue
+            payload_end = start + header_size + payload_len
+            end = payload_end + MAVLINK_CHECKSUM_STRUCT.size
+            if flags & MAVLINK_IFLAG_SIGNED:
+                end += MAVLINK_SIGNATURE_LEN
+            if end > size:
+                if not final:
+                    break
+                # The stream ended inside this frame: drop its start byte and rescan the tail.
+                self.skipped_bytes += 1
+                pos = start + 1
+                continue
+            layout, payload_size, crc_extra, unpack = entry
+            crc = _reverse16(binascii.crc_hqx((buf[start + 1 : payload_end] + crc_extra).translate(_BIT_REVERSE), 0xFFFF))
+            if crc != buf[payload_end] | (buf[payload_end + 1] << 8):
+                self.crc_errors += 1
+                self.skipped_bytes += 1
+                pos = start + 1
+                continue
+            payload = buf[start + header_size : payload_end]
+            if payload_len < payload_size:
+                # MAVLink v2 truncates trailing zero bytes; fields beyond the layout are ignored.
+                payload += bytes(payload_size - payload_len)
+            table = rows.get(msg_id)
+            if table is None:
+                table = rows[msg_id] = []
+            table.append(unpack(payload[:payload_size]))
+            frames.append((t_us, msg_id, buf[start + 4], buf[start + 5], buf[start + 6], payload_len))
+            pos = end
+        del buf[:pos]
+        return len(frames) - start_count
+
+    def take(self, *, final: bool = False) -> MavlinkCapture:
+        """Return the frames decoded since the previous `take` and reset the counters.
+
+        With `final=True` the stream is treated as ended: a buffered incomplete frame is
+        dropped (counted in `skipped_bytes`) after rescanning its bytes for frames.
+        """
+        if final:
+            self._parse(self._t_us, final=True)
+        frames = np.array(self._frames, dtype=MAVLINK_FRAME_DTYPE)
+        rows = self._rows
+        self._frames = []
+        self._rows = {}
+
+        # Tables in order of first appearance; row of each frame within its message table.
+        msg_ids = frames["msg_id"]
+        ids, first, code = np.unique(msg_ids, return_index=True, return_inverse=True)
+        appearance = np.argsort(first, kind="stable")
+        code_of = np.empty(appearance.shape[0], dtype=np.uint16)
+        code_of[appearance] = np.arange(appearance.shape[0], dtype=np.uint16)
+        code = code_of[code.reshape(-1)]
+        by_code = np.argsort(code, kind="stable")
+        counts = np.bincount(code, minlength=appearance.shape[0])
+        row = np.empty(code.shape[0], dtype=np.int64)
+        row[by_code] = np.arange(code.shape[0], dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        tables: dict[str, np.ndarray] = {}
+        events = None
+        event_errors = 0
+        for msg_id in ids[appearance].tolist():
+            layout = self._layouts[msg_id][0]
+            wire = np.array(rows[msg_id], dtype=_wire_dtype(layout))
+            columns: dict[str, np.ndarray] = {"t_us": frames["t_us"][msg_ids == msg_id]}
+            for field in layout.fields:
+                if field.source is None:
+                    continue
+                if field.source == SOURCE_T_US:
+                    columns["t_us"] = wire[field.name]
+                elif field.source == SOURCE_JSON:
+                    # One line per frame keeps the event positions aligned with the rows.
+                    lines = []
+                    for text in wire[field.name].tolist():
+                        if not _is_event_line(text):
+                            event_errors += 1
+                            text = json.dumps({"raw": text.decode("utf-8", errors="replace")}).encode("utf-8")
+                        lines.append(text)
+                    events = parse_event_log(b"\n".join(lines))
+                    columns[_EVENT_POSITION_FIELD] = np.arange(wire.shape[0], dtype=np.int64)
+                elif field.c_type == "char":
+                    columns[field.source] = np.char.decode(wire[field.name], "utf-8", errors="replace")
+                else:
+                    columns[field.source] = wire[field.name]
+            table = np.empty(wire.shape[0], dtype=[(name, column.dtype) for name, column in columns.items()])
+            for name, column in columns.items():
+                table[name] = column
+            tables[layout.name] = table
+
+        names = tuple(tables)
+        index = np.empty(frames.shape[0], dtype=TELEMETRY_INDEX_DTYPE)
+        index["message"] = code
+        index["row"] = row
+        for message, name in enumerate(names):
+            index["t_us"][code == message] = tables[name]["t_us"]
+        capture = MavlinkCapture(
+            telemetry=TelemetryTables(tables=tables, names=names, index=index, events=events),
+            frames=frames,
+            crc_errors=self.crc_errors,
+            skipped_bytes=self.skipped_bytes,
+            event_errors=event_errors,
+        )
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+        return capture
+
+
+def decode_mavlink_frames(
+    data: bytes | bytearray | memoryview,
+    *,
+    layouts: Mapping[str, MavlinkMessageLayout] = MAVLINK_MESSAGE_LAYOUTS,
+) -> MavlinkCapture:
+    """Decode a complete MAVLink v2 byte stream (e.g. a radio capture file) at once."""
+    decoder = MavlinkDecoder(layouts)
+    decoder.feed(data)
+    return decoder.take(final=True)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import threading
+from typing import Iterable, Mapping
+
+from .cache import load_timeseries_cache
+from .io import TimeseriesData, read_timeseries_bin
+from .layout import RecordLayout
+
+TIMESERIES_FILE_NAME = "timeseries.bin"
+
+
+@dataclass(frozen=True, slots=True)
+class SessionResult:
+    """Outcome of loading one session; exactly one of `data`/`error` is set."""
+
+    path: Path
+    data: TimeseriesData | None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _timeseries_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path / TIMESERIES_FILE_NAME if path.is_dir() else path
+
+
+def _error_message(exc: Exception) -> str:
+    """`SessionResult.error` text for an exception raised while loading a session."""
+    return str(exc) if isinstance(exc, (OSError, ValueError)) else f"{type(exc).__name__}: {exc}"
+
+
+def _prepare_session(
+    path: Path,
+    record_layouts: Mapping[int, RecordLayout] | None,
+    read_kwargs: dict[str, object],
+) -> tuple[TimeseriesData | None, str | None]:
+    """Worker side: decode `path` into its on-disk cache.
+
+    Returns `(None, None)` when the parent can map the cache. Sessions the cache cannot
+    serve (read-only media, damaged files, strict reads of payload-length mismatches)
+    are read directly here and returned as data or as an error message.
+    """
+    try:
+        cache = load_timeseries_cache(path, record_layouts=record_layouts)
+    except (OSError, ValueError):
+        cache = None
+    if (
+        cache is not None
+        and cache.source_sha256  # only set once the cache is on disk
+        and not (read_kwargs["strict_payload_len"] and cache.strict_error is not None)
+    ):
+        return None, None
+    try:
+        return read_timeseries_bin(path, record_layouts=record_layouts, **read_kwargs), None
+    except (OSError, ValueError) as exc:
+        return None, str(exc)
+
+
+def _prepare_sessions_isolated(
+    session_paths: list[Path],
+    record_layouts: Mapping[int, RecordLayout] | None,
+    read_kwargs: dict[str, object],
+    workers: int,
+) -> list[tuple[TimeseriesData | None, str | None]]:
+    """`_prepare_session` for every path across `workers` worker processes.
+
+    Each worker is a single-process pool that takes one session at a time, so a worker
+    that dies (e.g. killed by the OOM killer) fails only the session it was decoding;
+    its pool is then replaced and the remaining sessions carry on.
+    """
+    prepared: list[tuple[TimeseriesData | None, str | None]] = [(None, None)] * len(session_paths)
+    pending = iter(range(len(session_paths)))
+    lock = threading.Lock()
+
+    def run_worker() -> None:
+        pool = ProcessPoolExecutor(max_workers=1)
+        try:
+            while True:
+                with lock:
+                    i = next(pending, None)
+                if i is None:
+                    return
+                try:
+                    prepared[i] = pool.submit(_prepare_session, session_paths[i], record_layouts, read_kwargs).result()
+                except BrokenProcessPool:
+                    prepared[i] = (None, "worker process died while loading the session")
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(max_workers=1)
+                except Exception as exc:
+                    prepared[i] = (None, _error_message(exc))
+        finally:
+            pool.shutdown()
+
+    with ThreadPoolExecutor(max_workers=workers) as threads:
+        for future in [threads.submit(run_worker) for _ in range(workers)]:
+            future.result()
+    return prepared
+
+
+def load_sessions(
+    paths: Iterable[str | Path],
+    *,
+    workers: int | None = None,
+    record_layouts: Mapping[int, RecordLayout] | None = None,
+    strict_payload_len: bool = True,
+    keep_unknown: bool = True,
+    memory_map: bool = False,
+    record_types: Iterable[int | str] | None = None,
+    fields: Mapping[str, Iterable[str]] | None = None,
+    t_start_us: int | None = None,
+    t_end_us: int | None = None,
+) -> list[SessionResult]:
+    """Load many sessions, decoding them across a process pool.
+
+    Workers decode each session into its columnar `timeseries.cache/` (see
+    `load_timeseries_cache`); the parent then maps the cached columns instead of
+    receiving pickled arrays, so results cost one file mapping per column. Sessions
+    with a valid cache skip decoding entirely. A failing session, including one whose
+    worker process dies, is reported in its `SessionResult.error` and does not abort
+    the batch.
+
+    Args:
+        paths: `timeseries.bin` files or session folders containing one.
+        workers: Worker processes; defaults to `os.cpu_count()`. `1` loads in-process.
+        record_layouts: Optional record decoder map.
+        strict_payload_len: See `read_timeseries_bin`.
+        keep_unknown: See `read_timeseries_bin`.
+        memory_map: If True, return read-only views into the cache files (payload
+            dtypes) instead of float64/int64 copies.
+        record_types: Optional record types (IDs or names) to return.
+        fields: Optional per-record field projection.
+        t_start_us: Optional inclusive start of a `t_us` window.
+        t_end_us: Optional exclusive end of a `t_us` window.
+
+    Returns:
+        One result per input path, in input order.
+    """
+    session_paths = [_timeseries_path(path) for path in paths]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 0:
+        raise ValueError("workers must be > 0")
+    read_kwargs: dict[str, object] = {
+        "strict_payload_len": strict_payload_len,
+        "keep_unknown": keep_unknown,
+        "memory_map": memory_map,
+        "record_types": None if record_types is None else tuple(record_types),
+        "fields": None if fields is None else {name: tuple(wanted) for name, wanted in fields.items()},
+        "t_start_us": t_start_us,
+        "t_end_us": t_end_us,
+    }
+
+    if workers == 1 or len(session_paths) <= 1:
+        prepared = []
+        for path in session_paths:
+            try:
+                prepared.append(_prepare_session(path, record_layouts, read_kwargs))
+            except Exception as exc:
+                prepared.append((None, _error_message(exc)))
+    else:
+        prepared = _prepare_sessions_isolated(
+            session_paths, record_layouts, read_kwargs, min(workers, len(session_paths))
+        )
+
+    results: list[SessionResult] = []
+    for path, (data, error) in zip(session_paths, prepared):
+        if data is None and error is None:
+            try:
+                data = read_timeseries_bin(path, record_layouts=record_layouts, use_cache=True, **read_kwargs)
+            except Exception as exc:
+                error = _error_message(exc)
+        results.append(SessionResult(path=path, data=data, error=error))
+    return results
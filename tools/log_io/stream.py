@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Mapping
+
+import numpy as np
+
+from .index import RECORD_HEADER_DTYPE, TimeseriesIndex, _index_from_scan, _scan_record_headers
+from .io import TimeseriesData, TimeseriesHeader, _decode_timeseries, _normalize_layouts, _parse_file_header
+from .layout import FILE_HEADER_STRUCT, RECORD_HEADER_STRUCT, RecordLayout
+
+
+class _RecordBuffer:
+    """Bytes read from a TLV stream, split into complete records and a pending tail.
+
+    Bytes are appended with `feed()`; each call scans only the newly completed records.
+    `take()` hands out the oldest complete records as a standalone buffer + index (and
+    the buffer's file offset) and drops them, so memory stays bounded by one chunk plus one read.
+    Taken bytes stay in the underlying `bytearray` until they make up half of it, so
+    appending and compacting both cost amortized linear time in the bytes read.
+    """
+
+    def __init__(self, base_offset: int) -> None:
+        self.data = bytearray()
+        self.start = 0  # data[:start] has already been taken
+        self.base_offset = base_offset  # file offset of data[start]
+        self.scan_offset = 0  # start of the first unscanned (possibly partial) record, relative to start
+        self.header_offsets = np.empty(0, dtype=np.int64)
+        self.headers = np.empty(0, dtype=RECORD_HEADER_DTYPE)
+        self.tail_error: str | None = None
+
+    @property
+    def complete_records(self) -> int:
+        return int(self.header_offsets.shape[0])
+
+    @property
+    def pending_bytes(self) -> int:
+        return len(self.data) - self.start - self.scan_offset
+
+    @property
+    def end_offset(self) -> int:
+        """File offset just past the last byte fed."""
+        return self.base_offset + len(self.data) - self.start
+
+    def feed(self, block: bytes) -> None:
+        if not block:
+            return
+        if self.start and 2 * self.start >= len(self.data):
+            del self.data[: self.start]
+            self.start = 0
+        self.data += block
+        view = memoryview(self.data)[self.start :]
+        try:
+            header_offsets, headers, self.tail_error = _scan_record_headers(
+                view, self.scan_offset, base_offset=self.base_offset
+            )
+        finally:
+            view.release()
+        if header_offsets.shape[0] == 0:
+            return
+        self.header_offsets = np.concatenate((self.header_offsets, header_offsets))
+        self.headers = np.concatenate((self.headers, headers))
+        self.scan_offset = (
+            int(header_offsets[-1]) + RECORD_HEADER_STRUCT.size + int(headers["payload_len"][-1])
+        )
+
+    def take(self, max_records: int, header: TimeseriesHeader) -> tuple[bytes, TimeseriesIndex, int]:
+        count = min(max_records, self.complete_records)
+        if count < self.complete_records:
+            cut = int(self.header_offsets[count])
+        else:
+            cut = self.scan_offset
+        data = bytes(memoryview(self.data)[self.start : self.start + cut])
+        base_offset = self.base_offset
+        index = _index_from_scan(
+            self.header_offsets[:count],
+            self.headers[:count],
+            None,
+            fw_model_schema=header.fw_model_schema,
+            t0_us=header.t0_us,
+            file_size=len(data),
+            file_mtime_ns=0,
+        )
+
+        self.start += cut
+        self.base_offset += cut
+        self.scan_offset -= cut
+        self.header_offsets = self.header_offsets[count:] - cut
+        self.headers = self.headers[count:]
+        return data, index, base_offset
+
+
+def iter_timeseries_chunks(
+    path: str | Path,
+    *,
+    chunk_records: int = 1 << 16,
+    record_layouts: Mapping[int, RecordLayout] | None = None,
+    strict_payload_len: bool = True,
+    keep_unknown: bool = True,
+    record_types: Iterable[int | str] | None = None,
+    fields: Mapping[str, Iterable[str]] | None = None,
+    read_size: int = 1 << 20,
+) -> Iterator[TimeseriesData]:
+    """Stream `timeseries.bin` as a sequence of `TimeseriesData` blocks.
+
+    The file is read `read_size` bytes at a time; records straddling a read boundary are
+    carried over to the next block. Each yielded block holds up to `chunk_records`
+    consecutive records (counting all types, before `record_types` filtering), so memory
+    use is bounded independently of file size.
+
+    Args:
+        path: Path to `timeseries.bin`.
+        chunk_records: Records (of any type) per yielded block.
+        record_layouts: Optional record decoder map. Unknown type IDs are skipped.
+        strict_payload_len: If True, mismatched payload size for known record raises.
+        keep_unknown: If True, collect unknown record metadata.
+        record_types: Optional record types (IDs or names) to decode.
+        fields: Optional per-record field projection (see `read_timeseries_bin`).
+        read_size: Bytes per file read.
+
+    Yields:
+        Blocks in file order; a record type missing from a block had no records in it.
+    """
+    if chunk_records <= 0:
+        raise ValueError("chunk_records must be > 0")
+    if read_size <= 0:
+        raise ValueError("read_size must be > 0")
+
+    with Path(path).open("rb") as fh:
+        header = _parse_file_header(fh.read(FILE_HEADER_STRUCT.size))
+        layouts = _normalize_layouts(record_layouts, header.fw_model_schema)
+        buffer = _RecordBuffer(FILE_HEADER_STRUCT.size)
+        for data, index, base_offset in _iter_chunk_buffers(fh, buffer, header, chunk_records, read_size):
+            yield _decode_timeseries(
+                data,
+                header,
+                index,
+                layouts,
+                strict_payload_len=strict_payload_len,
+                keep_unknown=keep_unknown,
+                record_types=record_types,
+                fields=fields,
+                base_offset=base_offset,
+            )
+
+    if buffer.pending_bytes:
+        raise ValueError(buffer.tail_error)
+
+
+def _iter_chunk_buffers(
+    fh: BinaryIO,
+    buffer: _RecordBuffer,
+    header: TimeseriesHeader,
+    chunk_records: int,
+    read_size: int,
+) -> Iterator[tuple[bytes, TimeseriesIndex, int]]:
+    while True:
+        block = fh.read(read_size)
+        buffer.feed(block)
+        while buffer.complete_records >= chunk_records or (not block and buffer.complete_records):
+            yield buffer.take(chunk_records, header)
+        if not block:
+            return
+
+
+class TimeseriesFollower:
+    """Tail a `timeseries.bin` that is still being appended to (e.g. during bench tests).
+
+    The file handle stays open between polls and only bytes appended since the last
+    poll are read and scanned. A partially written trailing record (or file header) is
+    kept pending until the logger completes it, instead of raising like
+    `read_timeseries_bin` does. Each poll reads at most `max_poll_bytes`, so catching
+    up on a large file takes several polls instead of one whole-file read.
+
+    Example:
+        with TimeseriesFollower(path, record_types=["REC_NAV_SOLUTION"]) as follower:
+            while running:
+                update_plot(follower.poll())  # None when nothing new was completed
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        record_layouts: Mapping[int, RecordLayout] | None = None,
+        strict_payload_len: bool = True,
+        keep_unknown: bool = True,
+        record_types: Iterable[int | str] | None = None,
+        fields: Mapping[str, Iterable[str]] | None = None,
+        read_size: int = 1 << 20,
+        max_poll_bytes: int = 1 << 26,
+    ) -> None:
+        if read_size <= 0:
+            raise ValueError("read_size must be > 0")
+        if max_poll_bytes <= 0:
+            raise ValueError("max_poll_bytes must be > 0")
+        self._fh: BinaryIO = Path(path).open("rb")
+        self._record_layouts = record_layouts
+        self._layouts: Mapping[int, RecordLayout] = {}
+        self._strict_payload_len = strict_payload_len
+        self._keep_unknown = keep_unknown
+        self._record_types = None if record_types is None else tuple(record_types)
+        self._fields = fields
+        self._read_size = read_size
+        self._max_poll_bytes = max_poll_bytes
+        self._header_raw = b""
+        self._buffer = _RecordBuffer(FILE_HEADER_STRUCT.size)
+        self.header: TimeseriesHeader | None = None
+
+    @property
+    def offset(self) -> int:
+        """File offset just past the last complete record returned by `poll()`."""
+        return self._buffer.base_offset if self.header is not None else 0
+
+    def poll(self, max_records: int | None = None) -> TimeseriesData | None:
+        """Return records completed since the last poll, or None if there are none.
+
+        At most `max_poll_bytes` are read from the file per call; records past that
+        are returned by later polls.
+
+        Args:
+            max_records: Optional cap on records (of any type) returned by this call;
+                the rest stay queued for the next poll.
+        """
+        if self.header is None and not self._read_header():
+            return None
+
+        if os.fstat(self._fh.fileno()).st_size < self._buffer.end_offset:
+            raise ValueError("timeseries file shrank while following; was it truncated or replaced?")
+
+        if max_records is not None and max_records <= 0:
+            raise ValueError("max_records must be > 0")
+        budget = self._max_poll_bytes
+        while budget > 0 and (max_records is None or self._buffer.complete_records < max_records):
+            block = self._fh.read(min(self._read_size, budget))
+            if not block:
+                break
+            budget -= len(block)
+            self._buffer.feed(block)
+        if self._buffer.complete_records == 0:
+            return None
+
+        data, index, base_offset = self._buffer.take(max_records or self._buffer.complete_records, self.header)
+        return _decode_timeseries(
+            data,
+            self.header,
+            index,
+            self._layouts,
+            strict_payload_len=self._strict_payload_len,
+            keep_unknown=self._keep_unknown,
+            record_types=self._record_types,
+            fields=self._fields,
+            base_offset=base_offset,
+        )
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> TimeseriesFollower:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _read_header(self) -> bool:
+        self._header_raw += self._fh.read(FILE_HEADER_STRUCT.size - len(self._header_raw))
+        if len(self._header_raw) < FILE_HEADER_STRUCT.size:
+            return False
+        self.header = _parse_file_header(self._header_raw)
+        self._layouts = _normalize_layouts(self._record_layouts, self.header.fw_model_schema)
+        return True
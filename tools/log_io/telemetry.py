@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from itertools import repeat
 import json
 from pathlib import Path
-from typing import Any, Iterator
+from typing import Any, Final, Iterator
 
 import numpy as np
 
+from .events import EventLog, read_event_log
 from .io import TimeseriesData
 
 # Messages mapped directly onto the MAVLink common set.
@@ -36,19 +38,6 @@ class TelemetryMessage:
     predefined: bool
 
 
-def _read_events_jsonl(path: Path) -> list[dict[str, Any]]:
-    if not path.exists():
-        return []
-    events: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as fh:
-        for line in fh:
-            line = line.strip()
-            if not line:
-                continue
-            events.append(json.loads(line))
-    return events
-
-
 def _severity_for_event(event_type: str) -> int:
     if event_type in {"LOG_OVERFLOW", "LINK_LOSS"}:
         return 4  # warning
@@ -57,7 +46,95 @@ def _severity_for_event(event_type: str) -> int:
     return 6  # info by default
 
 
-def iter_mavlink_telemetry(
+def _schedule_indices(t_us: np.ndarray, period_us: int) -> np.ndarray:
+    """Sample indices at which a fixed-rate scheduler over `t_us` fires.
+
+    The scheduler fires on the first sample at or past its due time and then moves the
+    due time on by one period, so the k-th firing is at the first sample at or past
+    `t_us[0] + k * period_us`, but always after the previous firing (a gap is caught up
+    one sample at a time). `t_us` must be non-decreasing.
+    """
+    n = int(t_us.shape[0])
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    t0 = int(t_us[0])
+    # Firing k happens no earlier than sample k and only for due times up to the last sample.
+    count = min(n, (int(t_us[-1]) - t0) // period_us + 1)
+    k = np.arange(count, dtype=np.int64)
+    due = np.searchsorted(t_us, np.uint64(t0) + k.astype(np.uint64) * np.uint64(period_us), side="left")
+    fired = k + np.maximum.accumulate(due - k)
+    return fired[fired < n]
+
+
+_CUSTOM_NAMES: Final[frozenset[str]] = frozenset(CUSTOM_MAVLINK_MESSAGES.values())
+
+# Merged message index of `TelemetryTables`: time, message code (index into `names`) and
+# row of that message's table.
+TELEMETRY_INDEX_DTYPE: Final[np.dtype] = np.dtype([("t_us", "<u8"), ("message", "<u2"), ("row", "<i8")])
+
+# Payload column of `USV_EVENT` tables: position of the event in `TelemetryTables.events`.
+_EVENT_POSITION_FIELD: Final[str] = "event"
+
+
+@dataclass(frozen=True, slots=True)
+class TelemetryTables:
+    """Telemetry of one session as one table per message name.
+
+    Each table in `tables` is a structured array of `t_us` plus the payload fields, in
+    time order. `index` (`TELEMETRY_INDEX_DTYPE`) merges all tables in time order; at
+    equal times messages follow their emission order for a `REC_NAV_SOLUTION` sample
+    (heartbeat, status, pose, debug), then events. `USV_EVENT` rows hold the position of
+    the event in `events`, whose JSON is only decoded when the message is materialized.
+    """
+
+    tables: dict[str, np.ndarray]
+    names: tuple[str, ...]
+    index: np.ndarray
+    events: EventLog | None = None
+
+    def __len__(self) -> int:
+        return int(self.index.shape[0])
+
+    def __iter__(self) -> Iterator[TelemetryMessage]:
+        """Materialize the messages in `index` order.
+
+        Each entry is read from its `row`, so a sliced or filtered `index` (e.g. a time
+        window) yields exactly its own messages.
+        """
+        codes = self.index["message"]
+        rows = self.index["row"]
+        streams = [self._iter_table(name, rows[codes == code]) for code, name in enumerate(self.names)]
+        return map(next, map(streams.__getitem__, codes.tolist()))
+
+    def _iter_table(self, name: str, rows: np.ndarray) -> Iterator[TelemetryMessage]:
+        table = self.tables[name]
+        if not np.array_equal(rows, np.arange(table.shape[0])):
+            table = table[rows]
+        predefined = name not in _CUSTOM_NAMES
+        t_us = table["t_us"].tolist()
+        if name == CUSTOM_MAVLINK_MESSAGES["event_structured"]:
+            payloads = map(self.events.__getitem__, table[_EVENT_POSITION_FIELD].tolist())
+        else:
+            keys = [field for field in table.dtype.names if field != "t_us"]
+            payloads = map(dict, map(zip, repeat(keys), zip(*(table[key].tolist() for key in keys))))
+        for t, payload in zip(t_us, payloads):
+            yield TelemetryMessage(t, name, payload, predefined)
+
+
+def _message_table(t_us: np.ndarray, payload: dict[str, Any]) -> np.ndarray:
+    """Structured array of `t_us` plus `payload` columns; scalar values are broadcast."""
+    columns = {field: np.asarray(value) for field, value in payload.items()}
+    table = np.empty(
+        t_us.shape[0],
+        dtype=[("t_us", "<u8"), *((field, column.dtype) for field, column in columns.items())],
+    )
+    table["t_us"] = t_us
+    for field, column in columns.items():
+        table[field] = column
+    return table
+
+
+def build_mavlink_telemetry_tables(
     timeseries: TimeseriesData,
     *,
     events_jsonl: Path | None = None,
@@ -65,11 +142,12 @@ def iter_mavlink_telemetry(
     status_hz: float = 1.0,
     pose_hz: float = 5.0,
     include_custom_messages: bool = False,
-) -> Iterator[TelemetryMessage]:
-    """Yield MAVLink-aligned telemetry messages from parsed timeseries data.
+) -> TelemetryTables:
+    """Build MAVLink-aligned telemetry as columnar message tables.
 
-    This emits message payload dictionaries (not binary MAVLink frames) so the same
-    mapping can be reused by dummy and real transports.
+    The heartbeat/status/pose emission times are computed up front against the rate grids
+    (see `_schedule_indices`) and every payload column is derived as a whole array; no
+    per-message object is created. Arguments are those of `iter_mavlink_telemetry`.
     """
     if heartbeat_hz <= 0.0 or status_hz <= 0.0 or pose_hz <= 0.0:
         raise ValueError("heartbeat_hz, status_hz, and pose_hz must all be > 0")
@@ -86,9 +164,6 @@ def iter_mavlink_telemetry(
     mixer = timeseries.records.get("REC_MIXER_FEEDBACK")
 
     t_nav = nav["t_us"].astype(np.uint64)
-    next_hb = int(t_nav[0])
-    next_status = int(t_nav[0])
-    next_pose = int(t_nav[0])
 
     hb_dt_us = int(round(1_000_000.0 / heartbeat_hz))
     status_dt_us = int(round(1_000_000.0 / status_hz))
@@ -98,158 +173,196 @@ def iter_mavlink_telemetry(
     t_end = int(t_nav[-1]) if len(t_nav) > 1 else t_start
     span = max(1, t_end - t_start)
 
-    for i, t_u64 in enumerate(t_nav):
-        t_us = int(t_u64)
-
-        if t_us >= next_hb:
-            yield TelemetryMessage(
-                t_us=t_us,
-                name=PREDEFINED_MAVLINK_MESSAGES["heartbeat"],
-                predefined=True,
-                payload={
-                    "type": 11,  # MAV_TYPE_SURFACE_BOAT
-                    "autopilot": 12,  # MAV_AUTOPILOT_GENERIC
-                    "base_mode": 0,
-                    "custom_mode": 0,
-                    "system_status": 4,  # MAV_STATE_ACTIVE
-                    "mavlink_version": 3,
-                },
-            )
-            next_hb += hb_dt_us
-
-        if t_us >= next_status:
-            frac = float(t_us - t_start) / float(span)
-            battery_remaining = int(max(0.0, 100.0 - 8.0 * frac))
-            voltage_mv = int(16800 - (400 * frac))
-            yield TelemetryMessage(
-                t_us=t_us,
-                name=PREDEFINED_MAVLINK_MESSAGES["status"],
-                predefined=True,
-                payload={
-                    "onboard_control_sensors_present": 0,
-                    "onboard_control_sensors_enabled": 0,
-                    "onboard_control_sensors_health": 0,
-                    "voltage_battery": voltage_mv,
-                    "current_battery": -1,
-                    "battery_remaining": battery_remaining,
-                },
-            )
+    hb_idx = _schedule_indices(t_nav, hb_dt_us)
+    status_idx = _schedule_indices(t_nav, status_dt_us)
+    pose_idx = _schedule_indices(t_nav, pose_dt_us)
 
-            if ekf is not None and i < len(ekf["t_us"]):
-                flags = int(ekf["status_flags"][i])
-                yield TelemetryMessage(
-                    t_us=t_us,
-                    name=PREDEFINED_MAVLINK_MESSAGES["ekf_status"],
-                    predefined=True,
-                    payload={
-                        "flags": flags,
-                        "vel_variance": float(ekf["P_v"][i]),
-                        "pos_horiz_variance": float(ekf["P_xx"][i] + ekf["P_yy"][i]),
-                        "pos_vert_variance": 0.0,
-                        "compass_variance": 0.0,
-                        "terrain_alt_variance": 0.0,
-                    },
-                )
-            next_status += status_dt_us
-
-        if t_us >= next_pose:
-            psi = float(nav["psi"][i])
-            v = float(nav["v"][i])
-            r = float(nav["r"][i])
-            yield TelemetryMessage(
-                t_us=t_us,
-                name=PREDEFINED_MAVLINK_MESSAGES["pose_local"],
-                predefined=True,
-                payload={
-                    "time_boot_ms": int(t_us // 1000),
-                    "x": float(nav["x"][i]),
-                    "y": float(nav["y"][i]),
-                    "z": 0.0,
-                    "vx": float(v * np.cos(psi)),
-                    "vy": float(v * np.sin(psi)),
-                    "vz": 0.0,
-                },
-            )
-            yield TelemetryMessage(
-                t_us=t_us,
-                name=PREDEFINED_MAVLINK_MESSAGES["pose_attitude"],
-                predefined=True,
-                payload={
-                    "time_boot_ms": int(t_us // 1000),
-                    "roll": 0.0,
-                    "pitch": 0.0,
-                    "yaw": psi,
-                    "rollspeed": 0.0,
-                    "pitchspeed": 0.0,
-                    "yawspeed": r,
-                },
-            )
+    # Tables in the order messages of one sample are emitted, with their sample indices.
+    tables: dict[str, np.ndarray] = {}
+    samples: dict[str, np.ndarray] = {}
+
+    def add_table(name: str, idx: np.ndarray, payload: dict[str, Any]) -> None:
+        tables[name] = _message_table(t_nav[idx], payload)
+        samples[name] = idx
+
+    add_table(
+        PREDEFINED_MAVLINK_MESSAGES["heartbeat"],
+        hb_idx,
+        {
+            "type": 11,  # MAV_TYPE_SURFACE_BOAT
+            "autopilot": 12,  # MAV_AUTOPILOT_GENERIC
+            "base_mode": 0,
+            "custom_mode": 0,
+            "system_status": 4,  # MAV_STATE_ACTIVE
+            "mavlink_version": 3,
+        },
+    )
+
+    frac = (t_nav[status_idx].astype(np.int64) - t_start).astype(np.float64) / float(span)
+    add_table(
+        PREDEFINED_MAVLINK_MESSAGES["status"],
+        status_idx,
+        {
+            "onboard_control_sensors_present": 0,
+            "onboard_control_sensors_enabled": 0,
+            "onboard_control_sensors_health": 0,
+            "voltage_battery": (16800 - (400 * frac)).astype(np.int64),
+            "current_battery": -1,
+            "battery_remaining": np.maximum(0.0, 100.0 - 8.0 * frac).astype(np.int64),
+        },
+    )
+
+    if ekf is not None:
+        ekf_idx = status_idx[status_idx < len(ekf["t_us"])]
+        add_table(
+            PREDEFINED_MAVLINK_MESSAGES["ekf_status"],
+            ekf_idx,
+            {
+                "flags": ekf["status_flags"][ekf_idx].astype(np.int64),
+                "vel_variance": ekf["P_v"][ekf_idx].astype(np.float64),
+                # Summed in the column dtype (float64 by default, float32 from a memory_map
+                # read), then widened to float64.
+                "pos_horiz_variance": (ekf["P_xx"][ekf_idx] + ekf["P_yy"][ekf_idx]).astype(np.float64),
+                "pos_vert_variance": 0.0,
+                "compass_variance": 0.0,
+                "terrain_alt_variance": 0.0,
+            },
+        )
+
+    time_boot_ms = (t_nav[pose_idx] // np.uint64(1000)).astype(np.int64)
+    psi = nav["psi"][pose_idx].astype(np.float64)
+    v = nav["v"][pose_idx].astype(np.float64)
+    add_table(
+        PREDEFINED_MAVLINK_MESSAGES["pose_local"],
+        pose_idx,
+        {
+            "time_boot_ms": time_boot_ms,
+            "x": nav["x"][pose_idx].astype(np.float64),
+            "y": nav["y"][pose_idx].astype(np.float64),
+            "z": 0.0,
+            "vx": v * np.cos(psi),
+            "vy": v * np.sin(psi),
+            "vz": 0.0,
+        },
+    )
+    add_table(
+        PREDEFINED_MAVLINK_MESSAGES["pose_attitude"],
+        pose_idx,
+        {
+            "time_boot_ms": time_boot_ms,
+            "roll": 0.0,
+            "pitch": 0.0,
+            "yaw": psi,
+            "rollspeed": 0.0,
+            "pitchspeed": 0.0,
+            "yawspeed": nav["r"][pose_idx].astype(np.float64),
+        },
+    )
 
-            if include_custom_messages and speed_ctrl is not None and yaw_ctrl is not None and mixer is not None and actuator_req is not None and actuator_cmd is not None:
-                if (
-                    i < len(speed_ctrl["t_us"]) and i < len(yaw_ctrl["t_us"]) and i < len(mixer["t_us"]) and
-                    i < len(actuator_req["t_us"]) and i < len(actuator_cmd["t_us"])
-                ):
-                    yield TelemetryMessage(
-                        t_us=t_us,
-                        name=CUSTOM_MAVLINK_MESSAGES["ctrl_debug"],
-                        predefined=False,
-                        payload={
-                            "v_d": float(speed_ctrl["v_d"][i]),
-                            "v_hat": float(speed_ctrl["v_hat"][i]),
-                            "u_s_req": float(actuator_req["u_s_req"][i]),
-                            "u_d_req": float(actuator_req["u_d_req"][i]),
-                            "u_s_cmd": float(actuator_cmd["u_s_cmd"][i]),
-                            "u_d_cmd": float(actuator_cmd["u_d_cmd"][i]),
-                            "e_psi": float(yaw_ctrl["e_psi"][i]),
-                        },
-                    )
-                    yield TelemetryMessage(
-                        t_us=t_us,
-                        name=CUSTOM_MAVLINK_MESSAGES["mixer_feedback"],
-                        predefined=False,
-                        payload={
-                            "u_s_ach": float(mixer["u_s_ach"][i]),
-                            "u_d_ach": float(mixer["u_d_ach"][i]),
-                            "sat_any": int(mixer["sat_any"][i]),
-                        },
-                    )
-
-            next_pose += pose_dt_us
-
-    events = _read_events_jsonl(events_jsonl) if events_jsonl is not None else []
-    for event in events:
-        t_us = int(event.get("t_us", t_end))
-        event_type = str(event.get("type", "EVENT"))
-        txt = f"{event_type}: {json.dumps(event, separators=(',', ':'))}"
-        yield TelemetryMessage(
-            t_us=t_us,
-            name=PREDEFINED_MAVLINK_MESSAGES["event_text"],
-            predefined=True,
-            payload={
-                "severity": _severity_for_event(event_type),
-                "text": txt[:50],  # MAVLink STATUSTEXT text length.
+    custom = (speed_ctrl, yaw_ctrl, mixer, actuator_req, actuator_cmd)
+    if include_custom_messages and all(records is not None for records in custom):
+        debug_idx = pose_idx[pose_idx < min(len(records["t_us"]) for records in custom)]
+        add_table(
+            CUSTOM_MAVLINK_MESSAGES["ctrl_debug"],
+            debug_idx,
+            {
+                "v_d": speed_ctrl["v_d"][debug_idx].astype(np.float64),
+                "v_hat": speed_ctrl["v_hat"][debug_idx].astype(np.float64),
+                "u_s_req": actuator_req["u_s_req"][debug_idx].astype(np.float64),
+                "u_d_req": actuator_req["u_d_req"][debug_idx].astype(np.float64),
+                "u_s_cmd": actuator_cmd["u_s_cmd"][debug_idx].astype(np.float64),
+                "u_d_cmd": actuator_cmd["u_d_cmd"][debug_idx].astype(np.float64),
+                "e_psi": yaw_ctrl["e_psi"][debug_idx].astype(np.float64),
+            },
+        )
+        add_table(
+            CUSTOM_MAVLINK_MESSAGES["mixer_feedback"],
+            debug_idx,
+            {
+                "u_s_ach": mixer["u_s_ach"][debug_idx].astype(np.float64),
+                "u_d_ach": mixer["u_d_ach"][debug_idx].astype(np.float64),
+                "sat_any": mixer["sat_any"][debug_idx].astype(np.int64),
             },
         )
 
+    # Emission keys order messages by sample, then by table; events follow all samples.
+    emission: dict[str, np.ndarray] = {
+        name: idx * len(samples) + slot for slot, (name, idx) in enumerate(samples.items())
+    }
+    events = read_event_log(events_jsonl) if events_jsonl is not None and events_jsonl.exists() else None
+    if events is not None and len(events):
+        event_t = np.where(events.t_us_valid, events.t_us, np.int64(t_end))
+        positions = np.argsort(event_t, kind="stable")
+        event_t = event_t[positions].astype(np.uint64)
+        event_types = [events.type_of(position) for position in positions.tolist()]
+        payloads = [events[position] for position in positions.tolist()]
+        # Events come after every sample; within an event, text, structured, then ack.
+        event_key = len(t_nav) * len(samples) + 3 * np.arange(len(positions), dtype=np.int64)
+
+        texts = [
+            f"{event_type}: {json.dumps(event, separators=(',', ':'))}"[:50]  # MAVLink STATUSTEXT text length.
+            for event_type, event in zip(event_types, payloads)
+        ]
+        severity = [_severity_for_event(event_type) for event_type in event_types]
+        tables[PREDEFINED_MAVLINK_MESSAGES["event_text"]] = _message_table(
+            event_t,
+            {"severity": np.array(severity, dtype=np.int64), "text": np.array(texts, dtype="U50")},
+        )
+        emission[PREDEFINED_MAVLINK_MESSAGES["event_text"]] = event_key
+
         if include_custom_messages:
-            yield TelemetryMessage(
-                t_us=t_us,
-                name=CUSTOM_MAVLINK_MESSAGES["event_structured"],
-                predefined=False,
-                payload=event,
+            tables[CUSTOM_MAVLINK_MESSAGES["event_structured"]] = _message_table(
+                event_t, {_EVENT_POSITION_FIELD: positions.astype(np.int64)}
             )
+            emission[CUSTOM_MAVLINK_MESSAGES["event_structured"]] = event_key + 1
 
-        if event_type == "PARAM_APPLY":
-            param_id = str(event.get("id", "unknown"))[:16]
-            yield TelemetryMessage(
-                t_us=t_us,
-                name=PREDEFINED_MAVLINK_MESSAGES["param_ack"],
-                predefined=True,
-                payload={
-                    "param_id": param_id,
-                    "param_value": str(event.get("new", ""))[:128],
+        acks = np.array([event_type == "PARAM_APPLY" for event_type in event_types], dtype=bool)
+        if bool(acks.any()):
+            acked = [event for event, ack in zip(payloads, acks.tolist()) if ack]
+            tables[PREDEFINED_MAVLINK_MESSAGES["param_ack"]] = _message_table(
+                event_t[acks],
+                {
+                    "param_id": np.array([str(event.get("id", "unknown"))[:16] for event in acked], dtype="U16"),
+                    "param_value": np.array([str(event.get("new", ""))[:128] for event in acked], dtype="U128"),
                     "param_type": 9,  # MAV_PARAM_EXT_TYPE_REAL32
                     "param_result": 0,  # MAV_PARAM_EXT_ACK_ACCEPTED
                 },
             )
+            emission[PREDEFINED_MAVLINK_MESSAGES["param_ack"]] = event_key[acks] + 2
+
+    names = tuple(tables)
+    index = np.empty(sum(table.shape[0] for table in tables.values()), dtype=TELEMETRY_INDEX_DTYPE)
+    index["t_us"] = np.concatenate([tables[name]["t_us"] for name in names])
+    index["message"] = np.concatenate(
+        [np.full(tables[name].shape[0], code, dtype=np.uint16) for code, name in enumerate(names)]
+    )
+    index["row"] = np.concatenate([np.arange(tables[name].shape[0], dtype=np.int64) for name in names])
+    keys = np.concatenate([emission[name] for name in names])
+    index = index[np.lexsort((keys, index["t_us"]))]
+    return TelemetryTables(tables=tables, names=names, index=index, events=events)
+
+
+def iter_mavlink_telemetry(
+    timeseries: TimeseriesData,
+    *,
+    events_jsonl: Path | None = None,
+    heartbeat_hz: float = 1.0,
+    status_hz: float = 1.0,
+    pose_hz: float = 5.0,
+    include_custom_messages: bool = False,
+) -> Iterator[TelemetryMessage]:
+    """Yield MAVLink-aligned telemetry messages from parsed timeseries data.
+
+    This emits message payload dictionaries (not binary MAVLink frames) so the same
+    mapping can be reused by dummy and real transports. It is a view over
+    `build_mavlink_telemetry_tables`: messages are built only as they are yielded, in
+    time order.
+    """
+    yield from build_mavlink_telemetry_tables(
+        timeseries,
+        events_jsonl=events_jsonl,
+        heartbeat_hz=heartbeat_hz,
+        status_hz=status_hz,
+        pose_hz=pose_hz,
+        include_custom_messages=include_custom_messages,
+    )
@@ -0,0 +1,432 @@
+from __future__ import annotations
+
+from functools import lru_cache
+import json
+import lzma
+import os
+from pathlib import Path
+from typing import BinaryIO, Mapping, Sequence
+
+import zlib
+
+import numpy as np
+
+from .index import RECORD_HEADER_DTYPE, _map_file, index_timeseries_buffer
+from .io import TimeseriesData, _normalize_layouts
+from .layout import (
+    BLOCK_CODEC_LZMA,
+    BLOCK_CODEC_ZLIB,
+    BLOCK_FILE_HEADER_STRUCT,
+    BLOCK_FLAG_FRAGMENT,
+    BLOCK_FORMAT_VERSION,
+    BLOCK_MAGIC,
+    BLOCK_TABLE_DTYPE,
+    BLOCK_TRAILER_STRUCT,
+    ENDIAN_LITTLE,
+    FILE_HEADER_STRUCT,
+    MAGIC,
+    RECORD_HEADER_STRUCT,
+    RecordLayout,
+    payload_dtype,
+)
+
+_RECORD_HEADER_PACK_INTO = RECORD_HEADER_STRUCT.pack_into
+# The buffer must hold the file header or any single record (16-bit `len` field).
+_MAX_RECORD_SIZE = RECORD_HEADER_STRUCT.size + 0xFFFF
+_BLOCK_CODECS = {
+    "zlib": (BLOCK_CODEC_ZLIB, lambda data, level: zlib.compress(data, 6 if level is None else level)),
+    "lzma": (BLOCK_CODEC_LZMA, lambda data, level: lzma.compress(data, preset=6 if level is None else level)),
+}
+
+
+@lru_cache(maxsize=None)
+def record_dtype(layout: RecordLayout) -> np.dtype:
+    """Structured dtype of one complete TLV record (header + payload) of `layout`.
+
+    Header fields are `t_us`, `type_id` and `payload_len`; payload fields keep their
+    `payload_dtype` offsets shifted past the header. Pad bytes are unnamed gaps.
+    """
+    payload = payload_dtype(layout)
+    names = list(RECORD_HEADER_DTYPE.names)
+    formats = [RECORD_HEADER_DTYPE.fields[name][0] for name in names]
+    offsets = [RECORD_HEADER_DTYPE.fields[name][1] for name in names]
+    for name in payload.names:
+        field_dtype, offset = payload.fields[name][:2]
+        names.append(name)
+        formats.append(field_dtype)
+        offsets.append(RECORD_HEADER_STRUCT.size + offset)
+    return np.dtype(
+        {
+            "names": names,
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": RECORD_HEADER_STRUCT.size + payload.itemsize,
+        }
+    )
+
+
+def pack_records(
+    layout: RecordLayout,
+    t_us: np.ndarray | Sequence[int],
+    values: np.ndarray | Mapping[str, object],
+) -> np.ndarray:
+    """Build complete TLV records of `layout` as a `record_dtype` array.
+
+    Args:
+        layout: Record layout of every record.
+        t_us: Record times, one per record.
+        values: Structured array with the layout's field names, or a mapping of field
+            name to array (or scalar, broadcast to every record). Values are cast to the
+            payload dtype like `struct.pack` does; pad bytes are zero.
+
+    Returns:
+        Records whose raw bytes are exactly what `struct` packing would write.
+    """
+    t_us = np.asarray(t_us)
+    records = np.zeros(t_us.shape[0], dtype=record_dtype(layout))
+    records["t_us"] = t_us
+    records["type_id"] = layout.type_id
+    records["payload_len"] = layout.payload_struct.size
+    for field in layout.fields:
+        records[field] = values[field]
+    return records
+
+
+def interleave_records(records: Sequence[np.ndarray]) -> np.ndarray:
+    """Merge complete-record arrays (see `record_dtype`) into one time-ordered TLV byte stream.
+
+    Records are ordered by `t_us`; ties keep sequence order of `records` (the type
+    order), then each array's own order. Placement is vectorized: every record's output
+    offset comes from one stable sort, and each array's bytes are scattered in bulk.
+
+    Returns:
+        The concatenated records as a flat uint8 array.
+    """
+    records = [rec for rec in records if rec.shape[0]]
+    if not records:
+        return np.empty(0, dtype=np.uint8)
+    t_us = np.concatenate([rec["t_us"] for rec in records])
+    rank = np.repeat(np.arange(len(records)), [rec.shape[0] for rec in records])
+    sizes = np.repeat([rec.dtype.itemsize for rec in records], [rec.shape[0] for rec in records])
+    order = np.lexsort((rank, t_us))
+
+    offsets = np.empty(order.shape[0], dtype=np.int64)
+    offsets[order] = np.cumsum(sizes[order]) - sizes[order]
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    start = 0
+    for rec in records:
+        count, size = int(rec.shape[0]), rec.dtype.itemsize
+        dest = offsets[start : start + count]
+        raw = np.ascontiguousarray(rec).view(np.uint8).reshape(count, size)
+        if count > 1 and bool(np.all(np.diff(dest) == dest[1] - dest[0])) and dest[1] - dest[0] >= size:
+            # Evenly interleaved (fixed logging frame): write through a strided view.
+            stride = int(dest[1] - dest[0])
+            np.lib.stride_tricks.as_strided(out[int(dest[0]) :], shape=(count, size), strides=(stride, 1))[:] = raw
+        else:
+            out[dest[:, None] + np.arange(size, dtype=np.int64)] = raw
+        start += count
+    return out
+
+
+class TimeseriesWriter:
+    """Buffered TLV writer for `timeseries.bin`, mirroring the firmware logger task.
+
+    Records are packed into a preallocated buffer of `buffer_size` bytes and written
+    out in one contiguous write whenever it fills up (or, with `flush_interval_us`,
+    once record time has advanced that far since the last flush), on `flush()` and on
+    `close()`. Batches larger than the buffer bypass it.
+
+    Example:
+        with TimeseriesWriter(path, fw_model_schema=schema, t0_us=t0) as writer:
+            writer.write_record(t_us, REC_NAV_SOLUTION, (x, y, psi, v, r, b_g))
+            writer.write_records(REC_SENSOR_GYRO, t_us_array, {"z_gyro": z, "b_g_est": b, "valid": 1})
+    """
+
+    def __init__(
+        self,
+        path_or_file: str | Path | BinaryIO,
+        *,
+        fw_model_schema: int,
+        t0_us: int,
+        record_layouts: Mapping[int, RecordLayout] | None = None,
+        buffer_size: int = 1 << 20,
+        flush_interval_us: int | None = None,
+    ) -> None:
+        if buffer_size < _MAX_RECORD_SIZE:
+            raise ValueError(f"buffer_size must be >= {_MAX_RECORD_SIZE}")
+        if flush_interval_us is not None and flush_interval_us <= 0:
+            raise ValueError("flush_interval_us must be > 0")
+        self._layouts = _normalize_layouts(record_layouts, fw_model_schema)
+        self._owns_file = not hasattr(path_or_file, "write")
+        self._fh: BinaryIO = Path(path_or_file).open("wb") if self._owns_file else path_or_file
+        self._buffer = bytearray(buffer_size)
+        self._fill = 0
+        self._flush_interval_us = flush_interval_us
+        self._next_flush_us = None if flush_interval_us is None else int(t0_us) + flush_interval_us
+        self.bytes_written = 0
+        self.record_counts: dict[int, int] = {}
+
+        FILE_HEADER_STRUCT.pack_into(self._buffer, 0, MAGIC, int(fw_model_schema), ENDIAN_LITTLE, int(t0_us))
+        self._fill = FILE_HEADER_STRUCT.size
+
+    def write_record(self, t_us: int, type_id: int, values: Sequence[object]) -> None:
+        """Append one record of a known layout, packing `values` in `layout.fields` order."""
+        payload_struct = self._layouts[type_id].payload_struct
+        size = RECORD_HEADER_STRUCT.size + payload_struct.size
+        if self._fill + size > len(self._buffer):
+            self.flush()
+        _RECORD_HEADER_PACK_INTO(self._buffer, self._fill, t_us, type_id, payload_struct.size)
+        payload_struct.pack_into(self._buffer, self._fill + RECORD_HEADER_STRUCT.size, *values)
+        self._fill += size
+        self.record_counts[type_id] = self.record_counts.get(type_id, 0) + 1
+        self._after_write(t_us)
+
+    def write_payload(self, t_us: int, type_id: int, payload: bytes) -> None:
+        """Append one record with a pre-packed payload (any type ID, including unknown ones)."""
+        size = RECORD_HEADER_STRUCT.size + len(payload)
+        if size > _MAX_RECORD_SIZE:
+            raise ValueError(f"payload too large for type={type_id}: {len(payload)} bytes, max {0xFFFF}")
+        if self._fill + size > len(self._buffer):
+            self.flush()
+        _RECORD_HEADER_PACK_INTO(self._buffer, self._fill, t_us, type_id, len(payload))
+        self._buffer[self._fill + RECORD_HEADER_STRUCT.size : self._fill + size] = payload
+        self._fill += size
+        self.record_counts[type_id] = self.record_counts.get(type_id, 0) + 1
+        self._after_write(t_us)
+
+    def write_records(
+        self,
+        type_id: int,
+        t_us: np.ndarray | Sequence[int],
+        values: np.ndarray | Mapping[str, object],
+    ) -> None:
+        """Append a batch of records of one layout, in the given order (see `pack_records`)."""
+        self.write_array(pack_records(self._layouts[type_id], t_us, values))
+
+    def write_array(self, records: np.ndarray) -> None:
+        """Append records already laid out as complete TLV records (e.g. `record_dtype`)."""
+        count = int(records.shape[0])
+        if count == 0:
+            return
+        self._append(np.ascontiguousarray(records).view(np.uint8).reshape(-1))
+        type_ids, counts = np.unique(records["type_id"], return_counts=True)
+        for type_id, n in zip(type_ids.tolist(), counts.tolist()):
+            self.record_counts[type_id] = self.record_counts.get(type_id, 0) + n
+        self._after_write(int(records["t_us"][-1]))
+
+    def write_frames(self, records: Sequence[np.ndarray]) -> None:
+        """Append equally long record arrays interleaved frame by frame.
+
+        Frame `i` is `records[0][i]`, `records[1][i]`, ... in sequence order, matching a
+        logger that emits one record of each type per control step.
+        """
+        if not records:
+            return
+        count = int(records[0].shape[0])
+        if any(int(rec.shape[0]) != count for rec in records):
+            raise ValueError("write_frames needs record arrays of equal length")
+        if count == 0:
+            return
+        frame_size = sum(rec.dtype.itemsize for rec in records)
+        frames = np.empty((count, frame_size), dtype=np.uint8)
+        offset = 0
+        for rec in records:
+            size = rec.dtype.itemsize
+            frames[:, offset : offset + size] = np.ascontiguousarray(rec).view(np.uint8).reshape(count, size)
+            offset += size
+        self._append(frames.reshape(-1))
+        for rec in records:
+            type_id = int(rec["type_id"][0])
+            self.record_counts[type_id] = self.record_counts.get(type_id, 0) + count
+        self._after_write(max(int(rec["t_us"][-1]) for rec in records))
+
+    def write_interleaved(self, records: Sequence[np.ndarray]) -> None:
+        """Append record arrays merged on `t_us` (see `interleave_records`)."""
+        data = interleave_records(records)
+        if data.shape[0] == 0:
+            return
+        self._append(data)
+        for rec in records:
+            if rec.shape[0]:
+                type_ids, counts = np.unique(rec["type_id"], return_counts=True)
+                for type_id, n in zip(type_ids.tolist(), counts.tolist()):
+                    self.record_counts[type_id] = self.record_counts.get(type_id, 0) + n
+        self._after_write(max(int(rec["t_us"].max()) for rec in records if rec.shape[0]))
+
+    def flush(self) -> None:
+        """Write buffered records to the file (one contiguous write) and flush it."""
+        if self._fill:
+            self._write(memoryview(self._buffer)[: self._fill])
+            self._fill = 0
+        self._fh.flush()
+
+    def close(self) -> None:
+        """Flush and, if the writer opened the file, close it."""
+        if self._fh.closed:
+            return
+        self.flush()
+        if self._owns_file:
+            self._fh.close()
+
+    def __enter__(self) -> TimeseriesWriter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _append(self, data: np.ndarray) -> None:
+        size = int(data.shape[0])
+        if self._fill + size > len(self._buffer):
+            self.flush()
+        if size > len(self._buffer):
+            self._write(data)
+        else:
+            memoryview(self._buffer)[self._fill : self._fill + size] = data
+            self._fill += size
+
+    def _write(self, data) -> None:
+        self._fh.write(data)
+        self.bytes_written += memoryview(data).nbytes
+
+    def _after_write(self, t_us: int) -> None:
+        if self._next_flush_us is not None and t_us >= self._next_flush_us:
+            self.flush()
+            self._next_flush_us = int(t_us) + self._flush_interval_us
+
+
+def write_timeseries_bin(
+    data: TimeseriesData,
+    path: str | Path,
+    *,
+    record_layouts: Mapping[int, RecordLayout] | None = None,
+) -> dict[str, int]:
+    """Write decoded records back as a time-ordered `timeseries.bin`.
+
+    Records of all types are merged on `t_us`; records sharing a timestamp follow the
+    order of `data.records` (first appearance in the source file), so a file logged in
+    a fixed per-step type order round-trips byte for byte. Use it to rewrite sessions
+    after trimming, filtering or anonymizing the arrays.
+
+    Unknown records are not written: `TimeseriesData` keeps only their metadata, not
+    their payload bytes.
+
+    Args:
+        data: Decoded session; every record type needs `t_us` and all layout fields.
+        path: Output `timeseries.bin`.
+        record_layouts: Optional record layout map used to encode payloads.
+
+    Returns:
+        Written record counts by record name.
+    """
+    layouts = _normalize_layouts(record_layouts, data.header.fw_model_schema)
+    layouts_by_name = {layout.name: layout for layout in layouts.values()}
+    records: list[np.ndarray] = []
+    for name, columns in data.records.items():
+        layout = layouts_by_name.get(name)
+        if layout is None:
+            raise ValueError(f"unknown record type: {name!r}")
+        missing = [field for field in ("t_us", *layout.fields) if field not in columns]
+        if missing:
+            raise ValueError(f"{name} is missing field(s) {missing}; cannot encode a projected read")
+        records.append(pack_records(layout, columns["t_us"], columns))
+
+    with TimeseriesWriter(
+        path,
+        fw_model_schema=data.header.fw_model_schema,
+        t0_us=data.header.t0_us,
+        record_layouts=record_layouts,
+    ) as writer:
+        writer.write_interleaved(records)
+    return {name: int(rec.shape[0]) for name, rec in zip(data.records, records) if rec.shape[0]}
+
+
+def compress_timeseries_bin(
+    path: str | Path,
+    out_path: str | Path,
+    *,
+    codec: str = "zlib",
+    level: int | None = None,
+    block_size: int = 1 << 18,
+) -> np.ndarray:
+    """Store `timeseries.bin` as a block-compressed `timeseries.binz` container.
+
+    Records are grouped into blocks of about `block_size` uncompressed bytes (whole
+    records only) and each block is compressed on its own. The block table keeps every
+    block's byte offset, `t_us` range and record types, so `read_timeseries_blocks`
+    inflates only the blocks a time window or record-type selection needs, and
+    `decompress_timeseries_bin` restores the original file byte for byte. A truncated
+    trailing record is kept as a fragment block and reported like the plain reader does.
+
+    Args:
+        path: Source `timeseries.bin`.
+        out_path: Destination container (replaced atomically).
+        codec: `"zlib"` (fast, typically ~3x smaller) or `"lzma"` (slower, ~5x).
+        level: Compression level (zlib) or preset (lzma); defaults to 6.
+        block_size: Target uncompressed bytes per block.
+
+    Returns:
+        The block table (`BLOCK_TABLE_DTYPE`).
+
+    Raises:
+        ValueError: For an unknown codec, a non-positive `block_size` or a bad file header.
+    """
+    if codec not in _BLOCK_CODECS:
+        raise ValueError(f"unknown codec {codec!r}; expected one of {sorted(_BLOCK_CODECS)}")
+    if block_size <= 0:
+        raise ValueError("block_size must be > 0")
+    codec_id, compress = _BLOCK_CODECS[codec]
+
+    data = _map_file(path)
+    index = index_timeseries_buffer(data)
+    header_offsets = index.payload_offset - RECORD_HEADER_STRUCT.size
+    record_ends = index.payload_offset + index.payload_len.astype(np.int64)
+
+    block_starts: list[int] = []
+    position = 0
+    while position < len(index):
+        block_starts.append(position)
+        limit = int(header_offsets[position]) + block_size
+        position = max(position + 1, int(np.searchsorted(record_ends, limit, side="right")))
+    starts = np.asarray(block_starts, dtype=np.int64)
+    stops = np.append(starts[1:], len(index))
+    records_end = int(record_ends[-1]) if len(index) else FILE_HEADER_STRUCT.size
+    has_fragment = records_end < len(data)
+
+    table = np.zeros(starts.shape[0] + int(has_fragment), dtype=BLOCK_TABLE_DTYPE)
+    table["record_count"][: starts.shape[0]] = stops - starts
+    if starts.shape[0]:
+        type_bits = np.left_shift(np.uint64(1), np.minimum(index.type_id, 63).astype(np.uint64))
+        table["t_min_us"][: starts.shape[0]] = np.minimum.reduceat(index.t_us, starts)
+        table["t_max_us"][: starts.shape[0]] = np.maximum.reduceat(index.t_us, starts)
+        table["type_mask"][: starts.shape[0]] = np.bitwise_or.reduceat(type_bits, starts)
+    spans = [(int(header_offsets[lo]), int(record_ends[hi - 1])) for lo, hi in zip(starts, stops)]
+    if has_fragment:
+        table["flags"][-1] = BLOCK_FLAG_FRAGMENT
+        spans.append((records_end, len(data)))
+
+    out_path = Path(out_path)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with tmp_path.open("wb") as fh:
+        fh.write(BLOCK_FILE_HEADER_STRUCT.pack(BLOCK_MAGIC, BLOCK_FORMAT_VERSION, codec_id))
+        fh.write(data[: FILE_HEADER_STRUCT.size])
+        offset = BLOCK_FILE_HEADER_STRUCT.size + FILE_HEADER_STRUCT.size
+        for i, (lo, hi) in enumerate(spans):
+            block = compress(data[lo:hi], level)
+            fh.write(block)
+            table["offset"][i] = offset
+            table["compressed_size"][i] = len(block)
+            table["raw_size"][i] = hi - lo
+            offset += len(block)
+        directory = {
+            "error": index.error,
+            "record_count": len(index),
+            "t_last_us": int(index.t_us[-1]) if len(index) else None,
+            "t_us_sorted": index.t_us_sorted,
+            "type_first_order": np.sort(index.type_table, order="first_position")["type_id"].tolist(),
+        }
+        directory_raw = json.dumps(directory, separators=(",", ":")).encode("utf-8")
+        fh.write(table.tobytes())
+        fh.write(directory_raw)
+        fh.write(BLOCK_TRAILER_STRUCT.pack(offset, table.shape[0], len(directory_raw), BLOCK_MAGIC))
+    os.replace(tmp_path, out_path)
+    return table
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tools.log_io import LinkBudget, build_mavlink_telemetry_tables, read_timeseries_bin, simulate_telemetry_link
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Replay a log session's telemetry through a bandwidth-limited link and report drops/latency."
+    )
+    parser.add_argument(
+        "--session-dir",
+        type=Path,
+        required=True,
+        help="Session folder containing timeseries.bin and events.jsonl.",
+    )
+    parser.add_argument(
+        "--bytes-per-s",
+        type=float,
+        nargs="+",
+        required=True,
+        help="Usable link rate(s) to simulate, e.g. 1000 2000 4000.",
+    )
+    parser.add_argument(
+        "--frame-overhead",
+        type=int,
+        default=0,
+        help="Bytes the radio adds to each MAVLink frame.",
+    )
+    parser.add_argument("--tick-ms", type=float, default=10.0, help="Scheduler period.")
+    parser.add_argument("--heartbeat-hz", type=float, default=1.0)
+    parser.add_argument("--status-hz", type=float, default=1.0)
+    parser.add_argument("--pose-hz", type=float, default=5.0)
+    parser.add_argument(
+        "--include-custom",
+        action="store_true",
+        help="Also offer custom (non-predefined) USV debug/event messages.",
+    )
+    return parser.parse_args()
+
+
+def _ms(latencies_us: np.ndarray, q: float) -> str:
+    return f"{np.percentile(latencies_us, q) / 1000.0:8.1f}" if latencies_us.size else "       -"
+
+
+def main() -> int:
+    args = _parse_args()
+    data = read_timeseries_bin(args.session_dir / "timeseries.bin")
+    telemetry = build_mavlink_telemetry_tables(
+        data,
+        events_jsonl=args.session_dir / "events.jsonl",
+        heartbeat_hz=args.heartbeat_hz,
+        status_hz=args.status_hz,
+        pose_hz=args.pose_hz,
+        include_custom_messages=args.include_custom,
+    )
+
+    for bytes_per_s in args.bytes_per_s:
+        budget = LinkBudget(
+            bytes_per_s=bytes_per_s,
+            frame_overhead=args.frame_overhead,
+            tick_us=int(round(args.tick_ms * 1000.0)),
+        )
+        report = simulate_telemetry_link(telemetry, budget)
+        print(f"link {bytes_per_s:.0f} B/s: utilization {report.utilization:.1%}")
+        print("  class      offered     sent  dropped  decimated  max_queued")
+        for stats in report.classes.values():
+            print(
+                f"  {stats.name:<8} {stats.offered:9d} {stats.sent:8d} {stats.dropped:8d} "
+                f"{stats.decimated:10d} {stats.max_queued:11d}"
+            )
+        print("  latency [ms]             p50      p99      max")
+        for label, names in (
+            ("EVENT", ("STATUSTEXT", "USV_EVENT")),
+            ("PARAM_ACK", ("PARAM_EXT_ACK",)),
+            ("POSE", ("LOCAL_POSITION_NED", "ATTITUDE")),
+        ):
+            latencies = report.latencies_us(*names)
+            print(f"  {label:<20} {_ms(latencies, 50)} {_ms(latencies, 99)} {_ms(latencies, 100)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
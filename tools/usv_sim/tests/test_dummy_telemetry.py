@@ -3,8 +3,11 @@ from __future__ import annotations
 import sys
 import tempfile
 import unittest
+from dataclasses import replace
 from pathlib import Path
 
+import numpy as np
+
 PKG_ROOT = Path(__file__).resolve().parents[1]
 REPO_ROOT = Path(__file__).resolve().parents[3]
 if str(PKG_ROOT) not in sys.path:
@@ -13,7 +16,27 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 from tools.generate_dummy_logs import generate_dummy_log_session
-from tools.log_io import iter_mavlink_telemetry, read_timeseries_bin
+from tools.log_io import (
+    DROP_NEWEST,
+    LINK_DECIMATED,
+    LINK_DROPPED,
+    LINK_SENT,
+    MAVLINK_MESSAGE_LAYOUTS,
+    LinkBudget,
+    MavlinkDecoder,
+    MavlinkEncoder,
+    MavlinkField,
+    TelemetryClass,
+    TelemetryMessage,
+    build_mavlink_telemetry_tables,
+    encode_mavlink_frames,
+    iter_mavlink_telemetry,
+    mavlink_crc,
+    mavlink_message_layout,
+    read_timeseries_bin,
+    simulate_telemetry_link,
+)
+from tools.log_io.telemetry import _schedule_indices
 
 
 class DummyTelemetryTests(unittest.TestCase):
@@ -47,6 +70,267 @@ class DummyTelemetryTests(unittest.TestCase):
         self.assertIn("STATUSTEXT", names)
         self.assertIn("PARAM_EXT_ACK", names)
 
+    def test_telemetry_tables_back_the_message_iterator(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="zigzag",
+                duration_s=5.0,
+                dt=0.05,
+                session_name="tables_session",
+            )
+            timeseries = read_timeseries_bin(session / "timeseries.bin")
+            kwargs = {"events_jsonl": session / "events.jsonl", "pose_hz": 10.0, "include_custom_messages": True}
+            tables = build_mavlink_telemetry_tables(timeseries, **kwargs)
+            msgs = list(iter_mavlink_telemetry(timeseries, **kwargs))
+
+        self.assertEqual(len(msgs), len(tables))
+        self.assertTrue(np.all(np.diff(tables.index["t_us"].astype(np.int64)) >= 0))
+        self.assertEqual([m.t_us for m in msgs], tables.index["t_us"].tolist())
+        pose = tables.tables["LOCAL_POSITION_NED"]
+        pose_msgs = [m for m in msgs if m.name == "LOCAL_POSITION_NED"]
+        self.assertEqual([m.payload["vx"] for m in pose_msgs], pose["vx"].tolist())
+        nav = timeseries.records["REC_NAV_SOLUTION"]
+        rows = np.searchsorted(nav["t_us"], pose["t_us"])
+        np.testing.assert_allclose(pose["vy"], nav["v"][rows] * np.sin(nav["psi"][rows]))
+        events = [m for m in msgs if m.name == "USV_EVENT"]
+        self.assertEqual(len(events), tables.tables["USV_EVENT"].shape[0])
+        self.assertIn("type", events[0].payload)
+
+        # A time-sliced index materializes only its own messages.
+        t_cut = int(tables.index["t_us"][len(tables) // 2])
+        sliced = replace(tables, index=tables.index[tables.index["t_us"] >= t_cut])
+        self.assertEqual(list(sliced), [m for m in msgs if m.t_us >= t_cut])
+
+    def test_mavlink_encoder_emits_valid_v2_frames(self) -> None:
+        # CRC_EXTRA derived from the field definitions must match the MAVLink common set.
+        expected_crc_extra = {
+            "HEARTBEAT": 50,
+            "SYS_STATUS": 124,
+            "ATTITUDE": 39,
+            "LOCAL_POSITION_NED": 185,
+            "ESTIMATOR_STATUS": 163,
+            "STATUSTEXT": 83,
+            "PARAM_EXT_ACK": 132,
+        }
+        for name, crc_extra in expected_crc_extra.items():
+            self.assertEqual(MAVLINK_MESSAGE_LAYOUTS[name].crc_extra, crc_extra, name)
+        self.assertEqual(mavlink_crc(b"123456789"), 0x6F91)
+
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="step",
+                duration_s=3.0,
+                dt=0.1,
+                session_name="mavlink_session",
+            )
+            timeseries = read_timeseries_bin(session / "timeseries.bin")
+            msgs = list(
+                iter_mavlink_telemetry(
+                    timeseries, events_jsonl=session / "events.jsonl", include_custom_messages=True
+                )
+            )
+        wire = encode_mavlink_frames(msgs, system_id=7, component_id=1, sequence=250)
+
+        by_id = {layout.msg_id: layout for layout in MAVLINK_MESSAGE_LAYOUTS.values()}
+        pos = 0
+        for i, msg in enumerate(msgs):
+            self.assertEqual(wire[pos], 0xFD)
+            length = wire[pos + 1]
+            self.assertEqual(wire[pos + 4], (250 + i) % 256)
+            self.assertEqual(wire[pos + 5], 7)
+            layout = by_id[int.from_bytes(wire[pos + 7 : pos + 10], "little")]
+            self.assertEqual(layout.name, msg.name)
+            self.assertLessEqual(length, layout.payload_struct.size)
+            end = pos + 10 + length
+            crc = mavlink_crc(bytes(wire[pos + 1 : end]) + bytes((layout.crc_extra,)))
+            self.assertEqual(int.from_bytes(wire[end : end + 2], "little"), crc)
+            if msg.name == "HEARTBEAT":
+                self.assertEqual(
+                    bytes(wire[pos + 10 : end]).ljust(layout.payload_struct.size, b"\x00"),
+                    bytes((0, 0, 0, 0, 11, 12, 0, 4, 3)),
+                )
+            pos = end + 2
+        self.assertEqual(pos, len(wire))
+
+    def test_mavlink_decoder_round_trips_chunked_stream_with_garbage(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="zigzag",
+                duration_s=5.0,
+                dt=0.05,
+                session_name="decode_session",
+            )
+            timeseries = read_timeseries_bin(session / "timeseries.bin")
+            msgs = list(
+                iter_mavlink_telemetry(
+                    timeseries, events_jsonl=session / "events.jsonl", pose_hz=10.0, include_custom_messages=True
+                )
+            )
+        wire = bytes(encode_mavlink_frames(msgs))
+        second = len(bytes(encode_mavlink_frames(msgs[:1])))
+        third = len(bytes(encode_mavlink_frames(msgs[:2])))
+        # Garbage with a fake start byte up front, a bit flip in the second frame's payload
+        # and a truncated frame at the end.
+        stream = bytearray(b"\x00\xfd\x09\x00\x00" + wire + wire[:7])
+        stream[5 + second + 10] ^= 0x40
+
+        decoder = MavlinkDecoder()
+        decoded = 0
+        for pos in range(0, len(stream), 37):
+            decoded += decoder.feed(stream[pos : pos + 37], t_us=pos)
+        capture = decoder.take(final=True)
+
+        self.assertEqual(decoded, len(msgs) - 1)
+        self.assertEqual(len(capture), len(msgs) - 1)
+        self.assertEqual(capture.crc_errors, 1)
+        self.assertEqual(capture.skipped_bytes, 5 + third - second + 7)
+        self.assertEqual(capture.frames["seq"].tolist(), [i % 256 for i in range(len(msgs)) if i != 1])
+
+        expected = msgs[:1] + msgs[2:]
+        received = list(capture.telemetry)
+        self.assertEqual([m.name for m in received], [m.name for m in expected])
+        for sent, got in zip(expected, received):
+            self.assertEqual(sent.payload.keys(), got.payload.keys())
+            for key, value in sent.payload.items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(got.payload[key], value, places=4)
+                else:
+                    self.assertEqual(got.payload[key], value)
+            if sent.name.startswith("USV_"):
+                self.assertEqual(got.t_us, sent.t_us)
+
+    def test_mavlink_encoder_drops_optional_event_keys_to_fit_the_frame(self) -> None:
+        event = {"t_us": 1_500_000, "type": "EKF_GATING", "sensor": "gnss", "detail": "x" * 300, "nis": 12.5}
+        short = TelemetryMessage(1_500_000, "USV_EVENT", {"t_us": 1_500_000, "type": "LINK_LOSS"}, False)
+        msgs = [TelemetryMessage(1_500_000, "USV_EVENT", event, False), short]
+
+        decoder = MavlinkDecoder()
+        decoder.feed(encode_mavlink_frames(msgs))
+        received = list(decoder.take(final=True).telemetry)
+
+        self.assertEqual(received[0].payload, {"t_us": 1_500_000, "type": "EKF_GATING", "sensor": "gnss"})
+        self.assertEqual(received[1].payload, short.payload)
+        with self.assertRaisesRegex(ValueError, "does not fit in 240 bytes"):
+            encode_mavlink_frames([TelemetryMessage(0, "USV_EVENT", {"t_us": 0, "type": "E" * 240}, False)])
+
+    def test_mavlink_decoder_keeps_undecodable_events_as_raw_text(self) -> None:
+        # A sender that packs the event text as a plain char field cuts long JSON at 240 bytes.
+        truncating = mavlink_message_layout(
+            42500,
+            "USV_EVENT",
+            (
+                MavlinkField("time_usec", "uint64_t", source="t_us"),
+                MavlinkField("event", "char", 240, source="text"),
+            ),
+        )
+        self.assertEqual(truncating.crc_extra, MAVLINK_MESSAGE_LAYOUTS["USV_EVENT"].crc_extra)
+        long_event = '{"t_us":2000,"type":"EKF_GATING","detail":"' + "x" * 300 + '"}'
+        encoder = MavlinkEncoder(layouts={"USV_EVENT": truncating})
+        wire = encoder.encode_batch(
+            TelemetryMessage(t, "USV_EVENT", {"t_us": t, "text": text}, False)
+            for t, text in ((1000, '{"t_us":1000,"type":"A"}'), (2000, long_event), (3000, '{"t_us":3000,"type":"B"}'))
+        )
+
+        decoder = MavlinkDecoder()
+        decoder.feed(wire)
+        capture = decoder.take(final=True)
+        received = list(capture.telemetry)
+
+        self.assertEqual(capture.event_errors, 1)
+        self.assertEqual([m.t_us for m in received], [1000, 2000, 3000])
+        self.assertEqual(received[0].payload, {"t_us": 1000, "type": "A"})
+        self.assertEqual(received[1].payload, {"raw": long_event[:240]})
+        self.assertEqual(received[2].payload, {"t_us": 3000, "type": "B"})
+
+    def test_link_scheduler_sends_events_first_and_applies_queue_policies(self) -> None:
+        pose = {"time_boot_ms": 0, "x": 1.0, "y": 2.0, "z": 0.0, "vx": 0.5, "vy": 0.0, "vz": 0.0}
+        msgs = [TelemetryMessage(0, "LOCAL_POSITION_NED", dict(pose, x=float(k)), True) for k in range(5)]
+        msgs += [TelemetryMessage(0, "STATUSTEXT", {"severity": 6, "text": f"E{k}"}, True) for k in range(3)]
+        msgs += [TelemetryMessage(5_000 * k, "HEARTBEAT", {"type": 11}, True) for k in range(4)]
+        classes = (
+            TelemetryClass("event", ("STATUSTEXT",), priority=0, queue_depth=2, overflow=DROP_NEWEST),
+            TelemetryClass("pose", ("LOCAL_POSITION_NED",), priority=2, queue_depth=2),
+            TelemetryClass("status", ("HEARTBEAT",), priority=1, queue_depth=4, decimation=2),
+        )
+        report = simulate_telemetry_link(msgs, LinkBudget(bytes_per_s=1000.0, frame_overhead=3), classes)
+
+        rows = report.messages
+        self.assertEqual(
+            rows["status"].tolist(),
+            [LINK_DROPPED] * 3 + [LINK_SENT] * 2 + [LINK_SENT] * 2 + [LINK_DROPPED] + [LINK_SENT, LINK_DECIMATED] * 2,
+        )
+        # Events go out back to back first (1 ms per byte), then the rest by priority.
+        sent = rows[rows["status"] == LINK_SENT]
+        order = [report.names[code] for code in sent[np.argsort(sent["t_sent_us"], kind="stable")]["message"]]
+        self.assertEqual(order[:2], ["STATUSTEXT", "STATUSTEXT"])
+        events = rows[rows["message"] == report.names.index("STATUSTEXT")][:2]
+        self.assertEqual(events["latency_us"].tolist(), [events["size"][0] * 1000, int(events["size"].sum()) * 1000])
+        self.assertEqual(rows["size"][5], len(encode_mavlink_frames(msgs[5:6])) + 3)
+        self.assertEqual(report.classes["pose"].dropped, 3)
+        self.assertEqual(report.classes["event"].max_queued, 2)
+        self.assertEqual(report.classes["status"].decimated, 2)
+        self.assertEqual(report.bytes_sent, int(sent["size"].sum()))
+
+    def test_link_decimation_thins_each_message_of_a_class(self) -> None:
+        pose = {"time_boot_ms": 0, "x": 1.0, "y": 2.0, "z": 0.0, "vx": 0.5, "vy": 0.0, "vz": 0.0}
+        attitude = {"time_boot_ms": 0, "roll": 0.0, "pitch": 0.0, "yaw": 0.1}
+        msgs = []
+        for k in range(4):
+            msgs.append(TelemetryMessage(100_000 * k, "LOCAL_POSITION_NED", pose, True))
+            msgs.append(TelemetryMessage(100_000 * k, "ATTITUDE", attitude, True))
+        classes = (TelemetryClass("pose", ("LOCAL_POSITION_NED", "ATTITUDE"), priority=0, queue_depth=4, decimation=2),)
+        report = simulate_telemetry_link(msgs, LinkBudget(bytes_per_s=10_000.0), classes)
+
+        rows = report.messages
+        self.assertEqual(rows["status"].tolist(), [LINK_SENT, LINK_SENT, LINK_DECIMATED, LINK_DECIMATED] * 2)
+        for name in ("LOCAL_POSITION_NED", "ATTITUDE"):
+            status = rows["status"][rows["message"] == report.names.index(name)]
+            self.assertEqual(status.tolist(), [LINK_SENT, LINK_DECIMATED] * 2)
+        self.assertEqual(report.classes["pose"].decimated, 4)
+
+    def test_link_scheduler_on_replayed_session(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="zigzag",
+                duration_s=20.0,
+                dt=0.02,
+                session_name="link_session",
+            )
+            timeseries = read_timeseries_bin(session / "timeseries.bin")
+            tables = build_mavlink_telemetry_tables(
+                timeseries, events_jsonl=session / "events.jsonl", pose_hz=20.0, include_custom_messages=True
+            )
+        starved = simulate_telemetry_link(tables, LinkBudget(bytes_per_s=1000.0))
+        ample = simulate_telemetry_link(tables, LinkBudget(bytes_per_s=50_000.0))
+
+        for report in (starved, ample):
+            self.assertEqual(len(report.messages), len(tables))
+            for stats in report.classes.values():
+                self.assertEqual(stats.offered, stats.sent + stats.dropped + stats.decimated)
+            self.assertTrue(np.all(report.latencies_us() >= 0))
+        self.assertEqual(starved.classes["event"].dropped, 0)
+        self.assertGreater(starved.classes["debug"].dropped, starved.classes["pose"].dropped)
+        self.assertGreater(starved.utilization, 0.9)
+        self.assertEqual(sum(stats.dropped for stats in ample.classes.values()), 0)
+        # Unloaded, a message waits at most one tick plus a few frame times.
+        self.assertLess(int(ample.latencies_us("PARAM_EXT_ACK", "STATUSTEXT").max()), 20_000)
+
+    def test_schedule_indices_match_per_sample_scheduler(self) -> None:
+        t_us = np.concatenate((np.arange(0, 1_000_000, 10_000), 4_000_000 + np.arange(0, 500_000, 10_000)))
+        t_us = np.sort(np.append(t_us, [4_000_000, 4_000_000])).astype(np.uint64)
+        for period_us in (10_000, 33_333, 200_000, 1_000_000):
+            expected = []
+            next_due = int(t_us[0])
+            for i, t in enumerate(t_us.tolist()):
+                if t >= next_due:
+                    expected.append(i)
+                    next_due += period_us
+            self.assertEqual(_schedule_indices(t_us, period_us).tolist(), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import json
+import os
+import struct
 import sys
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
+
+import numpy as np
 
 PKG_ROOT = Path(__file__).resolve().parents[1]
 REPO_ROOT = Path(__file__).resolve().parents[3]
@@ -13,10 +18,61 @@ if str(PKG_ROOT) not in sys.path:
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from tools import generate_dummy_logs as dummy_logs_module
 from tools.generate_dummy_logs import generate_dummy_log_session
 from usv_sim.digital_twin.current import FW_MODEL_SCHEMA
-from tools.log_io import FILE_HEADER_STRUCT, RECORD_HEADER_STRUCT, read_timeseries_bin
-from tools.log_io.layout import MAGIC, REC_NAV_SOLUTION
+from tools.log_io import (
+    FILE_HEADER_STRUCT,
+    RECORD_HEADER_STRUCT,
+    CatalogUpdate,
+    SessionCatalog,
+    TimeseriesFollower,
+    TimeseriesWriter,
+    align_columns,
+    align_records,
+    cache_path_for,
+    compress_timeseries_bin,
+    decompress_timeseries_bin,
+    index_path_for,
+    iter_timeseries_chunks,
+    load_timeseries_cache,
+    load_sessions,
+    load_timeseries_index,
+    parse_event_log,
+    read_block_table,
+    read_timeseries_bin,
+    read_timeseries_blocks,
+    register_record_layouts,
+    scan_timeseries_bin,
+    unregister_record_layouts,
+    write_timeseries_bin,
+)
+from tools.log_io.layout import (
+    DEFAULT_RECORD_LAYOUTS,
+    MAGIC,
+    REC_GUIDANCE_REF,
+    REC_NAV_SOLUTION,
+    REC_SENSOR_GNSS,
+    REC_SENSOR_GYRO,
+    RecordLayout,
+)
+from tools.log_io import sessions as sessions_module
+
+_PREPARE_SESSION = sessions_module._prepare_session
+
+
+def _prepare_session_or_die(path, record_layouts, read_kwargs):
+    """Worker stand-in that kills its process on sessions named `crash*`."""
+    if path.parent.name.startswith("crash"):
+        os._exit(1)
+    return _PREPARE_SESSION(path, record_layouts, read_kwargs)
+
+
+def _prepare_session_or_raise(path, record_layouts, read_kwargs):
+    """Worker stand-in that fails with an unexpected exception on sessions named `broken*`."""
+    if path.parent.name.startswith("broken"):
+        raise RuntimeError("decoder bug")
+    return _PREPARE_SESSION(path, record_layouts, read_kwargs)
 
 
 class TimeseriesIoTests(unittest.TestCase):
@@ -45,6 +101,639 @@ class TimeseriesIoTests(unittest.TestCase):
         self.assertEqual(nav["t_us"].dtype.kind, "u")
         self.assertEqual(len(parsed.unknown_records), 0)
 
+    def test_dummy_session_bytes_do_not_depend_on_generation_block_size(self) -> None:
+        # Integrators, the v_d ramp and the noise stream must carry across blocks.
+        with tempfile.TemporaryDirectory() as td:
+            whole = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="zigzag",
+                duration_s=3.0,
+                dt=0.05,
+                session_name="one_block",
+            )
+            with mock.patch.object(dummy_logs_module, "_BLOCK_STEPS", 7):
+                blocked = generate_dummy_log_session(
+                    output_root=Path(td) / "logs",
+                    scenario_name="zigzag",
+                    duration_s=3.0,
+                    dt=0.05,
+                    session_name="seven_step_blocks",
+                )
+            whole_bytes = (whole / "timeseries.bin").read_bytes()
+            blocked_bytes = (blocked / "timeseries.bin").read_bytes()
+            parsed = read_timeseries_bin(whole / "timeseries.bin")
+
+        self.assertEqual(blocked_bytes, whole_bytes)
+        nav_t = parsed.records["REC_NAV_SOLUTION"]["t_us"].astype(np.int64)
+        self.assertEqual(set(np.diff(nav_t).tolist()), {50_000})
+        v_d = parsed.records["REC_GUIDANCE_REF"]["v_d"]
+        self.assertTrue(np.all(np.abs(np.diff(v_d)) <= 0.5 * 0.05 + 1e-6))
+
+    def test_memory_mapped_read_matches_default_read(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="circle",
+                duration_s=2.0,
+                dt=0.1,
+                session_name="mmap_session",
+            )
+            parsed = read_timeseries_bin(session / "timeseries.bin")
+            mapped = read_timeseries_bin(session / "timeseries.bin", memory_map=True)
+
+            self.assertEqual(mapped.header, parsed.header)
+            self.assertEqual(mapped.record_counts, parsed.record_counts)
+            guidance = mapped.records["REC_GUIDANCE_REF"]
+            self.assertEqual(guidance["v_d"].dtype, np.float32)
+            self.assertFalse(guidance["v_d"].flags.writeable)
+            for name, fields in parsed.records.items():
+                for field, values in fields.items():
+                    np.testing.assert_array_equal(mapped.records[name][field], values)
+            del mapped, guidance
+
+    def test_record_type_and_field_projection(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="step",
+                duration_s=2.0,
+                dt=0.1,
+                session_name="projection_session",
+            )
+            full = read_timeseries_bin(session / "timeseries.bin")
+            projected = read_timeseries_bin(
+                session / "timeseries.bin",
+                record_types=["REC_NAV_SOLUTION", REC_SENSOR_GNSS],
+                fields={"REC_NAV_SOLUTION": ("psi", "x")},
+            )
+            with self.assertRaisesRegex(ValueError, "has no field"):
+                read_timeseries_bin(session / "timeseries.bin", fields={"REC_NAV_SOLUTION": ("cog",)})
+
+        self.assertEqual(set(projected.records), {"REC_NAV_SOLUTION", "REC_SENSOR_GNSS"})
+        self.assertEqual(set(projected.record_counts), {"REC_NAV_SOLUTION", "REC_SENSOR_GNSS"})
+        self.assertEqual(list(projected.records["REC_NAV_SOLUTION"]), ["t_us", "x", "psi"])
+        self.assertEqual(len(projected.records["REC_SENSOR_GNSS"]), 6)
+        for field in ("t_us", "x", "psi"):
+            np.testing.assert_array_equal(
+                projected.records["REC_NAV_SOLUTION"][field], full.records["REC_NAV_SOLUTION"][field]
+            )
+
+    def test_time_window_read_matches_filtered_full_read(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="zigzag",
+                duration_s=4.0,
+                dt=0.1,
+                session_name="window_session",
+            )
+            full = read_timeseries_bin(session / "timeseries.bin")
+            t_nav = full.records["REC_NAV_SOLUTION"]["t_us"]
+            t_start, t_end = int(t_nav[10]), int(t_nav[20])
+            windowed = read_timeseries_bin(session / "timeseries.bin", t_start_us=t_start, t_end_us=t_end)
+            indexed = read_timeseries_bin(
+                session / "timeseries.bin", use_index=True, t_start_us=t_start, t_end_us=t_end
+            )
+            index = load_timeseries_index(session / "timeseries.bin")
+
+        self.assertEqual(windowed.record_counts["REC_NAV_SOLUTION"], 10)
+        self.assertEqual(index.positions(REC_NAV_SOLUTION, t_start, t_end).shape[0], 10)
+        for parsed in (windowed, indexed):
+            self.assertEqual(parsed.record_counts, {name: 10 for name in full.records})
+            for name, fields in full.records.items():
+                in_window = (fields["t_us"] >= t_start) & (fields["t_us"] < t_end)
+                for field, values in fields.items():
+                    np.testing.assert_array_equal(parsed.records[name][field], values[in_window])
+
+    def test_time_window_read_of_non_monotonic_file_scans_past_t_end(self) -> None:
+        nav = DEFAULT_RECORD_LAYOUTS[REC_NAV_SOLUTION]
+        # The logger clock jumps back halfway through, so in-window records follow t_end
+        # by more than one bulk scan probe.
+        t_us = [100 * (k % 100_000) for k in range(200_000)]
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "timeseries.bin"
+            with p.open("wb") as fh:
+                fh.write(FILE_HEADER_STRUCT.pack(MAGIC, 1, 1, 0))
+                fh.write(
+                    b"".join(
+                        RECORD_HEADER_STRUCT.pack(t, REC_NAV_SOLUTION, nav.payload_struct.size)
+                        + nav.payload_struct.pack(*([float(k)] * 6))
+                        for k, t in enumerate(t_us)
+                    )
+                )
+            scanned = read_timeseries_bin(p, t_start_us=1_000, t_end_us=5_000)
+            indexed = read_timeseries_bin(p, use_index=True, t_start_us=1_000, t_end_us=5_000)
+            rescanned = read_timeseries_bin(p, t_start_us=1_000, t_end_us=5_000)
+
+        expected = [float(k) for k, t in enumerate(t_us) if 1_000 <= t < 5_000]
+        for parsed in (scanned, indexed, rescanned):
+            self.assertEqual(parsed.records["REC_NAV_SOLUTION"]["x"].tolist(), expected)
+
+    def test_chunk_iterator_concatenates_to_full_read(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="step",
+                duration_s=2.0,
+                dt=0.1,
+                session_name="chunk_session",
+            )
+            full = read_timeseries_bin(session / "timeseries.bin")
+            # Small reads force records to straddle read boundaries.
+            chunks = list(iter_timeseries_chunks(session / "timeseries.bin", chunk_records=50, read_size=100))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(sum(chunk.record_counts.values()) <= 50 for chunk in chunks))
+        for name, fields in full.records.items():
+            for field, values in fields.items():
+                joined = np.concatenate([chunk.records[name][field] for chunk in chunks if name in chunk.records])
+                np.testing.assert_array_equal(joined, values)
+
+    def test_follower_returns_only_completed_new_records(self) -> None:
+        nav = DEFAULT_RECORD_LAYOUTS[REC_NAV_SOLUTION]
+        records = [
+            RECORD_HEADER_STRUCT.pack(100 * k, REC_NAV_SOLUTION, nav.payload_struct.size)
+            + nav.payload_struct.pack(*([float(k)] * 6))
+            for k in range(6)
+        ]
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "timeseries.bin"
+            with p.open("wb", buffering=0) as writer, TimeseriesFollower(p) as follower:
+                self.assertIsNone(follower.poll())
+                writer.write(FILE_HEADER_STRUCT.pack(MAGIC, 1, 1, 0) + b"".join(records[:2]) + records[2][:7])
+                first = follower.poll()
+                self.assertIsNone(follower.poll())
+                writer.write(records[2][7:] + b"".join(records[3:]))
+                second = follower.poll()
+                offset = follower.offset
+
+        self.assertEqual(first.records["REC_NAV_SOLUTION"]["x"].tolist(), [0.0, 1.0])
+        self.assertEqual(second.records["REC_NAV_SOLUTION"]["t_us"].tolist(), [200, 300, 400, 500])
+        self.assertEqual(offset, FILE_HEADER_STRUCT.size + sum(len(r) for r in records))
+
+    def test_follower_catches_up_in_polls_bounded_by_max_poll_bytes(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="step",
+                duration_s=2.0,
+                dt=0.1,
+                session_name="follow_session",
+            )
+            p = session / "timeseries.bin"
+            full = read_timeseries_bin(p)
+            polls = []
+            with TimeseriesFollower(p, read_size=100, max_poll_bytes=1000) as follower:
+                while (data := follower.poll()) is not None:
+                    polls.append(data)
+                offset = follower.offset
+            file_size = p.stat().st_size
+
+        self.assertGreater(len(polls), 1)
+        self.assertEqual(offset, file_size)
+        for name, fields in full.records.items():
+            for field, values in fields.items():
+                joined = np.concatenate([data.records[name][field] for data in polls if name in data.records])
+                np.testing.assert_array_equal(joined, values)
+
+    def test_index_sidecar_is_reused_and_rebuilt_when_stale(self) -> None:
+        nav = DEFAULT_RECORD_LAYOUTS[REC_NAV_SOLUTION]
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "timeseries.bin"
+            with p.open("wb") as fh:
+                fh.write(FILE_HEADER_STRUCT.pack(MAGIC, 1, 1, 0))
+                for k in range(5):
+                    fh.write(RECORD_HEADER_STRUCT.pack(100 * k, REC_NAV_SOLUTION, nav.payload_struct.size))
+                    fh.write(nav.payload_struct.pack(*([float(k)] * 6)))
+
+            index = load_timeseries_index(p)
+            sidecar = index_path_for(p)
+            self.assertEqual(sidecar.name, "timeseries.idx")
+            self.assertEqual(index.record_counts, {REC_NAV_SOLUTION: 5})
+            self.assertEqual(int(index.type_table["t_last_us"][0]), 400)
+            written_ns = sidecar.stat().st_mtime_ns
+
+            reused = load_timeseries_index(p)
+            self.assertEqual(sidecar.stat().st_mtime_ns, written_ns)
+            self.assertEqual(reused.positions(REC_NAV_SOLUTION).tolist(), [0, 1, 2, 3, 4])
+
+            with p.open("ab") as fh:
+                fh.write(RECORD_HEADER_STRUCT.pack(500, REC_NAV_SOLUTION, nav.payload_struct.size))
+                fh.write(nav.payload_struct.pack(*([5.0] * 6)))
+            parsed = read_timeseries_bin(p, use_index=True)
+            rebuilt = load_timeseries_index(p)
+
+        self.assertEqual(parsed.record_counts, {"REC_NAV_SOLUTION": 6})
+        self.assertEqual(parsed.records["REC_NAV_SOLUTION"]["x"].tolist(), [0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(rebuilt.record_counts, {REC_NAV_SOLUTION: 6})
+
+    def test_columnar_cache_matches_decode_and_tracks_source(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="zigzag",
+                duration_s=3.0,
+                dt=0.05,
+                session_name="cache",
+            )
+            p = session / "timeseries.bin"
+            with p.open("ab") as fh:
+                fh.write(RECORD_HEADER_STRUCT.pack(10**9, 999, 3) + b"abc")
+            reference = read_timeseries_bin(p, t_start_us=500_000, t_end_us=2_000_000, fields={"REC_NAV_SOLUTION": ("psi",)})
+            first = read_timeseries_bin(p, use_cache=True, t_start_us=500_000, t_end_us=2_000_000, fields={"REC_NAV_SOLUTION": ("psi",)})
+            manifest = cache_path_for(p) / "manifest.json"
+            written_ns = manifest.stat().st_mtime_ns
+            mapped = read_timeseries_bin(p, use_cache=True, memory_map=True)
+            self.assertEqual(manifest.stat().st_mtime_ns, written_ns)
+
+            with p.open("ab") as fh:
+                fh.write(RECORD_HEADER_STRUCT.pack(10**9 + 1, 999, 0))
+            rebuilt = load_timeseries_cache(p)
+
+        self.assertEqual(first.record_counts, reference.record_counts)
+        self.assertEqual(first.unknown_records, reference.unknown_records)
+        for name, columns in reference.records.items():
+            self.assertEqual(list(first.records[name]), list(columns))
+            for field, values in columns.items():
+                self.assertEqual(first.records[name][field].dtype, values.dtype)
+                np.testing.assert_array_equal(first.records[name][field], values)
+        self.assertEqual(mapped.records["REC_NAV_SOLUTION"]["x"].dtype, np.float32)
+        self.assertFalse(mapped.records["REC_NAV_SOLUTION"]["x"].flags.writeable)
+        self.assertEqual(len(rebuilt.data.unknown_records), 2)
+
+    def test_load_sessions_reports_failures_without_aborting(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            sessions = [
+                generate_dummy_log_session(
+                    output_root=Path(td) / "logs",
+                    scenario_name="step",
+                    duration_s=1.0,
+                    dt=0.1,
+                    session_name=f"s{k}",
+                )
+                for k in range(2)
+            ]
+            broken = Path(td) / "broken.bin"
+            broken.write_bytes(b"USVLOG")
+            results = load_sessions([sessions[0], broken, sessions[1] / "timeseries.bin"], workers=2, record_types=["REC_NAV_SOLUTION"])
+            expected = read_timeseries_bin(sessions[1] / "timeseries.bin", record_types=["REC_NAV_SOLUTION"])
+
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertEqual(results[0].path.name, "timeseries.bin")
+        self.assertIn("too small", results[1].error)
+        self.assertEqual(results[2].data.record_counts, expected.record_counts)
+        np.testing.assert_array_equal(
+            results[2].data.records["REC_NAV_SOLUTION"]["psi"], expected.records["REC_NAV_SOLUTION"]["psi"]
+        )
+
+    def test_load_sessions_isolates_a_dying_worker(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            sessions = [
+                generate_dummy_log_session(
+                    output_root=Path(td) / "logs",
+                    scenario_name="step",
+                    duration_s=1.0,
+                    dt=0.1,
+                    session_name=name,
+                )
+                for name in ("s0", "crash", "s1", "s2", "s3")
+            ]
+            with mock.patch.object(sessions_module, "_prepare_session", _prepare_session_or_die):
+                results = load_sessions(sessions, workers=2, record_types=["REC_NAV_SOLUTION"])
+            expected = read_timeseries_bin(sessions[4] / "timeseries.bin", record_types=["REC_NAV_SOLUTION"])
+
+        self.assertEqual([result.ok for result in results], [True, False, True, True, True])
+        self.assertIn("worker process died", results[1].error)
+        self.assertEqual(results[4].data.record_counts, expected.record_counts)
+
+    def test_load_sessions_reports_unexpected_errors_in_and_out_of_process(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            sessions = [
+                generate_dummy_log_session(
+                    output_root=Path(td) / "logs",
+                    scenario_name="step",
+                    duration_s=1.0,
+                    dt=0.1,
+                    session_name=name,
+                )
+                for name in ("s0", "broken", "s1")
+            ]
+            with mock.patch.object(sessions_module, "_prepare_session", _prepare_session_or_raise):
+                by_workers = {workers: load_sessions(sessions, workers=workers) for workers in (1, 2)}
+
+        for results in by_workers.values():
+            self.assertEqual([result.ok for result in results], [True, False, True])
+            self.assertEqual(results[1].error, "RuntimeError: decoder bug")
+
+    def test_session_catalog_updates_incrementally(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            logs = Path(td) / "logs"
+            sessions = {
+                name: generate_dummy_log_session(
+                    output_root=logs, scenario_name=scenario, duration_s=duration_s, dt=0.1, session_name=name
+                )
+                for name, scenario, duration_s in (("a", "zigzag", 3.0), ("b", "zigzag", 1.0), ("c", "step", 3.0))
+            }
+            with SessionCatalog(Path(td) / "catalog.sqlite") as catalog:
+                first = catalog.update(logs)
+                again = catalog.update(logs)
+                long_zigzags = catalog.find(
+                    scenario="zigzag*", fw_model_schema=FW_MODEL_SCHEMA, record_type="REC_NAV_SOLUTION", min_span_s=2.0
+                )
+                stats = catalog.record_stats(sessions["a"])
+                events = catalog.event_counts(sessions["a"])
+
+                (sessions["b"] / "timeseries.bin").write_bytes(b"USVLOG")
+                for path in sessions["c"].iterdir():
+                    path.unlink()
+                sessions["c"].rmdir()
+                changed = catalog.update(logs)
+                broken = catalog.find(include_errors=True)
+
+        self.assertEqual(first, CatalogUpdate(added=3, updated=0, removed=0, unchanged=0))
+        self.assertEqual(again, CatalogUpdate(added=0, updated=0, removed=0, unchanged=3))
+        self.assertEqual([entry.session_name for entry in long_zigzags], ["a"])
+        self.assertEqual(stats["REC_NAV_SOLUTION"], {"count": 31, "t_first_us": 0, "t_last_us": 3_000_000})
+        self.assertEqual(events["WP_SWITCH"], 1)
+        self.assertEqual(changed, CatalogUpdate(added=0, updated=1, removed=1, unchanged=1))
+        self.assertEqual([entry.session_name for entry in broken], ["a", "b"])
+        self.assertIsNone(broken[0].error)
+        self.assertIn("too small", broken[1].error)
+
+    def test_event_log_lookups_match_linear_filtering(self) -> None:
+        lines = [
+            '{"t_us":0,"type":"MODE_CHANGE","from":"MANUAL","to":"AUTOPILOT"}',
+            '{"t_us":100,"type":"EKF_GATING","action":"ACCEPT"}',
+            "",
+            '{"type": "WP_SWITCH", "t_us": 150, "idx": 1}',
+            '{"t_us":200,"type":"EKF_GATING","action":"REJECT"}',
+            '{"t_us":200,"type":"MODE_CHANGE","from":"AUTOPILOT","to":"HOLD"}',
+            '{"t_us":300,"type":"WP_SWITCH","idx":2,"note":"caf\u00e9"}',
+            '{"type":"NOTE"}',
+        ]
+        events = [json.loads(line) for line in lines if line]
+        log = parse_event_log(("\n".join(lines) + "\n").encode("utf-8"))
+
+        self.assertEqual(list(log), events)
+        self.assertEqual(log.counts(), {"MODE_CHANGE": 2, "EKF_GATING": 2, "WP_SWITCH": 2, "NOTE": 1})
+        self.assertEqual(log.select("WP_SWITCH", 100, 300), [events[2]])
+        self.assertEqual(log.select(["EKF_GATING", "WP_SWITCH"], t_start_us=150), events[2:4] + [events[5]])
+        self.assertEqual(log.select("NOTE"), [events[6]])
+        self.assertEqual(log.select("NOTE", t_end_us=1_000), [])
+        self.assertIsNone(log.active_at("MODE_CHANGE", -1))
+        self.assertEqual(log.active_at("MODE_CHANGE", 199)["to"], "AUTOPILOT")
+        self.assertEqual(log.active_at("MODE_CHANGE", 200)["to"], "HOLD")
+        self.assertIsNone(log.active_at("PARAM_APPLY", 200))
+
+    def test_event_log_tells_missing_t_us_from_negative_t_us(self) -> None:
+        lines = ['{"type":"SYNC"}', '{"t_us":-1,"type":"SYNC","n":1}', '{"t_us":5,"type":"SYNC","n":2}']
+        log = parse_event_log("\n".join(lines).encode("utf-8"))
+
+        self.assertEqual(log.t_us_valid.tolist(), [False, True, True])
+        self.assertEqual(log.positions("SYNC").tolist(), [0, 1, 2])
+        self.assertEqual(log.positions("SYNC", t_start_us=-1).tolist(), [1, 2])
+        self.assertEqual(log.positions("SYNC", t_end_us=0).tolist(), [1])
+        self.assertEqual(log.active_at("SYNC", -1)["n"], 1)
+        self.assertIsNone(log.active_at("SYNC", -2))
+
+    def test_align_records_holds_interpolates_and_flags_dropouts(self) -> None:
+        records = {
+            "REC_NAV_SOLUTION": {
+                "t_us": np.array([0, 100, 200, 600], dtype=np.uint64),
+                "psi": np.array([3.0, -3.0, -2.9, -2.8]),
+                "v": np.array([1.0, 2.0, 3.0, 4.0]),
+                "valid": np.array([1, 1, 0, 1], dtype=np.uint8),
+            }
+        }
+        t_us = np.array([-50, 0, 50, 140, 200, 400, 600, 700])
+
+        asof = align_records(records, t_us, tolerance_us=150)
+        nav = asof.records["REC_NAV_SOLUTION"]
+        np.testing.assert_array_equal(asof.valid["REC_NAV_SOLUTION"], [False, True, True, True, True, False, True, True])
+        np.testing.assert_array_equal(nav["t_src_us"][1:], [0, 0, 100, 200, 200, 600, 600])
+        np.testing.assert_array_equal(nav["v"][:4], [np.nan, 1.0, 1.0, 2.0])
+        np.testing.assert_array_equal(nav["valid"], [0, 1, 1, 1, 0, 0, 1, 1])
+
+        nearest = align_records(records, t_us, method="nearest").records["REC_NAV_SOLUTION"]
+        np.testing.assert_array_equal(nearest["v"], [1.0, 1.0, 1.0, 2.0, 3.0, 3.0, 4.0, 4.0])
+
+        linear = align_records(records, t_us, method="linear", tolerance_us=200)
+        nav = linear.records["REC_NAV_SOLUTION"]
+        np.testing.assert_array_equal(linear.valid["REC_NAV_SOLUTION"], [False, True, True, True, True, False, True, False])
+        np.testing.assert_allclose(nav["v"][1:5], [1.0, 1.5, 2.4, 3.0])
+        # 3.0 -> -3.0 crosses +/-pi: halfway lies on the short arc near pi, not at 0.
+        self.assertAlmostEqual(abs(nav["psi"][2]), np.pi, delta=0.01)
+        self.assertAlmostEqual(nav["psi"][6], -2.8)
+        # Past the seam the result wraps into [-pi, pi) instead of overshooting pi.
+        seam, _ = align_columns(
+            np.array([0, 100], dtype=np.uint64), {"psi": np.array([3.1, -3.0])}, np.array([90]), method="linear"
+        )
+        self.assertAlmostEqual(seam["psi"][0], 3.1 + 0.9 * (2.0 * np.pi - 6.1) - 2.0 * np.pi)
+        self.assertTrue(np.all((nav["psi"][1:5] >= -np.pi) & (nav["psi"][1:5] < np.pi)))
+
+    def test_parallel_read_is_identical_to_sequential_read(self) -> None:
+        nav = DEFAULT_RECORD_LAYOUTS[REC_NAV_SOLUTION]
+        guidance = DEFAULT_RECORD_LAYOUTS[REC_GUIDANCE_REF]
+
+        def frame(k: int) -> bytes:
+            return (
+                RECORD_HEADER_STRUCT.pack(1000 * k, REC_NAV_SOLUTION, nav.payload_struct.size)
+                + nav.payload_struct.pack(*([k * 0.5] * 6))
+                + RECORD_HEADER_STRUCT.pack(1000 * k, REC_GUIDANCE_REF, guidance.payload_struct.size)
+                + guidance.payload_struct.pack(*([k * 0.25] * 4))
+            )
+
+        block = b"".join(frame(k) for k in range(1000))
+        body = block * 30 + RECORD_HEADER_STRUCT.pack(0, 999, 5) + b"12345" + block * 30
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "timeseries.bin"
+            p.write_bytes(FILE_HEADER_STRUCT.pack(MAGIC, 1, 1, 0) + body)
+            sequential = read_timeseries_bin(p)
+            parallel = read_timeseries_bin(p, workers=4)
+            p.write_bytes(FILE_HEADER_STRUCT.pack(MAGIC, 1, 1, 0) + body[:-3])
+            with self.assertRaises(ValueError) as sequential_error:
+                read_timeseries_bin(p)
+            with self.assertRaises(ValueError) as parallel_error:
+                read_timeseries_bin(p, workers=4)
+
+        self.assertEqual(parallel.record_counts, sequential.record_counts)
+        self.assertEqual(parallel.unknown_records, sequential.unknown_records)
+        for name, columns in sequential.records.items():
+            for field, values in columns.items():
+                np.testing.assert_array_equal(parallel.records[name][field], values)
+        self.assertEqual(str(parallel_error.exception), str(sequential_error.exception))
+
+    def test_writer_round_trips_single_batched_and_raw_records(self) -> None:
+        z_gyro = np.linspace(-1.0, 1.0, 50)
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "timeseries.bin"
+            with TimeseriesWriter(p, fw_model_schema=3, t0_us=7, buffer_size=1 << 17) as writer:
+                writer.write_record(10, REC_NAV_SOLUTION, (1.0, 2.0, 3.0, 4.0, 5.0, 6.0))
+                writer.write_records(
+                    REC_SENSOR_GYRO,
+                    20 + np.arange(50, dtype=np.uint64),
+                    {"z_gyro": z_gyro, "b_g_est": 0.25, "valid": 1},
+                )
+                writer.write_payload(100, 999, b"xyz")
+            parsed = read_timeseries_bin(p)
+            size = p.stat().st_size
+
+        self.assertEqual(writer.bytes_written, size)
+        self.assertEqual(writer.record_counts, {REC_NAV_SOLUTION: 1, REC_SENSOR_GYRO: 50, 999: 1})
+        self.assertEqual((parsed.header.fw_model_schema, parsed.header.t0_us), (3, 7))
+        self.assertEqual(parsed.records["REC_NAV_SOLUTION"]["r"].tolist(), [5.0])
+        gyro = parsed.records["REC_SENSOR_GYRO"]
+        np.testing.assert_array_equal(gyro["z_gyro"], z_gyro.astype(np.float32))
+        self.assertEqual(gyro["t_us"][-1], 69)
+        self.assertEqual(set(gyro["valid"].tolist()), {1})
+        self.assertEqual([(u.t_us, u.type_id, u.payload_len) for u in parsed.unknown_records], [(100, 999, 3)])
+
+    @unittest.skipUnless(sys.byteorder == "little", "native formats are big-endian on this host")
+    def test_native_byte_order_payload_formats_decode_like_struct(self) -> None:
+        for fmt in ("=BdH", "@BdH", "BdH"):
+            layout = RecordLayout(
+                type_id=50, name="REC_NATIVE", fields=("a", "b", "c"), payload_struct=struct.Struct(fmt)
+            )
+            with tempfile.TemporaryDirectory() as td:
+                p = Path(td) / "timeseries.bin"
+                with p.open("wb") as fh:
+                    fh.write(FILE_HEADER_STRUCT.pack(MAGIC, 1, 1, 0))
+                    for k in range(3):
+                        fh.write(RECORD_HEADER_STRUCT.pack(10 * k, 50, layout.payload_struct.size))
+                        fh.write(layout.payload_struct.pack(k, 0.5 * k, 1000 + k))
+                parsed = read_timeseries_bin(p, record_layouts={50: layout})
+
+            native = parsed.records["REC_NATIVE"]
+            self.assertEqual(native["a"].tolist(), [0, 1, 2], fmt)
+            self.assertEqual(native["b"].tolist(), [0.0, 0.5, 1.0], fmt)
+            self.assertEqual(native["c"].tolist(), [1000, 1001, 1002], fmt)
+
+    def test_reader_selects_registered_layouts_from_file_schema(self) -> None:
+        legacy_nav = RecordLayout(
+            type_id=REC_NAV_SOLUTION,
+            name="REC_NAV_SOLUTION",
+            fields=("x", "y", "psi"),
+            payload_struct=struct.Struct("<3f"),
+        )
+        register_record_layouts(90, {REC_NAV_SOLUTION: legacy_nav})
+        self.addCleanup(unregister_record_layouts, 90)
+        with tempfile.TemporaryDirectory() as td:
+            legacy, current = Path(td) / "legacy.bin", Path(td) / "current.bin"
+            with TimeseriesWriter(legacy, fw_model_schema=90, t0_us=0) as writer:
+                writer.write_record(10, REC_NAV_SOLUTION, (1.0, 2.0, 3.0))
+            with TimeseriesWriter(current, fw_model_schema=FW_MODEL_SCHEMA, t0_us=0) as writer:
+                writer.write_record(10, REC_NAV_SOLUTION, (1.0, 2.0, 3.0, 4.0, 5.0, 6.0))
+            parsed_legacy = read_timeseries_bin(legacy)
+            cached_legacy = read_timeseries_bin(legacy, use_cache=True)
+            parsed_current = read_timeseries_bin(current)
+            stats = scan_timeseries_bin(legacy)
+
+        self.assertEqual(list(parsed_legacy.records["REC_NAV_SOLUTION"]), ["t_us", "x", "y", "psi"])
+        self.assertEqual(parsed_legacy.records["REC_NAV_SOLUTION"]["psi"].tolist(), [3.0])
+        self.assertEqual(list(cached_legacy.records["REC_NAV_SOLUTION"]), ["t_us", "x", "y", "psi"])
+        self.assertEqual(parsed_current.records["REC_NAV_SOLUTION"]["b_g"].tolist(), [6.0])
+        self.assertEqual(stats.types[REC_NAV_SOLUTION].payload_len_mismatches, 0)
+        with self.assertRaises(ValueError):
+            register_record_layouts(91, {REC_SENSOR_GYRO: legacy_nav})
+
+    def test_write_timeseries_bin_round_trips_and_rewrites_trimmed_sessions(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="zigzag",
+                duration_s=2.0,
+                dt=0.1,
+                session_name="rewrite",
+            )
+            source = session / "timeseries.bin"
+            copy = Path(td) / "copy.bin"
+            trimmed = Path(td) / "trimmed.bin"
+            counts = write_timeseries_bin(read_timeseries_bin(source), copy)
+            window = read_timeseries_bin(source, t_start_us=500_000, t_end_us=1_500_000)
+            write_timeseries_bin(window, trimmed)
+            same_bytes = copy.read_bytes() == source.read_bytes()
+            reread = read_timeseries_bin(trimmed)
+
+        self.assertTrue(same_bytes)
+        self.assertEqual(counts["REC_NAV_SOLUTION"], 21)
+        self.assertEqual(reread.record_counts, window.record_counts)
+        np.testing.assert_array_equal(reread.records["REC_YAW_CTRL_DEBUG"]["e_r"], window.records["REC_YAW_CTRL_DEBUG"]["e_r"])
+
+    def test_compressed_container_reads_only_needed_blocks(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="circle",
+                duration_s=20.0,
+                dt=0.05,
+                session_name="compressed",
+            )
+            source = session / "timeseries.bin"
+            truncated = Path(td) / "truncated.bin"
+            truncated.write_bytes(source.read_bytes()[:-7])
+            packed = Path(td) / "timeseries.binz"
+            restored = Path(td) / "restored.bin"
+
+            blocks = compress_timeseries_bin(source, packed, block_size=1 << 12)
+            table = read_block_table(packed)
+            window = {"t_start_us": 5_000_000, "t_end_us": 6_000_000}
+            selected = table.select({REC_NAV_SOLUTION}, **window)
+            expected = read_timeseries_bin(source, record_types=["REC_NAV_SOLUTION"], **window)
+            got = read_timeseries_blocks(packed, record_types=["REC_NAV_SOLUTION"], **window)
+            full_expected = read_timeseries_bin(source)
+            full_got = read_timeseries_blocks(packed, workers=2)
+            decompress_timeseries_bin(packed, restored)
+            same_bytes = restored.read_bytes() == source.read_bytes()
+            compressed_size, source_size = packed.stat().st_size, source.stat().st_size
+
+            compress_timeseries_bin(truncated, packed, codec="lzma")
+            with self.assertRaisesRegex(ValueError, "truncated payload"):
+                read_timeseries_blocks(packed)
+            head = read_timeseries_blocks(packed, t_end_us=1_000_000)
+
+        self.assertTrue(same_bytes)
+        self.assertLess(compressed_size * 2, source_size)
+        self.assertEqual(table.record_count, sum(full_expected.record_counts.values()))
+        self.assertLess(4 * selected.shape[0], blocks.shape[0])
+        self.assertEqual(got.record_counts, expected.record_counts)
+        np.testing.assert_array_equal(got.records["REC_NAV_SOLUTION"]["x"], expected.records["REC_NAV_SOLUTION"]["x"])
+        self.assertEqual(list(full_got.records), list(full_expected.records))
+        for name, columns in full_expected.records.items():
+            for field, values in columns.items():
+                np.testing.assert_array_equal(full_got.records[name][field], values)
+        self.assertEqual(head.record_counts["REC_NAV_SOLUTION"], 20)
+
+    def test_header_scan_statistics_match_decoded_records(self) -> None:
+        nav = DEFAULT_RECORD_LAYOUTS[REC_NAV_SOLUTION]
+        gyro = DEFAULT_RECORD_LAYOUTS[REC_SENSOR_GYRO]
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "timeseries.bin"
+            with p.open("wb") as fh:
+                fh.write(FILE_HEADER_STRUCT.pack(MAGIC, 1, 1, 0))
+                for t_us in (0, 10_000, 20_000, 70_000, 80_000):
+                    fh.write(RECORD_HEADER_STRUCT.pack(t_us, REC_NAV_SOLUTION, nav.payload_struct.size))
+                    fh.write(bytes(nav.payload_struct.size))
+                    fh.write(RECORD_HEADER_STRUCT.pack(t_us + 1, REC_SENSOR_GYRO, gyro.payload_struct.size))
+                    fh.write(bytes(gyro.payload_struct.size))
+                fh.write(RECORD_HEADER_STRUCT.pack(85_000, 999, 3))
+                fh.write(b"ABC")
+                fh.write(RECORD_HEADER_STRUCT.pack(90_000, REC_NAV_SOLUTION, 40))
+                fh.write(bytes(7))
+
+            stats = scan_timeseries_bin(p)
+            parsed = read_timeseries_bin(p, t_end_us=85_000)
+
+        self.assertEqual(stats.record_counts, parsed.record_counts)
+        self.assertIsNotNone(stats.error)
+        self.assertEqual((stats.record_count, stats.max_gap_us, stats.max_gap_t_us), (11, 49_999, 20_001))
+        nav_stats = stats.types[REC_NAV_SOLUTION]
+        self.assertEqual((nav_stats.t_first_us, nav_stats.t_last_us), (0, 80_000))
+        self.assertEqual((nav_stats.max_gap_us, nav_stats.max_gap_t_us), (50_000, 20_000))
+        self.assertAlmostEqual(nav_stats.rate_hz, 50.0)
+        self.assertEqual(nav_stats.payload_len_mismatches, 0)
+        self.assertEqual(list(stats.unknown_types), [999])
+        self.assertEqual(stats.unknown_types[999].payload_len_max, 3)
+
     def test_unknown_record_is_skipped_and_reported(self) -> None:
         with tempfile.TemporaryDirectory() as td:
             p = Path(td) / "timeseries.bin"
@@ -59,6 +748,41 @@ class TimeseriesIoTests(unittest.TestCase):
         self.assertEqual(parsed.unknown_records[0].type_id, 999)
         self.assertEqual(parsed.record_counts, {})
 
+    def test_bulk_decode_matches_struct_unpack_for_irregular_stream(self) -> None:
+        nav = DEFAULT_RECORD_LAYOUTS[REC_NAV_SOLUTION]
+        gnss = DEFAULT_RECORD_LAYOUTS[REC_SENSOR_GNSS]
+        # Periodic run, then an irregular tail that breaks the repeating pattern.
+        plan = [REC_NAV_SOLUTION, REC_SENSOR_GNSS] * 200 + [REC_NAV_SOLUTION, 999, REC_SENSOR_GNSS, REC_NAV_SOLUTION]
+        expected: dict[int, list[tuple]] = {REC_NAV_SOLUTION: [], REC_SENSOR_GNSS: []}
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "timeseries.bin"
+            with p.open("wb") as fh:
+                fh.write(FILE_HEADER_STRUCT.pack(MAGIC, 1, 1, 0))
+                for k, rec_type in enumerate(plan):
+                    if rec_type == REC_NAV_SOLUTION:
+                        payload = nav.payload_struct.pack(*(0.5 * k + j for j in range(6)))
+                    elif rec_type == REC_SENSOR_GNSS:
+                        payload = gnss.payload_struct.pack(1.0 * k, -1.0 * k, 0.25, 2.0, k % 2)
+                    else:
+                        payload = b"\x01\x02\x03"
+                    if rec_type in expected:
+                        expected[rec_type].append((k, DEFAULT_RECORD_LAYOUTS[rec_type].payload_struct.unpack(payload)))
+                    fh.write(RECORD_HEADER_STRUCT.pack(k, rec_type, len(payload)))
+                    fh.write(payload)
+
+            parsed = read_timeseries_bin(p)
+
+        self.assertEqual(list(parsed.records), ["REC_NAV_SOLUTION", "REC_SENSOR_GNSS"])
+        self.assertEqual(len(parsed.unknown_records), 1)
+        for rec_type, rows in expected.items():
+            layout = DEFAULT_RECORD_LAYOUTS[rec_type]
+            decoded = parsed.records[layout.name]
+            self.assertEqual(decoded["t_us"].tolist(), [t for t, _ in rows])
+            for j, field in enumerate(layout.fields):
+                self.assertEqual(decoded[field].tolist(), [values[j] for _, values in rows])
+        self.assertEqual(parsed.records["REC_SENSOR_GNSS"]["valid"].dtype, np.int64)
+        self.assertEqual(parsed.records["REC_NAV_SOLUTION"]["x"].dtype, np.float64)
+
     def test_payload_length_mismatch_raises_in_strict_mode(self) -> None:
         with tempfile.TemporaryDirectory() as td:
             p = Path(td) / "timeseries.bin"
@@ -71,5 +795,64 @@ class TimeseriesIoTests(unittest.TestCase):
                 read_timeseries_bin(p)
 
 
+    def test_recover_mode_resyncs_past_corrupt_bytes(self) -> None:
+        nav = DEFAULT_RECORD_LAYOUTS[REC_NAV_SOLUTION]
+        gyro = DEFAULT_RECORD_LAYOUTS[REC_SENSOR_GYRO]
+        nav_size = RECORD_HEADER_STRUCT.size + nav.payload_struct.size
+        gyro_size = RECORD_HEADER_STRUCT.size + gyro.payload_struct.size
+        raw = bytearray(FILE_HEADER_STRUCT.pack(MAGIC, 1, 1, 0))
+        for k in range(40):
+            raw += RECORD_HEADER_STRUCT.pack(1000 * k, REC_NAV_SOLUTION, nav.payload_struct.size)
+            raw += nav.payload_struct.pack(float(k), 0.0, 0.0, 0.0, 0.0, 0.0)
+            raw += RECORD_HEADER_STRUCT.pack(1000 * k + 1, REC_SENSOR_GYRO, gyro.payload_struct.size)
+            raw += gyro.payload_struct.pack(0.0, 0.0, 1)
+        unknown_at = len(raw)
+        raw += RECORD_HEADER_STRUCT.pack(40_000, 999, 2) + b"ok"
+        # Damage the length field of step 10's nav record and cut the file mid-record.
+        bad_at = FILE_HEADER_STRUCT.size + 10 * (nav_size + gyro_size)
+        raw[bad_at + 10 : bad_at + 12] = b"\xff\x7f"
+        raw += RECORD_HEADER_STRUCT.pack(41_000, REC_NAV_SOLUTION, nav.payload_struct.size) + bytes(5)
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "timeseries.bin"
+            p.write_bytes(bytes(raw))
+            with self.assertRaises(ValueError):
+                read_timeseries_bin(p)
+            recovered = read_timeseries_bin(p, recover=True)
+
+        self.assertEqual(
+            recovered.skipped_ranges.tolist(), [[bad_at, bad_at + nav_size], [unknown_at + 14, len(raw)]]
+        )
+        self.assertEqual(recovered.record_counts, {"REC_NAV_SOLUTION": 39, "REC_SENSOR_GYRO": 40})
+        self.assertNotIn(10.0, recovered.records["REC_NAV_SOLUTION"]["x"].tolist())
+        self.assertEqual([(u.t_us, u.type_id, u.offset) for u in recovered.unknown_records], [(40_000, 999, unknown_at)])
+        self.assertEqual(recovered.unknown_records.record_counts, {999: 1})
+
+    def test_recover_mode_reports_deleted_bytes_instead_of_reading_junk(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            session = generate_dummy_log_session(
+                output_root=Path(td) / "logs",
+                scenario_name="zigzag",
+                duration_s=30.0,
+                dt=0.05,
+                session_name="recover_session",
+            )
+            full = read_timeseries_bin(session / "timeseries.bin")
+            raw = (session / "timeseries.bin").read_bytes()
+            total = sum(full.record_counts.values())
+            for cut in (len(raw) // 2, len(raw) // 3 + 7, len(raw) // 5 + 1):
+                p = Path(td) / "damaged.bin"
+                p.write_bytes(raw[:cut] + raw[cut + 3 :])
+                recovered = read_timeseries_bin(p, recover=True)
+
+                self.assertGreaterEqual(sum(recovered.record_counts.values()), total - 2)
+                self.assertEqual(len(recovered.unknown_records), 0)
+                self.assertEqual(recovered.skipped_ranges.shape[0], 1)
+                # The gap starts at the first misaligned header, within a record of the cut.
+                start, end = recovered.skipped_ranges[0].tolist()
+                self.assertLess(abs(start - cut), 64)
+                self.assertLess(0, end - start)
+                self.assertLess(end - start, 100)
+
+
 if __name__ == "__main__":
     unittest.main()